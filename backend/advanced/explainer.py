@@ -0,0 +1,145 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import shap
+from sklearn.ensemble import RandomForestClassifier
+
+from advanced.model_registry import get_current_model
+
+DEMO_FEATURES = ["fatigue", "travel", "pts", "odds_shift"]
+
+
+def demo_model() -> Tuple[Any, str, pd.DataFrame]:
+    """Placeholder model until a trained one is registered, fitted once with a fixed seed."""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((100, len(DEMO_FEATURES))), columns=DEMO_FEATURES)
+    y = rng.integers(0, 2, 100)
+    model = RandomForestClassifier(n_estimators=100, random_state=0).fit(X, y)
+    return model, "demo", X
+
+
+def registry_or_demo() -> Tuple[Any, str, pd.DataFrame]:
+    """Current registered model and its sample slate, else the demo model."""
+    artifacts = get_current_model()
+    if artifacts is None or artifacts.sample is None:
+        return demo_model()
+    return artifacts.model, artifacts.version, artifacts.sample
+
+
+def registry_version() -> str:
+    artifacts = get_current_model()
+    return artifacts.version if artifacts is not None and artifacts.sample is not None else "demo"
+
+
+def row_hashes(X: pd.DataFrame) -> np.ndarray:
+    """Stable 64-bit hash of each feature row, independent of the index."""
+    return pd.util.hash_pandas_object(X, index=False).to_numpy()
+
+
+class ExplainerService:
+    """Owns one ``shap.TreeExplainer`` per model version and caches SHAP vectors.
+
+    The explainer is built when a model is loaded, never per request. Vectors
+    are cached per ``(model_version, row hash)`` in a bounded LRU, and
+    ``explain_batch`` computes all cache misses of a slate in a single call.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Tuple[Any, str, pd.DataFrame]] = registry_or_demo,
+        probe: Optional[Callable[[], str]] = registry_version,
+        max_entries: int = 50_000,
+    ) -> None:
+        self.loader = loader
+        self.probe = probe
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, int], np.ndarray]" = OrderedDict()
+        self.model: Any = None
+        self.explainer: Optional[shap.TreeExplainer] = None
+        self.version: Optional[str] = None
+        self.feature_names: List[str] = []
+        self.slate: Optional[pd.DataFrame] = None
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, model: Any, version: str, slate: pd.DataFrame) -> None:
+        """Swap in ``model`` and precompute explanations for its current slate."""
+        explainer = shap.TreeExplainer(model)
+        with self._lock:
+            self.model, self.explainer, self.version = model, explainer, version
+            self.feature_names = list(slate.columns)
+            self.slate = slate
+        self.explain_batch(slate)
+
+    def _stale(self) -> bool:
+        return self.explainer is None or (self.probe is not None and self.probe() != self.version)
+
+    def _ensure_loaded(self) -> None:
+        # Hot-swaps to a newly registered model; old cache entries age out of the LRU
+        if self._stale():
+            with self._load_lock:
+                if self._stale():
+                    self.load(*self.loader())
+
+    def warm(self) -> None:
+        self._ensure_loaded()
+
+    def _positive_class(self, values: Any) -> np.ndarray:
+        # Classifiers return one vector per class; explain the positive class
+        if isinstance(values, list):
+            values = values[-1]
+        values = np.asarray(values)
+        return values[..., -1] if values.ndim == 3 else values
+
+    def explain_batch(self, X: pd.DataFrame) -> np.ndarray:
+        """SHAP matrix (rows x features) for ``X``, computing only uncached rows."""
+        self._ensure_loaded()
+        with self._lock:
+            version, explainer, feature_names = self.version, self.explainer, self.feature_names
+        X = X[feature_names]
+        keys = [(version, int(h)) for h in row_hashes(X)]
+        out = np.empty((len(X), len(feature_names)), dtype=np.float64)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    out[i] = cached
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        if missing:
+            values = self._positive_class(explainer.shap_values(X.iloc[missing]))
+            out[missing] = values
+            with self._lock:
+                for i, row in zip(missing, values):
+                    self._cache[keys[i]] = row
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return out
+
+    def explain(self, row: int = 0) -> Dict[str, float]:
+        """Feature -> SHAP value for one row of the current slate."""
+        self._ensure_loaded()
+        values = self.explain_batch(self.slate.iloc[[row]])[0]
+        return dict(zip(self.feature_names, values.tolist()))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": "shap",
+            "model_version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._cache),
+        }
+
+
+# Global explainer shared by every route
+explainer_service = ExplainerService()
@@ -0,0 +1,284 @@
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as pa_ipc
+
+from core.data_store import DATA_DIR
+from advanced.feature_engine import GroupedSeries
+
+FEATURES_DIR = os.path.join(DATA_DIR, "features")
+
+
+class FeatureStore:
+    """Per-entity rolling state, updated incrementally as results arrive.
+
+    For every entity (team or player) the store keeps the last-N values of
+    ``value``, the current streak of ``streak_col``, EWM numerator/weight sums
+    and the time of the last game. ``update`` only walks the new rows and
+    appends the post-game features to a log of Arrow files; ``lookup`` joins
+    that log point-in-time, so a game only sees features from strictly
+    earlier games. Rows of one entity must arrive in time order.
+    """
+
+    def __init__(
+        self,
+        name: str = "team_goals",
+        group: str = "team",
+        time_col: str = "match_date",
+        value: str = "goals",
+        windows: Iterable[int] = (5,),
+        streak_col: str = "win",
+        ewm_spans: Iterable[float] = (5,),
+        root: str = FEATURES_DIR,
+    ) -> None:
+        self.name = name
+        self.group = group
+        self.time_col = time_col
+        self.value = value
+        self.windows = tuple(windows)
+        self.streak_col = streak_col
+        self.ewm_spans = tuple(ewm_spans)
+        self.path = os.path.join(root, name)
+        self.buffer_size = max(self.windows)
+        self._state: Dict[Any, Dict[str, Any]] = {}
+        self._check_config()
+        self._load_state()
+
+    @property
+    def feature_columns(self) -> List[str]:
+        return (
+            [f"avg_{self.value}_last_{w}" for w in self.windows]
+            + [f"{self.streak_col}_streak"]
+            + [f"form_ewm_{span:g}" for span in self.ewm_spans]
+        )
+
+    # -- persistence -------------------------------------------------------
+
+    def _state_path(self) -> str:
+        return os.path.join(self.path, "state.arrow")
+
+    def _log_dir(self) -> str:
+        return os.path.join(self.path, "log")
+
+    def _config(self) -> Dict[str, Any]:
+        return {
+            "group": self.group, "time_col": self.time_col, "value": self.value,
+            "windows": [int(w) for w in self.windows], "streak_col": self.streak_col,
+            "ewm_spans": [float(s) for s in self.ewm_spans],
+        }
+
+    def _check_config(self) -> None:
+        """A store reopened with other columns/windows/spans would misread its
+        state file (its buffer and EWM columns are laid out by them)."""
+        try:
+            with open(os.path.join(self.path, "config.json"), encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return
+        stored["windows"] = [int(w) for w in stored.get("windows", [])]
+        stored["ewm_spans"] = [float(s) for s in stored.get("ewm_spans", [])]
+        mismatched = [k for k, v in self._config().items() if stored.get(k) != v]
+        if mismatched:
+            details = ", ".join(f"{k}: stored {stored.get(k)!r}, given {self._config()[k]!r}" for k in mismatched)
+            raise ValueError(f"Feature store {self.path} was built with other settings ({details})")
+
+    def _load_state(self) -> None:
+        if not os.path.exists(self._state_path()):
+            return
+        with pa.memory_map(self._state_path(), "r") as source:
+            table = pa_ipc.open_file(source).read_all().to_pandas()
+        buffers = table[[f"buf_{i}" for i in range(self.buffer_size)]].to_numpy()
+        for i, row in enumerate(table.itertuples(index=False)):
+            self._state[row.entity] = {
+                "count": int(row.count),
+                "last_time": row.last_time,
+                "streak_value": row.streak_value,
+                "streak_length": int(row.streak_length),
+                "buffer": buffers[i].copy(),
+                "ewm": {span: [getattr(row, f"ewm_num_{j}"), getattr(row, f"ewm_den_{j}")]
+                        for j, span in enumerate(self.ewm_spans)},
+            }
+
+    def _write_table(self, table: pa.Table, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa_ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    def _save_state(self) -> None:
+        entities = list(self._state)
+        states = [self._state[e] for e in entities]
+        columns: Dict[str, Any] = {
+            "entity": entities,
+            "count": [s["count"] for s in states],
+            "last_time": pd.to_datetime([s["last_time"] for s in states]),
+            "streak_value": [s["streak_value"] for s in states],
+            "streak_length": [s["streak_length"] for s in states],
+        }
+        buffers = np.array([s["buffer"] for s in states]).reshape(len(states), self.buffer_size)
+        for i in range(self.buffer_size):
+            columns[f"buf_{i}"] = buffers[:, i]
+        for j, span in enumerate(self.ewm_spans):
+            columns[f"ewm_num_{j}"] = [s["ewm"][span][0] for s in states]
+            columns[f"ewm_den_{j}"] = [s["ewm"][span][1] for s in states]
+        table = pa.Table.from_pandas(pd.DataFrame(columns), preserve_index=False)
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, "config.json"), "w", encoding="utf-8") as f:
+            json.dump({**self._config(), "updated_at": time.time()}, f)
+        # Replacing the state file is the commit point of a batch
+        self._write_table(table, self._state_path())
+
+    def read_log(self) -> pd.DataFrame:
+        """All post-game feature rows written so far, sorted by time."""
+        log_dir = self._log_dir()
+        parts = sorted(os.listdir(log_dir)) if os.path.isdir(log_dir) else []
+        tables = []
+        for part in parts:
+            if part.endswith(".arrow"):
+                with pa.memory_map(os.path.join(log_dir, part), "r") as source:
+                    tables.append(pa_ipc.open_file(source).read_all())
+        if not tables:
+            return pd.DataFrame(columns=["entity", self.time_col, *self.feature_columns])
+        return pa.concat_tables(tables).to_pandas().sort_values(self.time_col, kind="stable")
+
+    # -- updates -----------------------------------------------------------
+
+    def _new_state(self) -> Dict[str, Any]:
+        return {
+            "count": 0,
+            "last_time": None,
+            "streak_value": np.nan,
+            "streak_length": 0,
+            "buffer": np.full(self.buffer_size, np.nan),
+            "ewm": {span: [0.0, 0.0] for span in self.ewm_spans},
+        }
+
+    @staticmethod
+    def _copy_state(state: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            **state,
+            "buffer": state["buffer"].copy(),
+            "ewm": {span: list(sums) for span, sums in state["ewm"].items()},
+        }
+
+    def _features(self, state: Dict[str, Any]) -> List[float]:
+        buffer, count = state["buffer"], state["count"]
+        row = []
+        for w in self.windows:
+            recent = buffer[-w:]
+            row.append(recent.mean() if count >= w and not np.isnan(recent).any() else np.nan)
+        row.append(state["streak_value"] * state["streak_length"])
+        for span in self.ewm_spans:
+            num, den = state["ewm"][span]
+            row.append(num / den if den > 1e-12 else np.nan)
+        return row
+
+    def update(self, games: pd.DataFrame) -> pd.DataFrame:
+        """Fold ``games`` into the entity state; returns their post-game features.
+
+        Raises ValueError if a game is not later than the entity's last one.
+        The batch is applied to copies of the touched entities and swapped in
+        once its log part is written; if the state file then fails to save,
+        the part is removed and the old state restored, so a failed batch
+        changes nothing.
+        """
+        if games.empty:
+            return pd.DataFrame(columns=["entity", self.time_col, *self.feature_columns])
+        series = GroupedSeries(games, self.group, self.time_col)
+        ordered = games.iloc[series.order]
+        entities = ordered[self.group].to_numpy()
+        times = pd.to_datetime(ordered[self.time_col]).to_numpy()
+        values = series.sorted_values(games[self.value])
+        outcomes = series.sorted_values(games[self.streak_col])
+        decays = {span: 1.0 - 2.0 / (span + 1.0) for span in self.ewm_spans}
+        rows = []
+        staged: Dict[Any, Dict[str, Any]] = {}
+        for entity, when, value, outcome in zip(entities, times, values, outcomes):
+            state = staged.get(entity)
+            if state is None:
+                current = self._state.get(entity)
+                state = staged[entity] = self._copy_state(current) if current is not None else self._new_state()
+            if state["last_time"] is not None and when <= np.datetime64(state["last_time"]):
+                raise ValueError(f"{entity}: game at {when} is not after {state['last_time']}")
+            state["buffer"][:-1] = state["buffer"][1:]
+            state["buffer"][-1] = value
+            state["count"] += 1
+            # NaN never continues a run, matching the vectorized engine
+            if outcome == state["streak_value"]:
+                state["streak_length"] += 1
+            else:
+                state["streak_value"], state["streak_length"] = outcome, 1
+            missing = np.isnan(outcome)
+            for span, sums in state["ewm"].items():
+                sums[0] = decays[span] * sums[0] + (0.0 if missing else outcome)
+                sums[1] = decays[span] * sums[1] + (0.0 if missing else 1.0)
+            state["last_time"] = when
+            rows.append([entity, when, *self._features(state)])
+        log = pd.DataFrame(rows, columns=["entity", self.time_col, *self.feature_columns])
+        part = os.path.join(self._log_dir(), f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}.arrow")
+        self._write_table(pa.Table.from_pandas(log, preserve_index=False), part)
+        previous = {entity: self._state.get(entity) for entity in staged}
+        self._state.update(staged)
+        try:
+            self._save_state()
+        except BaseException:
+            for entity, state in previous.items():
+                if state is None:
+                    del self._state[entity]
+                else:
+                    self._state[entity] = state
+            os.remove(part)
+            raise
+        return log
+
+    def sync(self, games: pd.DataFrame) -> pd.DataFrame:
+        """Fold only the rows of ``games`` later than their entity's last
+        game; the rest are already in the log. Returns their features."""
+        last = pd.Series(
+            {entity: state["last_time"] for entity, state in self._state.items()}, dtype="datetime64[ns]"
+        )
+        last_times = last.reindex(games[self.group].to_numpy()).to_numpy()
+        times = pd.to_datetime(games[self.time_col]).to_numpy()
+        return self.update(games[np.isnat(last_times) | (times > last_times)])
+
+    # -- reads -------------------------------------------------------------
+
+    def latest(self, entities: Optional[Iterable[Any]] = None) -> pd.DataFrame:
+        """Current features per entity, for live inference on upcoming games."""
+        keys = list(self._state) if entities is None else [e for e in entities if e in self._state]
+        rows = [[e, self._state[e]["last_time"], *self._features(self._state[e])] for e in keys]
+        return pd.DataFrame(rows, columns=["entity", self.time_col, *self.feature_columns])
+
+    def upcoming(self, games: pd.DataFrame) -> pd.DataFrame:
+        """``games`` not played yet with each entity's current features and
+        rest_days, straight from the in-memory state (no log read)."""
+        current = self.latest(games[self.group].unique()).rename(columns={self.time_col: "_feature_time"})
+        merged = games.merge(current, how="left", left_on=self.group, right_on="entity").set_index(games.index)
+        times = pd.to_datetime(games[self.time_col])
+        merged["rest_days"] = (times - pd.to_datetime(merged["_feature_time"])).dt.total_seconds() / 86_400
+        return merged.drop(columns=["_feature_time", "entity"])
+
+    def lookup(self, games: pd.DataFrame) -> pd.DataFrame:
+        """Point-in-time features for ``games``: each row gets the state after
+        the entity's last game strictly before its own time, plus rest_days."""
+        log = self.read_log().rename(columns={self.time_col: "_feature_time"})
+        log["_feature_time"] = pd.to_datetime(log["_feature_time"])
+        left = games.assign(_time=pd.to_datetime(games[self.time_col]), _row=np.arange(len(games)))
+        merged = pd.merge_asof(
+            left.sort_values("_time", kind="stable"),
+            log.sort_values("_feature_time", kind="stable"),
+            left_on="_time", right_on="_feature_time",
+            left_by=self.group, right_by="entity",
+            allow_exact_matches=False, direction="backward",
+        )
+        merged["rest_days"] = (merged["_time"] - merged["_feature_time"]).dt.total_seconds() / 86_400
+        merged = merged.sort_values("_row").set_index(games.index)
+        return merged.drop(columns=["_time", "_row", "_feature_time", "entity"])
@@ -0,0 +1,217 @@
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class LineupConstraints:
+    """Rules every lineup must satisfy.
+
+    ``positions`` maps a position to the exact number of legs it fills (the
+    counts must add up to ``size``); ``max_per_game=1`` forbids two legs from
+    the same game, the usual guard against correlated picks.
+    """
+    size: int = 6
+    salary_cap: Optional[float] = None
+    max_per_team: Optional[int] = None
+    max_per_game: Optional[int] = 1
+    positions: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class Lineup:
+    players: List[int]
+    value: float
+    salary: float
+
+
+class LineupOptimizer:
+    """Branch-and-bound search for the highest-value N-leg lineups.
+
+    Candidates are sorted by value, so the best possible completion of a
+    partial lineup from position ``i`` is a prefix sum; a branch is cut as
+    soon as that bound cannot beat the incumbent, and the loop stops outright
+    because every later ``i`` has a lower bound. Salary feasibility is bounded
+    the same way with suffix minima of salary.
+
+    Values must be additive: projected points for DFS, or ``log(p)`` for
+    all-must-hit pick'em, where maximizing the sum maximizes the joint hit
+    probability.
+    """
+
+    def __init__(self, pool: pd.DataFrame, value: str = "value", constraints: Optional[LineupConstraints] = None) -> None:
+        self.constraints = constraints or LineupConstraints()
+        pool = pool.reset_index(drop=True)
+        order = np.argsort(-pool[value].to_numpy(dtype=np.float64), kind="stable")
+        self.pool = pool.iloc[order].reset_index(drop=True)
+        self.source_rows = order
+        self.values = self.pool[value].to_numpy(dtype=np.float64)
+        self.n = len(self.pool)
+        self.prefix = np.concatenate(([0.0], np.cumsum(self.values))).tolist()
+
+        def codes(column):
+            if column not in self.pool.columns:
+                return [-1] * self.n
+            return pd.factorize(self.pool[column].fillna("").astype(str))[0].tolist()
+
+        self.player_codes = codes("player" if "player" in self.pool.columns else "name")
+        self.team_codes = codes("team")
+        self.game_codes = codes("matchup" if "matchup" in self.pool.columns else "game")
+        positions = self.pool["position"].fillna("").astype(str).tolist() if "position" in self.pool.columns else [""] * self.n
+        slots = list(self.constraints.positions)
+        self.position_codes = [slots.index(p) if p in slots else -1 for p in positions]
+        self.position_need = [self.constraints.positions[p] for p in slots]
+        if "salary" in self.pool.columns:
+            self.salaries = self.pool["salary"].fillna(0).to_numpy(dtype=np.float64).tolist()
+        else:
+            self.salaries = [0.0] * self.n
+        # suffix_min[i]: cheapest salary among candidates i..n-1
+        self.suffix_min = (np.minimum.accumulate(np.array(self.salaries + [math.inf])[::-1])[::-1]).tolist()
+        self.nodes = 0
+
+    def _solve(self, avoid: Sequence[set], max_overlap: int) -> Optional[Lineup]:
+        c = self.constraints
+        size, cap = c.size, c.salary_cap if c.salary_cap is not None else math.inf
+        max_team = c.max_per_team or size
+        max_game = c.max_per_game or size
+        use_positions = bool(self.position_need)
+        values, prefix, salaries, suffix_min = self.values.tolist(), self.prefix, self.salaries, self.suffix_min
+        players, teams, games, slots = self.player_codes, self.team_codes, self.game_codes, self.position_codes
+        team_count: Dict[int, int] = {}
+        game_count: Dict[int, int] = {}
+        used_players = set()
+        slot_count = [0] * len(self.position_need)
+        overlap = [0] * len(avoid)
+        chosen: List[int] = []
+        best = {"value": -math.inf, "players": None, "salary": 0.0}
+        n = self.n
+
+        def search(start: int, value: float, salary: float) -> None:
+            self.nodes += 1
+            depth = len(chosen)
+            if depth == size:
+                if value > best["value"]:
+                    best.update(value=value, players=list(chosen), salary=salary)
+                return
+            k = size - depth
+            for i in range(start, n - k + 1):
+                if value + prefix[i + k] - prefix[i] <= best["value"]:
+                    break  # sorted values: no later start can do better
+                s = salary + salaries[i]
+                if k > 1 and s + suffix_min[i + 1] * (k - 1) > cap or s > cap:
+                    continue
+                if players[i] in used_players:
+                    continue
+                team, game = teams[i], games[i]
+                if team >= 0 and team_count.get(team, 0) >= max_team:
+                    continue
+                if game >= 0 and game_count.get(game, 0) >= max_game:
+                    continue
+                slot = slots[i]
+                if use_positions and (slot < 0 or slot_count[slot] >= self.position_need[slot]):
+                    continue
+                hits = [j for j, lineup in enumerate(avoid) if i in lineup]
+                if any(overlap[j] >= max_overlap for j in hits):
+                    continue
+                chosen.append(i)
+                used_players.add(players[i])
+                team_count[team] = team_count.get(team, 0) + 1
+                game_count[game] = game_count.get(game, 0) + 1
+                if use_positions:
+                    slot_count[slot] += 1
+                for j in hits:
+                    overlap[j] += 1
+                search(i + 1, value + values[i], s)
+                for j in hits:
+                    overlap[j] -= 1
+                if use_positions:
+                    slot_count[slot] -= 1
+                game_count[game] -= 1
+                team_count[team] -= 1
+                used_players.discard(players[i])
+                chosen.pop()
+
+        search(0, 0.0, 0.0)
+        if best["players"] is None:
+            return None
+        return Lineup(players=best["players"], value=best["value"], salary=best["salary"])
+
+    def top_k(self, k: int = 5, max_overlap: Optional[int] = None) -> List[Lineup]:
+        """Up to ``k`` lineups in decreasing value, each sharing at most
+        ``max_overlap`` players with every earlier one (default: size - 1,
+        i.e. merely distinct)."""
+        size = self.constraints.size
+        if self.position_need and sum(self.position_need) != size:
+            raise ValueError("Position counts must add up to the lineup size")
+        max_overlap = size - 1 if max_overlap is None else max_overlap
+        lineups: List[Lineup] = []
+        avoid: List[set] = []
+        for _ in range(k):
+            lineup = self._solve(avoid, max_overlap)
+            if lineup is None:
+                break
+            lineups.append(lineup)
+            avoid.append(set(lineup.players))
+        return lineups
+
+    def describe(self, lineup: Lineup) -> Dict[str, Any]:
+        rows = self.pool.iloc[lineup.players]
+        return {
+            "value": lineup.value,
+            "salary": lineup.salary,
+            "players": rows.replace({np.nan: None}).to_dict(orient="records"),
+        }
+
+
+def optimize_lineups(
+    pool: pd.DataFrame,
+    objective: str = "probability",
+    constraints: Optional[LineupConstraints] = None,
+    top_k: int = 5,
+    max_overlap: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Rank lineups from ``pool`` by joint hit probability or by projected points.
+
+    ``objective="probability"`` needs a ``probability`` column and maximizes
+    the product of leg probabilities; ``"points"`` needs ``projection``.
+    """
+    started = time.perf_counter()
+    pool = pool.copy()
+    if objective == "probability":
+        p = pd.to_numeric(pool["probability"], errors="coerce").clip(1e-9, 1.0)
+        pool["value"] = np.log(p)
+    elif objective == "points":
+        pool["value"] = pd.to_numeric(pool["projection"], errors="coerce")
+    else:
+        raise ValueError(f"Unknown objective: {objective}")
+    pool = pool[pool["value"].notna()]
+    optimizer = LineupOptimizer(pool, "value", constraints)
+    lineups = [optimizer.describe(lineup) for lineup in optimizer.top_k(top_k, max_overlap)]
+    if objective == "probability":
+        for lineup in lineups:
+            lineup["hit_probability"] = math.exp(lineup["value"])
+    return {
+        "lineups": lineups,
+        "pool_size": optimizer.n,
+        "nodes": optimizer.nodes,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def _synthetic_pool(players: int = 500, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    teams = np.array([f"T{i}" for i in range(30)])
+    team = teams[rng.integers(0, len(teams), players)]
+    return pd.DataFrame({
+        "player": [f"Player {i}" for i in range(players)],
+        "team": team,
+        "matchup": [f"G{int(t[1:]) // 2}" for t in team],
+        "position": np.array(["G", "F", "C"])[rng.integers(0, 3, players)],
+        "salary": rng.integers(3000, 11000, players),
+        "probability": rng.uniform(0.35, 0.75, players),
+        "projection": rng.normal(25, 8, players).clip(0),
+    })
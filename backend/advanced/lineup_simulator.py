@@ -0,0 +1,137 @@
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtri
+
+# Multiplier per number of hits, by entry size (pick'em style payouts)
+POWER_PAYOUTS = {2: {2: 3.0}, 3: {3: 5.0}, 4: {4: 10.0}, 5: {5: 20.0}, 6: {6: 37.5}}
+FLEX_PAYOUTS = {
+    3: {3: 2.25, 2: 1.25},
+    4: {4: 5.0, 3: 1.5},
+    5: {5: 10.0, 4: 2.0, 3: 0.4},
+    6: {6: 25.0, 5: 2.0, 4: 0.4},
+}
+PAYOUT_TABLES = {"power": POWER_PAYOUTS, "flex": FLEX_PAYOUTS}
+
+
+class LineupSimulator:
+    """Monte Carlo outcomes for a set of lineups over one shared player pool.
+
+    Each leg hits when its latent normal falls below ``Phi^-1(p)``. Latents
+    share one factor per game and one per team (Gaussian copula), giving
+    correlation ``rho_game`` between legs in the same game and ``rho_team``
+    (>= ``rho_game``) between teammates. Every lineup is scored on the same
+    draws, chunk by chunk, so memory is bounded by ``chunk_size`` x players.
+    """
+
+    def __init__(
+        self,
+        pool: pd.DataFrame,
+        lineups: Sequence[Sequence[int]],
+        rho_team: float = 0.15,
+        rho_game: float = 0.05,
+        payouts: Optional[Dict[int, Dict[int, float]]] = None,
+    ) -> None:
+        if not 0.0 <= rho_game <= rho_team < 1.0:
+            raise ValueError("Need 0 <= rho_game <= rho_team < 1")
+        self.n_players = len(pool)
+        p = pd.to_numeric(pool["probability"], errors="coerce").clip(1e-6, 1 - 1e-6).to_numpy()
+        self.thresholds = ndtri(p)
+        self.team_codes, teams = pd.factorize(pool["team"].fillna("").astype(str)) if "team" in pool else (np.zeros(self.n_players, int), [""])
+        self.game_codes, games = pd.factorize(pool["matchup"].fillna("").astype(str)) if "matchup" in pool else (np.zeros(self.n_players, int), [""])
+        self.n_teams, self.n_games = len(teams), len(games)
+        self.w_game = np.sqrt(rho_game)
+        self.w_team = np.sqrt(rho_team - rho_game)
+        self.w_own = np.sqrt(1.0 - rho_team)
+
+        table = payouts or POWER_PAYOUTS
+        for lineup in lineups:
+            if len(set(lineup)) != len(lineup):
+                raise ValueError("A lineup lists the same leg more than once")
+            if len(lineup) not in table:
+                raise ValueError(f"No payouts for {len(lineup)}-leg lineups; sizes: {sorted(table)}")
+        self.sizes = np.array([len(lineup) for lineup in lineups])
+        self.membership = np.zeros((self.n_players, len(lineups)), dtype=np.float32)
+        for j, lineup in enumerate(lineups):
+            self.membership[list(lineup), j] = 1.0
+        # payout_matrix[j, hits] -> multiplier for lineup j
+        self.payout_matrix = np.zeros((len(lineups), self.sizes.max() + 1))
+        for j, size in enumerate(self.sizes):
+            for hits, multiplier in table[int(size)].items():
+                self.payout_matrix[j, hits] = multiplier
+
+    def draw_hits(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        game = rng.standard_normal((n, self.n_games))
+        team = rng.standard_normal((n, self.n_teams))
+        own = rng.standard_normal((n, self.n_players))
+        latent = self.w_game * game[:, self.game_codes] + self.w_team * team[:, self.team_codes] + self.w_own * own
+        return latent < self.thresholds
+
+    def iter_summaries(self, simulations: int = 100_000, chunk_size: int = 10_000, seed: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield a running summary after every chunk; the last one covers all draws."""
+        rng = np.random.default_rng(seed)
+        n_lineups = self.membership.shape[1]
+        columns = np.arange(n_lineups)
+        payout_sum = np.zeros(n_lineups)
+        payout_sq = np.zeros(n_lineups)
+        all_hit = np.zeros(n_lineups)
+        profit = np.zeros(n_lineups)
+        hits_sum = np.zeros(n_lineups)
+        done = 0
+        started = time.perf_counter()
+        while done < simulations:
+            n = min(chunk_size, simulations - done)
+            hits = (self.draw_hits(rng, n).astype(np.float32) @ self.membership).astype(np.int64)
+            payout = self.payout_matrix[columns, hits]
+            payout_sum += payout.sum(axis=0)
+            payout_sq += np.square(payout).sum(axis=0)
+            all_hit += (hits == self.sizes).sum(axis=0)
+            profit += (payout > 1.0).sum(axis=0)
+            hits_sum += hits.sum(axis=0)
+            done += n
+            mean = payout_sum / done
+            std = np.sqrt(np.maximum(payout_sq / done - mean ** 2, 0.0))
+            yield {
+                "simulations": done,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+                "lineups": [
+                    {
+                        "expected_payout": float(mean[j]),
+                        "payout_std": float(std[j]),
+                        "stderr": float(std[j] / np.sqrt(done)),
+                        "win_probability": float(all_hit[j] / done),
+                        "profit_probability": float(profit[j] / done),
+                        "mean_hits": float(hits_sum[j] / done),
+                    }
+                    for j in range(n_lineups)
+                ],
+            }
+
+    def run(self, simulations: int = 100_000, chunk_size: int = 10_000, seed: Optional[int] = None) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {}
+        for summary in self.iter_summaries(simulations, chunk_size, seed):
+            pass
+        return summary
+
+
+def lineups_from_players(lineups: Sequence[Sequence[Dict[str, Any]]]) -> Tuple[pd.DataFrame, List[List[int]]]:
+    """Flatten lineups of player records into one pool plus index lists.
+
+    Legs are keyed by (player, team, matchup, market) so a leg shared by two
+    lineups is simulated once and stays consistent across them.
+    """
+    pool: List[Dict[str, Any]] = []
+    seen: Dict[Any, int] = {}
+    indexed = []
+    for lineup in lineups:
+        legs = []
+        for leg in lineup:
+            key = (leg.get("player") or leg.get("name") or leg.get("id"), leg.get("team"), leg.get("matchup"), leg.get("market"))
+            if key not in seen:
+                seen[key] = len(pool)
+                pool.append(leg)
+            legs.append(seen[key])
+        indexed.append(legs)
+    return pd.DataFrame.from_records(pool), indexed
@@ -1,10 +1,23 @@
 import pandas as pd
-import os
-from .train_predict import train_final_model
+from core.columnar_store import load_predictions_table
+from .feature_store import FeatureStore
+from .model_registry import get_current_model
 
 
 def predict_optimal_lineup():
-    df = pd.read_csv(os.path.join("data", "predictions_latest.csv")) if os.path.exists("data/predictions_latest.csv") else pd.DataFrame()
-    model, accuracy = train_final_model()
-    df["predicted_outcome"] = model.predict(df.drop(columns=["actual_outcome"], errors='ignore'))
-    return df, accuracy
\ No newline at end of file
+    # Inference only: the model is trained and registered by train_predict
+    artifacts = get_current_model()
+    if artifacts is None:
+        raise RuntimeError("No trained model registered; run python -m advanced.train_predict")
+    try:
+        df = load_predictions_table()
+    except FileNotFoundError:
+        df = pd.DataFrame()
+    if df.empty:
+        return df, artifacts.metrics.get("accuracy")
+    if any(name not in df.columns for name in artifacts.feature_names):
+        # Upcoming games: rolling features come from the store kept current
+        # by training, not from a pass over the full history
+        df = FeatureStore().upcoming(df)
+    df["predicted_outcome"] = artifacts.predict(df.drop(columns=["actual_outcome"], errors='ignore'))
+    return df, artifacts.metrics.get("accuracy")
@@ -0,0 +1,153 @@
+import json
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from core.data_store import DATA_DIR, SnapshotStore
+
+MODELS_DIR = os.path.join(DATA_DIR, "models")
+CURRENT_POINTER = os.path.join(MODELS_DIR, "current.json")
+
+
+@dataclass(frozen=True)
+class ModelArtifacts:
+    """Everything inference needs from one training run.
+
+    ``feature_names`` are the columns the scaler was fitted on and
+    ``feature_mask`` selects the ones the model was trained with.
+    """
+    version: str
+    model: Any
+    scaler: Any
+    feature_mask: np.ndarray
+    feature_names: List[str]
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    sample: Optional[pd.DataFrame] = None
+
+    @property
+    def selected_features(self) -> List[str]:
+        return [name for name, keep in zip(self.feature_names, self.feature_mask) if keep]
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        X = self.scaler.transform(df[self.feature_names])
+        return X[:, self.feature_mask]
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        return self.model.predict(self.transform(df))
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        return self.model.predict_proba(self.transform(df))
+
+
+def _write_json(path: str, payload: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+def save_model(
+    model: Any,
+    scaler: Any,
+    feature_mask: np.ndarray,
+    feature_names: List[str],
+    metrics: Dict[str, Any],
+    metadata: Optional[Dict[str, Any]] = None,
+    sample: Optional[pd.DataFrame] = None,
+    make_current: bool = True,
+) -> str:
+    """Persist one training run as a new immutable version and return its id.
+
+    Artifacts are written to a staging directory that is renamed into place,
+    then ``current.json`` is swapped to point at it, so a loader never sees a
+    partially written version.
+    """
+    version = time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    staging = os.path.join(MODELS_DIR, f".{version}.tmp")
+    os.makedirs(staging)
+    try:
+        joblib.dump(model, os.path.join(staging, "model.joblib"))
+        joblib.dump(scaler, os.path.join(staging, "scaler.joblib"))
+        np.save(os.path.join(staging, "feature_mask.npy"), np.asarray(feature_mask, dtype=bool))
+        if sample is not None:
+            joblib.dump(sample, os.path.join(staging, "sample.joblib"))
+        _write_json(os.path.join(staging, "metrics.json"), metrics)
+        _write_json(os.path.join(staging, "metadata.json"), {
+            **(metadata or {}),
+            "version": version,
+            "created_at": time.time(),
+            "feature_names": list(feature_names),
+        })
+        os.rename(staging, os.path.join(MODELS_DIR, version))
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    if make_current:
+        set_current(version)
+    return version
+
+
+def set_current(version: str) -> None:
+    """Point the registry at ``version``; running loaders pick it up on next use."""
+    if not os.path.isdir(os.path.join(MODELS_DIR, version)):
+        raise FileNotFoundError(f"Unknown model version: {version}")
+    _write_json(CURRENT_POINTER, {"version": version, "updated_at": time.time()})
+
+
+def current_version() -> Optional[str]:
+    try:
+        with open(CURRENT_POINTER, encoding="utf-8") as f:
+            return json.load(f).get("version")
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def list_versions() -> List[str]:
+    if not os.path.isdir(MODELS_DIR):
+        return []
+    return sorted(
+        name for name in os.listdir(MODELS_DIR)
+        if not name.startswith(".") and os.path.isdir(os.path.join(MODELS_DIR, name))
+    )
+
+
+def load_model(version: str) -> ModelArtifacts:
+    path = os.path.join(MODELS_DIR, version)
+    with open(os.path.join(path, "metadata.json"), encoding="utf-8") as f:
+        metadata = json.load(f)
+    with open(os.path.join(path, "metrics.json"), encoding="utf-8") as f:
+        metrics = json.load(f)
+    sample_path = os.path.join(path, "sample.joblib")
+    return ModelArtifacts(
+        version=version,
+        model=joblib.load(os.path.join(path, "model.joblib")),
+        scaler=joblib.load(os.path.join(path, "scaler.joblib")),
+        feature_mask=np.load(os.path.join(path, "feature_mask.npy")),
+        feature_names=metadata["feature_names"],
+        metadata=metadata,
+        metrics=metrics,
+        sample=joblib.load(sample_path) if os.path.exists(sample_path) else None,
+    )
+
+
+def _load_current() -> Optional[ModelArtifacts]:
+    version = current_version()
+    return load_model(version) if version is not None else None
+
+
+# Current model, reloaded only when current.json changes
+model_store = SnapshotStore([CURRENT_POINTER], _load_current, name="model")
+
+
+def get_current_model() -> Optional[ModelArtifacts]:
+    snapshot = model_store.get()
+    return snapshot.data if snapshot is not None else None
@@ -1,57 +1,158 @@
+import logging
+import math
+import os
+import time
+from contextlib import contextmanager
 
 import numpy as np
 import pandas as pd
+from joblib import effective_n_jobs, parallel_backend
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, StackingClassifier
 from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import cross_val_score, train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.feature_selection import RFE
 from sklearn.metrics import accuracy_score
 from xgboost import XGBClassifier
 from skopt import BayesSearchCV
+from core.columnar_store import load_predictions_table
+from advanced.model_registry import save_model
+from advanced.feature_engine import compute_features
+from advanced.feature_store import FeatureStore
 
-def load_data(path="backend/data/predictions_latest.csv"):
+logger = logging.getLogger("app.training")
+
+# Worker processes for CV folds and search candidates (-1 = all cores)
+N_JOBS = int(os.getenv("TRAIN_N_JOBS", "-1"))
+
+@contextmanager
+def stage(report, name):
+    """Time one pipeline stage; the body may set report[name]["best_score"]."""
+    entry = report.setdefault(name, {})
+    started = time.perf_counter()
+    try:
+        yield entry
+    finally:
+        entry["seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(f"train stage {name}: {entry['seconds']}s, best score {entry.get('best_score')}")
+
+def load_data(path=None):
+    # Canonical columnar table by default; an explicit path is read as CSV
+    if path is None:
+        return load_predictions_table()
     df = pd.read_csv(path)
     return df
 
-def time_series_features(df, window=5):
-    df = df.sort_values(["team", "match_date"])
-    df['avg_goals_last_5'] = df.groupby('team')['goals'].rolling(window=window).mean().reset_index(level=0, drop=True)
-    df['win_streak'] = df.groupby('team')['win'].apply(lambda x: x * (x.groupby((x != x.shift()).cumsum()).cumcount() + 1))
-    return df
+def time_series_features(df, windows=(5,), ewm_spans=(5,), store=None):
+    # Each row only sees the team's earlier games, so the current result (the
+    # label) never feeds its own rolling/EWM features. A feature store folds
+    # in only the games newer than its state and looks the rest up
+    # point-in-time; without one the whole frame is computed in one pass
+    if store is not None:
+        store.sync(df)
+        return store.lookup(df)
+    return compute_features(df, windows=windows, ewm_spans=ewm_spans, rest_days=True, include_current=False)
 
-def recursive_elimination(X, y):
-    model = RandomForestClassifier(n_estimators=100)
-    rfe = RFE(model, n_features_to_select=10)
-    X_rfe = rfe.fit_transform(X, y)
-    return X_rfe
+def recursive_elimination(X, y, step=0.2, min_features=10, patience=2, cv=3, n_jobs=N_JOBS):
+    # Drops the weakest `step` fraction of features per round, scoring each
+    # subset by CV; stops once `patience` rounds pass without improvement
+    support = np.ones(X.shape[1], dtype=bool)
+    best_support, best_score, stale = support.copy(), -np.inf, 0
+    while True:
+        fold_model = RandomForestClassifier(n_estimators=100, n_jobs=1)
+        score = cross_val_score(fold_model, X[:, support], y, cv=cv, n_jobs=n_jobs).mean()
+        if score > best_score:
+            best_support, best_score, stale = support.copy(), score, 0
+        else:
+            stale += 1
+        n_features = int(support.sum())
+        if stale >= patience or n_features <= min_features:
+            break
+        model = RandomForestClassifier(n_estimators=100, n_jobs=n_jobs)
+        importances = model.fit(X[:, support], y).feature_importances_
+        n_drop = min(max(1, math.floor(n_features * step)), n_features - min_features)
+        kept = np.flatnonzero(support)
+        support[kept[np.argsort(importances)[:n_drop]]] = False
+    return X[:, best_support], best_support, best_score
 
-def bayesian_optimize(X, y):
-    model = XGBClassifier(eval_metric='logloss', use_label_encoder=False)
+def bayesian_optimize(X, y, X_val, y_val, n_iter=20, cv=3, n_jobs=N_JOBS):
+    # Each candidate is single-threaded hist XGBoost with early stopping on the
+    # validation fold; candidates and CV folds are spread across the pool
+    model = XGBClassifier(
+        eval_metric='logloss', tree_method='hist', n_estimators=500,
+        early_stopping_rounds=20, n_jobs=1
+    )
     search = BayesSearchCV(
         model,
         {"max_depth": (3, 10), "learning_rate": (0.01, 0.3, 'log-uniform')},
-        n_iter=20, cv=3
+        n_iter=n_iter, cv=cv, n_jobs=n_jobs,
+        n_points=max(1, effective_n_jobs(n_jobs) // cv)
     )
-    search.fit(X, y)
-    return search.best_estimator_
+    with parallel_backend("loky"):
+        search.fit(X, y, eval_set=[(X_val, y_val)], verbose=False)
+    return search.best_estimator_, search.best_score_
 
-def train_final_model():
-    df = load_data()
-    df = time_series_features(df)
-    df.dropna(inplace=True)
+def fit_pipeline(df=None, store=None):
+    report = {}
+    with stage(report, "load"):
+        if df is None:
+            # The canonical table grows daily; its features are kept in the
+            # shared store so a run only processes the new games
+            df = load_data()
+            store = FeatureStore() if store is None else store
+        df = time_series_features(df, store=store)
+        df.dropna(inplace=True)
     y = df['outcome']
     X = df.drop(columns=['match_date', 'outcome'])
 
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(X)
-    X_selected = recursive_elimination(X_scaled, y)
-
-    best_model = bayesian_optimize(X_selected, y)
+    with stage(report, "feature_selection") as entry:
+        X_selected, support, entry["best_score"] = recursive_elimination(X_scaled, y)
 
     X_train, X_test, y_train, y_test = train_test_split(X_selected, y, test_size=0.2)
-    best_model.fit(X_train, y_train)
-    preds = best_model.predict(X_test)
-    acc = accuracy_score(y_test, preds)
+    # Validation fold for XGBoost early stopping, kept out of the search folds
+    X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=0.2)
+    with stage(report, "hyperparameter_search") as entry:
+        best_model, entry["best_score"] = bayesian_optimize(X_fit, y_fit, X_val, y_val)
+
+    # The search already refit best_estimator_ on X_fit (refit=True); fitting
+    # it again would only repeat that work
+    with stage(report, "evaluate") as entry:
+        preds = best_model.predict(X_test)
+        acc = accuracy_score(y_test, preds)
+        entry["best_score"] = acc
+
+    return {
+        "model": best_model,
+        "scaler": scaler,
+        "feature_mask": support,
+        "feature_names": list(X.columns),
+        "accuracy": acc,
+        "rows": len(df),
+        "stages": report,
+        # Scaled, selected rows kept for explainability
+        "sample": pd.DataFrame(X_test, columns=list(X.columns[support])),
+    }
+
+def train_final_model():
+    fitted = fit_pipeline()
+    return fitted["model"], fitted["accuracy"]
+
+def train_and_register(df=None):
+    """Training job: fit the full pipeline and publish it as the current model."""
+    fitted = fit_pipeline(df)
+    version = save_model(
+        fitted["model"],
+        fitted["scaler"],
+        fitted["feature_mask"],
+        fitted["feature_names"],
+        metrics={"accuracy": float(fitted["accuracy"]), "stages": fitted["stages"]},
+        metadata={"rows": fitted["rows"], "model_class": type(fitted["model"]).__name__},
+        sample=fitted["sample"],
+    )
+    return version, fitted["accuracy"]
 
-    return best_model, acc
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    version, acc = train_and_register()
+    print(f"Registered model {version} (accuracy {acc:.3f})")
@@ -1,14 +1,68 @@
-from fastapi import APIRouter, HTTPException
+import io
+import json
+import time
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from advanced.model_registry import get_current_model
+from core.config import Config
+from core.micro_batcher import MicroBatcher
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # Arrow bodies are rejected without pyarrow
+    pa = None
+
 router = APIRouter()
 
+ARROW_STREAM_TYPES = ("application/vnd.apache.arrow.stream",)
+ARROW_FILE_TYPES = ("application/vnd.apache.arrow.file", "application/octet-stream")
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+# Rows serialized per streamed chunk
+STREAM_CHUNK_ROWS = 2000
+
 class PredictionRequest(BaseModel):
     team1: str
     team2: str
+    # Model feature values; when given the request is scored by the registered model
+    features: Optional[Dict[str, float]] = None
+
+def predict_rows(rows):
+    # Runs in a worker thread with every request collected in one batch window
+    artifacts = get_current_model()
+    if artifacts is None:
+        raise HTTPException(status_code=503, detail="No trained model registered")
+    result = score_batch(artifacts, pd.DataFrame.from_records(rows))
+    return [
+        {"prediction": prediction, "probability": probability, "model_version": artifacts.version}
+        for prediction, probability in zip(result["prediction"].tolist(), result["probability"].tolist())
+    ]
+
+model_batcher = MicroBatcher(
+    predict_rows,
+    max_batch=Config.MICRO_BATCH_MAX_SIZE,
+    max_wait_ms=Config.MICRO_BATCH_MAX_WAIT_MS,
+    name="predict",
+)
 
 @router.post("/predict")
 async def predict(request: PredictionRequest):
+    if request.features is not None:
+        # Validate before queueing so one bad request cannot fail its whole batch
+        artifacts = get_current_model()
+        if artifacts is None:
+            raise HTTPException(status_code=503, detail="No trained model registered")
+        missing = [name for name in artifacts.feature_names if name not in request.features]
+        if missing:
+            raise HTTPException(status_code=422, detail={"missing_features": missing})
+        return await model_batcher.submit(request.features)
     try:
         # Dummy prediction logic
         if request.team1 == "Lakers" and request.team2 == "Warriors":
@@ -17,3 +71,66 @@ async def predict(request: PredictionRequest):
             return {"prediction": "Match result uncertain."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+def parse_batch(body, content_type):
+    """Decode a batch body (Arrow IPC, JSON lines or a JSON array) into a frame."""
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in ARROW_STREAM_TYPES + ARROW_FILE_TYPES:
+        if pa is None:
+            raise HTTPException(status_code=415, detail="Arrow bodies need pyarrow on the server")
+        reader = pa_ipc.open_stream(body) if media_type in ARROW_STREAM_TYPES else pa_ipc.open_file(pa.BufferReader(body))
+        return reader.read_all().to_pandas()
+    if media_type in NDJSON_TYPES:
+        return pd.read_json(io.BytesIO(body), lines=True)
+    rows = json.loads(body)
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of rows")
+    return pd.DataFrame.from_records(rows)
+
+def score_batch(artifacts, df):
+    # One vectorized predict_proba over the whole slate
+    missing = [name for name in artifacts.feature_names if name not in df.columns]
+    if missing:
+        raise HTTPException(status_code=422, detail={"missing_features": missing})
+    proba = artifacts.predict_proba(df)
+    classes = np.asarray(artifacts.model.classes_)
+    result = pd.DataFrame({
+        "row": np.arange(len(df)),
+        "prediction": classes[proba.argmax(axis=1)],
+        "probability": proba[:, -1],
+    })
+    if "id" in df.columns:
+        result.insert(1, "id", df["id"].to_numpy())
+    return result
+
+def _ndjson_chunks(result):
+    for start in range(0, len(result), STREAM_CHUNK_ROWS):
+        lines = result.iloc[start:start + STREAM_CHUNK_ROWS].to_json(orient="records", lines=True, double_precision=6)
+        # Older pandas omits the trailing newline
+        yield (lines if lines.endswith("\n") else lines + "\n").encode("utf-8")
+
+@router.get("/predict/stats")
+async def predict_stats():
+    return model_batcher.stats()
+
+@router.post("/predict/batch")
+async def predict_batch(request: Request):
+    artifacts = get_current_model()
+    if artifacts is None:
+        raise HTTPException(status_code=503, detail="No trained model registered")
+    body = await request.body()
+    started = time.perf_counter()
+    try:
+        df = await run_in_threadpool(parse_batch, body, request.headers.get("content-type", "application/json"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Malformed batch body: {e}")
+    if df.empty:
+        raise HTTPException(status_code=400, detail="Empty batch")
+    result = await run_in_threadpool(score_batch, artifacts, df)
+    elapsed = time.perf_counter() - started
+    headers = {
+        "X-Model-Version": artifacts.version,
+        "X-Rows": str(len(result)),
+        "X-Rows-Per-Second": f"{len(result) / max(elapsed, 1e-9):.0f}",
+    }
+    return StreamingResponse(_ndjson_chunks(result), media_type="application/x-ndjson", headers=headers)
@@ -1,10 +1,21 @@
 import os
+import sys
 import pandas as pd
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from core.columnar_store import MANIFEST_PATH, read_manifest, read_predictions
+
 csv_path = os.path.join("backend", "data", "predictions_latest.csv")
 
-# Check existence and contents
-if not os.path.exists(csv_path):
+# Check the columnar store first, then the legacy CSV export
+manifest = read_manifest()
+if manifest is not None:
+    df = read_predictions()
+    print("Columnar store found:", MANIFEST_PATH)
+    print("Partitions:", len(manifest["partitions"]), "Number of rows:", len(df))
+    print("Columns:", df.columns.tolist())
+    print(df.head())
+elif not os.path.exists(csv_path):
     print("File not found:", csv_path)
 else:
     df = pd.read_csv(csv_path)
@@ -1,46 +1,280 @@
-import logging
-import sys
 import atexit
+import copy
+import json
+import logging
+import os
+import queue
 import signal
-from types import FrameType
-from typing import Any, Optional, Type
+import sys
+import threading
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from types import FrameType
+from typing import Any, Dict, List, Optional, Type
+
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "64"))
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+LOG_ROTATE_SECONDS = float(os.getenv("LOG_ROTATE_SECONDS", "86400"))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_JSON = os.getenv("LOG_JSON", "False").lower() in ("true", "1", "t")
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+_traceback_formatter = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record (JSON lines)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: a record that finds the queue full is
+    counted and dropped, so a slow disk cannot stall the caller."""
+
+    def __init__(self, log_queue: "queue.Queue[Any]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.enqueued = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now (they may change after the call) but leave the
+        # formatting, traceback text aside, to the listener's handlers
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchStreamHandler(logging.StreamHandler):
+    """Writes a whole batch of records with one write and one flush."""
+
+    def emit_batch(self, records: List[logging.LogRecord]) -> None:
+        try:
+            self.stream.write("".join(self.format(r) + self.terminator for r in records))
+            self.flush()
+        except Exception:
+            self.handleError(records[-1])
+
+
+class BatchFileHandler(BatchStreamHandler):
+    """Batched file writes with size- and age-based rotation.
+
+    The file rolls over to ``<path>.1`` (older ones shift up to
+    ``backup_count``) when a batch would push it past ``max_bytes`` or when
+    it is older than ``rotate_seconds``.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = LOG_MAX_BYTES, rotate_seconds: float = LOG_ROTATE_SECONDS,
+                 backup_count: int = LOG_BACKUP_COUNT) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        super().__init__(self._open())
+
+    def _open(self):
+        self.opened_at = time.time()
+        stream = open(self.path, "a", encoding="utf-8")
+        self.size = stream.tell()
+        return stream
+
+    def _rotate(self) -> None:
+        self.stream.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{i}")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backup_count > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self.stream = self._open()
+
+    def emit_batch(self, records: List[logging.LogRecord]) -> None:
+        try:
+            text = "".join(self.format(r) + self.terminator for r in records)
+            # max_bytes is a file size: count encoded bytes, not characters
+            size = len(text.encode("utf-8"))
+            too_big = self.max_bytes and self.size and self.size + size > self.max_bytes
+            too_old = self.rotate_seconds and time.time() - self.opened_at > self.rotate_seconds
+            if too_big or too_old:
+                self._rotate()
+            self.stream.write(text)
+            self.flush()
+            self.size += size
+        except Exception:
+            self.handleError(records[-1])
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.emit_batch([record])
+
+
+class BatchingQueueListener(QueueListener):
+    """Drains the log queue on its own thread, handing each handler every
+    record already waiting (up to ``batch_size``) in one call."""
+
+    def __init__(self, log_queue: "queue.Queue[Any]", *handlers: logging.Handler,
+                 batch_size: int = LOG_BATCH_SIZE, source: Optional[DroppingQueueHandler] = None) -> None:
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self.source = source
+        self._reported_drops = 0
+        self.batches = 0
+
+    def enqueue_sentinel(self) -> None:
+        # The queue is bounded: wait for room rather than lose the stop signal
+        self.queue.put(self._sentinel, timeout=5)
+
+    def _dropped_record(self) -> Optional[logging.LogRecord]:
+        dropped = self.source.dropped if self.source is not None else 0
+        if dropped == self._reported_drops:
+            return None
+        record = logging.LogRecord(
+            "app.logging", logging.WARNING, __file__, 0,
+            f"Log queue full: dropped {dropped - self._reported_drops} records ({dropped} total)", None, None,
+        )
+        self._reported_drops = dropped
+        return record
+
+    def _monitor(self) -> None:
+        q = self.queue
+        stopping = False
+        while not stopping:
+            batch = [q.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            if self._sentinel in batch:
+                stopping = True
+                batch = [r for r in batch if r is not self._sentinel]
+            notice = self._dropped_record()
+            if notice is not None:
+                batch.append(notice)
+            if batch:
+                self.handle_batch(batch)
+                self.batches += 1
+
+    def handle_batch(self, records: List[logging.LogRecord]) -> None:
+        for handler in self.handlers:
+            wanted = [r for r in records if r.levelno >= handler.level]
+            if not wanted:
+                continue
+            if hasattr(handler, "emit_batch"):
+                handler.emit_batch(wanted)
+            else:
+                for record in wanted:
+                    handler.handle(record)
+
 
 class AutoExportLogger:
-    def __init__(self, name: str = "app", log_dir: str = "logs") -> None:
+    """Session logger for the app.
+
+    Log calls only enqueue the record on a bounded queue; a listener thread
+    writes batches to the session file (rotated by size/age, optionally as
+    JSON lines) and to the console. When the queue is full, records are
+    dropped and counted instead of blocking the request that logged them.
+    """
+
+    def __init__(self, name: str = "app", log_dir: str = "logs", json_lines: bool = LOG_JSON) -> None:
+        self.logger = logging.getLogger(name)
+        existing = getattr(self.logger, "_auto_export", None)
+        if existing is not None:
+            # Imported under a second module name: share the running pipeline
+            self.__dict__.update(existing.__dict__)
+            return
+
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
         self.session_id = datetime.now().strftime('%Y%m%d_%H%M%S')
-        log_file = self.log_dir / f"session_{self.session_id}.log"
+        suffix = "jsonl" if json_lines else "log"
+        self.log_file = self.log_dir / f"session_{self.session_id}.{suffix}"
 
-        self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.DEBUG)
+        text = logging.Formatter(TEXT_FORMAT)
 
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-
-        fh = logging.FileHandler(log_file, encoding="utf-8")
+        fh = BatchFileHandler(self.log_file)
         fh.setLevel(logging.DEBUG)
-        fh.setFormatter(formatter)
+        fh.setFormatter(JsonFormatter() if json_lines else text)
 
-        ch = logging.StreamHandler()
+        ch = BatchStreamHandler()
         ch.setLevel(logging.INFO)
-        ch.setFormatter(formatter)
+        ch.setFormatter(text)
 
-        self.logger.addHandler(fh)
-        self.logger.addHandler(ch)
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self.queue_handler = DroppingQueueHandler(self.queue)
+        self.listener = BatchingQueueListener(self.queue, fh, ch, source=self.queue_handler)
+        self.listener.start()
+        self.logger.addHandler(self.queue_handler)
+        self.logger._auto_export = self
+        self._exported = False
+        self._export_lock = threading.Lock()
 
-        # Register global exception and signal handlers
+        # Register global exception and signal handlers; signals can only be
+        # set from the main thread
         sys.excepthook = self.handle_exception
-        signal.signal(signal.SIGTERM, self.signal_handler)
-        signal.signal(signal.SIGINT, self.signal_handler)
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.signal_handler)
+            signal.signal(signal.SIGINT, self.signal_handler)
 
+        # atexit runs last-in first-out: export, then drain the queue
+        atexit.register(self.close)
         atexit.register(self.export_logs)
         self.logger.info(f"Logger started - Session: {self.session_id}")
 
+    def close(self) -> None:
+        """Flush everything queued and stop the listener thread."""
+        if self.listener._thread is not None:
+            self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": "logging",
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "enqueued": self.queue_handler.enqueued,
+            "dropped": self.queue_handler.dropped,
+            "batches": self.listener.batches,
+            "file": str(self.log_file),
+        }
+
     def export_logs(self) -> None:
+        # Signals and crashes export directly, then atexit calls this again
+        with self._export_lock:
+            if self._exported:
+                return
+            self._exported = True
         self.logger.info("Exporting logs...")
-        print(f"\nLogs saved to: logs/session_{self.session_id}.log")
+        print(f"\nLogs saved to: {self.log_file}")
 
     def handle_exception(self, exc_type: Type[BaseException], exc_value: BaseException, exc_traceback: Optional[Any]) -> None:
         if issubclass(exc_type, KeyboardInterrupt):
@@ -55,5 +289,6 @@ class AutoExportLogger:
         self.export_logs()
         sys.exit(0)
 
+
 # Global logger
 logger = AutoExportLogger()
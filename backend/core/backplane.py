@@ -0,0 +1,416 @@
+import abc
+import asyncio
+import errno
+import hashlib
+import json
+import logging
+import os
+import queue
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, and no multi-worker deployment either
+    fcntl = None
+
+from core.broadcaster import Message
+from core.config import Config
+from core.data_store import DATA_DIR
+
+logger = logging.getLogger("app.backplane")
+
+Deliver = Callable[[List[Message]], None]
+
+# Keep datagrams well under the kernel's default socket buffer (~208 KB)
+MAX_DATAGRAM = 60_000
+# Longest AF_UNIX path bind() accepts everywhere we run (104 on macOS, 108 on
+# Linux, both counting the trailing NUL)
+MAX_SOCKET_PATH = 103
+# Peers are re-listed at least this often, in case a worker joined within the
+# directory's mtime granularity
+PEERS_TTL_SECONDS = 1.0
+
+
+def _hashable(value: Any) -> Any:
+    # JSON turns the tuple keys of coalescing messages into lists
+    return tuple(_hashable(v) for v in value) if isinstance(value, list) else value
+
+
+def pack(origin: str, seq: int, messages: List[Message]) -> bytes:
+    """Envelope for one batch; message texts are carried as already encoded."""
+    return json.dumps({
+        "o": origin,
+        "s": seq,
+        "m": [[m.topic, m.text, m.key, m.sport, sorted(m.teams), sorted(m.players)] for m in messages],
+    }, separators=(",", ":")).encode()
+
+
+def unpack(data: bytes) -> Dict[str, Any]:
+    envelope = json.loads(data)
+    envelope["m"] = [
+        Message(topic, text, _hashable(key), sport, frozenset(teams), frozenset(players))
+        for topic, text, key, sport, teams, players in envelope["m"]
+    ]
+    return envelope
+
+
+class Backplane(abc.ABC):
+    """Relays broadcaster messages between worker processes.
+
+    Every envelope carries its origin and a per-origin sequence number, so a
+    receiver notices lost envelopes. It then tells its clients to ``resync``
+    (re-read /api/predictions/changes) instead of silently missing updates.
+    Envelopes from this process are ignored on receipt: the broadcaster has
+    already delivered them locally.
+    """
+
+    name = "backplane"
+
+    def __init__(self) -> None:
+        self.origin = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+        self._last_seq: Dict[str, int] = {}
+        self._deliver: Optional[Deliver] = None
+        self.sent = 0
+        self.received = 0
+        self.gaps = 0
+        self.errors = 0
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    def close(self) -> None:
+        self._deliver = None
+
+    def _next_seq(self) -> int:
+        with self._seq_lock:
+            self._seq += 1
+            return self._seq
+
+    def _batches(self, messages: List[Message]):
+        """Split into envelopes under MAX_DATAGRAM; each gets its own seq."""
+        batch: List[Message] = []
+        size = 0
+        for message in messages:
+            cost = len(message.text) + 128
+            if batch and size + cost > MAX_DATAGRAM:
+                yield batch
+                batch, size = [], 0
+            batch.append(message)
+            size += cost
+        if batch:
+            yield batch
+
+    def publish(self, messages: List[Message]) -> None:
+        for batch in self._batches(messages):
+            try:
+                self.send(pack(self.origin, self._next_seq(), batch))
+                self.sent += 1
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"{self.name} publish failed: {e}")
+
+    @abc.abstractmethod
+    def send(self, data: bytes) -> None:
+        """Deliver one packed envelope to the other workers."""
+
+    def on_envelope(self, data: bytes) -> None:
+        try:
+            envelope = unpack(data)
+        except (ValueError, TypeError) as e:
+            self.errors += 1
+            logger.warning(f"{self.name} dropped a malformed envelope: {e}")
+            return
+        origin, seq = envelope["o"], envelope["s"]
+        if origin == self.origin:
+            return
+        self.received += 1
+        last = self._last_seq.get(origin)
+        self._last_seq[origin] = seq
+        deliver = self._deliver
+        if deliver is None:
+            return
+        if last is not None and seq > last + 1:
+            missed = seq - last - 1
+            self.gaps += missed
+            logger.warning(f"{self.name}: missed {missed} envelopes from {origin}")
+            deliver([Message("resync", json.dumps({"topic": "resync", "data": {"origin": origin, "missed": missed}}),
+                             key=("resync", origin))])
+        deliver(envelope["m"])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "origin": self.origin,
+            "sent": self.sent,
+            "received": self.received,
+            "gaps": self.gaps,
+            "errors": self.errors,
+            "peers_seen": len(self._last_seq),
+        }
+
+
+class UnixSocketBackplane(Backplane):
+    """Same-host backplane over Unix datagram sockets.
+
+    Each worker binds ``<directory>/<origin>.sock`` and sends every envelope
+    to all other sockets in the directory; sockets of dead workers are
+    removed on the first failed send. Receiving is an event-loop reader, so
+    nothing blocks. A datagram a full peer cannot take is dropped and shows
+    up there as a gap. A directory too deep for AF_UNIX paths is swapped for
+    a short one (``socket_dir``); a socket that still cannot be bound leaves
+    the worker serving only its own clients.
+    """
+
+    name = "unix"
+
+    def __init__(self, directory: str) -> None:
+        super().__init__()
+        self.directory = socket_dir(directory)
+        self.path = os.path.join(self.directory, f"{self.origin}.sock")
+        self._sock: Optional[socket.socket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._peers: List[str] = []
+        self._peers_mtime = -1
+        self._peers_listed_at = 0.0
+
+    def start(self, deliver: Deliver) -> None:
+        super().start(deliver)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            sock.bind(self.path)
+        except OSError as e:
+            # The worker still serves its own clients; it just cannot relay
+            sock.close()
+            self.errors += 1
+            logger.warning(f"Unix backplane disabled, cannot bind {self.path}: {e}")
+            return
+        sock.setblocking(False)
+        self._sock = sock
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self._sock.fileno(), self._on_readable)
+        logger.info(f"Unix backplane listening on {self.path}")
+
+    def close(self) -> None:
+        super().close()
+        if self._sock is not None:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    def _on_readable(self) -> None:
+        while self._sock is not None:
+            try:
+                data = self._sock.recv(MAX_DATAGRAM * 4)
+            except (BlockingIOError, InterruptedError):
+                return
+            self.on_envelope(data)
+
+    def peers(self) -> List[str]:
+        # Re-list when a worker joined or left (directory mtime changed), and
+        # every PEERS_TTL_SECONDS for a join within the same mtime tick
+        try:
+            mtime = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        now = time.monotonic()
+        if mtime != self._peers_mtime or now - self._peers_listed_at > PEERS_TTL_SECONDS:
+            self._peers_mtime = mtime
+            self._peers_listed_at = now
+            self._peers = [
+                os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                if name.endswith(".sock") and os.path.join(self.directory, name) != self.path
+            ]
+        return self._peers
+
+    def send(self, data: bytes) -> None:
+        sock = self._sock
+        if sock is None:
+            return
+        for peer in list(self.peers()):
+            try:
+                sock.sendto(data, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                try:
+                    os.unlink(peer)  # its worker is gone
+                except FileNotFoundError:
+                    pass
+            except OSError as e:
+                if e.errno not in (errno.EAGAIN, errno.ENOBUFS):
+                    raise
+                self.errors += 1  # peer's buffer is full; it will see the gap
+
+
+class RedisBackplane(Backplane):
+    """Backplane over Redis pub/sub, for workers spread across hosts.
+
+    ``client`` is anything with redis-py's ``publish(channel, data)`` and
+    ``pubsub()`` (``subscribe``, ``get_message(timeout=...)``, ``close``), so
+    tests can pass an in-memory stand-in. A listener thread hands envelopes
+    to the broadcaster, which is thread-safe.
+    """
+
+    name = "redis"
+
+    def __init__(self, client: Any = None, channel: str = Config.WS_BACKPLANE_CHANNEL, url: str = Config.REDIS_URL) -> None:
+        super().__init__()
+        if client is None:
+            import redis  # optional dependency, only needed for this backplane
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.channel = channel
+        self._pubsub = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self, deliver: Deliver) -> None:
+        super().start(deliver)
+        self._pubsub = self.client.pubsub()
+        self._pubsub.subscribe(self.channel)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name="redis-backplane", daemon=True)
+        self._thread.start()
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            try:
+                message = self._pubsub.get_message(timeout=1.0)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Redis backplane receive failed: {e}")
+                self._stop.wait(1.0)
+                continue
+            if message and message.get("type") == "message":
+                self.on_envelope(message["data"])
+
+    def send(self, data: bytes) -> None:
+        self.client.publish(self.channel, data)
+
+    def close(self) -> None:
+        super().close()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+
+
+class LocalRedis:
+    """In-process stand-in for the slice of redis-py that RedisBackplane
+    uses: lets the Redis path run without a server (tests, local dev)."""
+
+    class _PubSub:
+        def __init__(self, hub: "LocalRedis") -> None:
+            self.hub = hub
+            self.queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+            self.channels: set = set()
+
+        def subscribe(self, channel: str) -> None:
+            self.channels.add(channel)
+            with self.hub.lock:
+                self.hub.subscribers.append(self)
+
+        def get_message(self, timeout: float = 0.0) -> Optional[Dict[str, Any]]:
+            try:
+                return self.queue.get(timeout=timeout)
+            except queue.Empty:
+                return None
+
+        def close(self) -> None:
+            with self.hub.lock:
+                if self in self.hub.subscribers:
+                    self.hub.subscribers.remove(self)
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.subscribers: List["LocalRedis._PubSub"] = []
+
+    def pubsub(self) -> "LocalRedis._PubSub":
+        return self._PubSub(self)
+
+    def publish(self, channel: str, data: bytes) -> int:
+        with self.lock:
+            targets = [s for s in self.subscribers if channel in s.channels]
+        for subscriber in targets:
+            subscriber.queue.put({"type": "message", "channel": channel, "data": data})
+        return len(targets)
+
+
+class LeaderLock:
+    """Non-blocking file lock that elects one worker for singleton duties
+    (e.g. polling for line versions). The lock dies with its process, so a
+    surviving worker takes over on its next ``is_leader`` call."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def is_leader(self) -> bool:
+        if self._fd is not None or fcntl is None:
+            return True
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_CREAT | os.O_RDWR)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def backplane_dir() -> str:
+    # Under the app's own data dir, so separate checkouts on one host never
+    # relay each other's messages or share a leader lock
+    return Config.WS_BACKPLANE_DIR or os.path.join(DATA_DIR, "ws_backplane")
+
+
+def socket_dir(directory: str) -> str:
+    """``directory``, or a short stand-in when the longest socket name a
+    worker of this host could bind there would exceed MAX_SOCKET_PATH.
+
+    Decided from the directory alone (worst-case pid width), so every worker
+    picks the same one; the stand-in is keyed by a hash of ``directory`` so
+    separate deployments stay apart.
+    """
+    longest = os.path.join(directory, f"{socket.gethostname()}-{'9' * 7}-{'f' * 6}.sock")
+    if len(os.fsencode(longest)) <= MAX_SOCKET_PATH:
+        return directory
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    short = os.path.join(base, "ws-" + hashlib.sha1(os.fsencode(os.path.abspath(directory))).hexdigest()[:12])
+    logger.info(f"Backplane socket path under {directory} is too long; using {short}")
+    return short
+
+
+def create_backplane(kind: str = Config.WS_BACKPLANE) -> Optional[Backplane]:
+    """Backplane named by WS_BACKPLANE: "unix" (default), "redis" or "none"."""
+    kind = (kind or "none").lower()
+    if kind == "redis":
+        return RedisBackplane()
+    if kind == "unix":
+        if not hasattr(socket, "AF_UNIX"):
+            logger.warning("Unix sockets unavailable; websocket updates stay within this worker")
+            return None
+        return UnixSocketBackplane(backplane_dir())
+    return None
@@ -0,0 +1,312 @@
+import asyncio
+import itertools
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Hashable, Iterable, List, Mapping, Optional, Set, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is a drop-in fallback
+    orjson = None
+
+from core.config import Config
+
+logger = logging.getLogger("app.broadcaster")
+
+_unique_keys = itertools.count()
+
+# Topics every client receives whatever its sport/team/player filters
+CONTROL_TOPICS = frozenset({"version", "resync"})
+
+
+def encode(payload: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(payload, default=str)
+
+
+def _normalize(values: Iterable[Any]) -> FrozenSet[str]:
+    return frozenset(str(v).strip().lower() for v in values if v is not None and str(v).strip())
+
+
+@dataclass(frozen=True)
+class Message:
+    """One event, serialized once at publish time.
+
+    ``key`` identifies what the event describes (e.g. one betting line): an
+    unsent message with the same key is replaced rather than queued twice.
+    Messages without a key are never coalesced.
+    """
+    topic: str
+    text: str
+    key: Optional[Hashable] = None
+    sport: Optional[str] = None
+    teams: FrozenSet[str] = frozenset()
+    players: FrozenSet[str] = frozenset()
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """Which messages a client wants; an empty set means no restriction.
+
+    Values within one dimension are OR-ed, dimensions are AND-ed.
+    """
+    topics: FrozenSet[str] = frozenset()
+    sports: FrozenSet[str] = frozenset()
+    teams: FrozenSet[str] = frozenset()
+    players: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def from_params(cls, params: Mapping[str, Any]) -> "Subscription":
+        """Build from query params or a subscribe request; values may be lists
+        or comma-separated strings, keys singular or plural."""
+        def values(name: str) -> FrozenSet[str]:
+            raw = params.get(f"{name}s", params.get(name))
+            if raw is None:
+                return frozenset()
+            if isinstance(raw, str):
+                raw = raw.split(",")
+            return _normalize(raw)
+        return cls(values("topic"), values("sport"), values("team"), values("player"))
+
+    def matches(self, message: Message) -> bool:
+        if self.topics and message.topic not in self.topics:
+            return False
+        if message.topic in CONTROL_TOPICS:
+            return True
+        if self.sports and message.sport not in self.sports:
+            return False
+        if self.teams and not self.teams & message.teams:
+            return False
+        if self.players and not self.players & message.players:
+            return False
+        return True
+
+    def index_keys(self) -> List[Tuple[str, str]]:
+        # Index on the most selective dimension; the rest is checked by matches()
+        for dimension, values in (("player", self.players), ("team", self.teams), ("sport", self.sports)):
+            if values:
+                return [(dimension, v) for v in values]
+        return []
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {name: sorted(getattr(self, name)) for name in ("topics", "sports", "teams", "players")}
+
+
+@dataclass(eq=False)
+class Client:
+    """A connected socket with a bounded queue of pending messages.
+
+    A dedicated task sends queued messages as JSON-array frames, so a slow
+    socket only delays itself; once the queue is full the oldest pending
+    message is dropped.
+    """
+    send: Callable[[str], Awaitable[Any]]
+    subscription: Subscription
+    max_queue: int = 1000
+    max_frame: int = 200
+    pending: "OrderedDict[Hashable, str]" = field(default_factory=OrderedDict)
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    task: Optional[asyncio.Task] = None
+    sent: int = 0
+    frames: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+
+    def offer(self, message: Message) -> None:
+        key = message.key if message.key is not None else next(_unique_keys)
+        if key in self.pending:
+            self.coalesced += 1
+        elif len(self.pending) >= self.max_queue:
+            self.pending.popitem(last=False)
+            self.dropped += 1
+        self.pending[key] = message.text
+        self.ready.set()
+
+    async def run(self) -> None:
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            while self.pending:
+                batch = [self.pending.popitem(last=False)[1] for _ in range(min(len(self.pending), self.max_frame))]
+                await self.send("[" + ",".join(batch) + "]")
+                self.sent += len(batch)
+                self.frames += 1
+
+
+class Broadcaster:
+    """Fan-out of published events to websocket clients, filtered per client.
+
+    ``publish`` may be called from any thread: messages are encoded in the
+    caller and handed to the event loop in one batch. Clients are indexed by
+    their subscription so a message only visits clients that may want it.
+    With a backplane attached, published messages also reach the clients of
+    every other worker process.
+    """
+
+    def __init__(self, max_queue: int = 1000, max_frame: int = 200) -> None:
+        self.max_queue = max_queue
+        self.max_frame = max_frame
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: Set[Client] = set()
+        self._wildcard: Set[Client] = set()
+        self._index: Dict[Tuple[str, str], Set[Client]] = {}
+        self.backplane = None
+        self.published = 0
+        self.received = 0
+        self.delivered = 0
+        self._departed = {"sent": 0, "dropped": 0, "coalesced": 0}
+
+    async def start(self, backplane=None) -> None:
+        """Bind to the app's loop and, optionally, to a cross-worker backplane."""
+        self._loop = asyncio.get_running_loop()
+        if backplane is not None:
+            backplane.start(self.receive)
+            self.backplane = backplane
+
+    async def stop(self) -> None:
+        backplane, self.backplane = self.backplane, None
+        if backplane is not None:
+            backplane.close()
+
+    # -- clients -------------------------------------------------------------
+
+    async def connect(self, send: Callable[[str], Awaitable[Any]], subscription: Subscription = Subscription()) -> Client:
+        self._loop = asyncio.get_running_loop()
+        client = Client(send, subscription, self.max_queue, self.max_frame)
+        client.task = self._loop.create_task(client.run())
+        self._clients.add(client)
+        self._add_to_index(client)
+        return client
+
+    async def disconnect(self, client: Client) -> None:
+        if client not in self._clients:
+            return
+        self._clients.discard(client)
+        self._remove_from_index(client)
+        for name in self._departed:
+            self._departed[name] += getattr(client, name)
+        if client.task is not None:
+            client.task.cancel()
+            try:
+                await client.task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def subscribe(self, client: Client, subscription: Subscription) -> None:
+        self._remove_from_index(client)
+        client.subscription = subscription
+        self._add_to_index(client)
+
+    def send_to(self, client: Client, topic: str, payload: Any) -> None:
+        """Queue a message for one client, e.g. a subscription ack."""
+        client.offer(Message(topic, encode({"topic": topic, "data": payload})))
+
+    def _add_to_index(self, client: Client) -> None:
+        keys = client.subscription.index_keys()
+        if not keys:
+            self._wildcard.add(client)
+        for key in keys:
+            self._index.setdefault(key, set()).add(client)
+
+    def _remove_from_index(self, client: Client) -> None:
+        self._wildcard.discard(client)
+        for key in client.subscription.index_keys():
+            members = self._index.get(key)
+            if members is not None:
+                members.discard(client)
+                if not members:
+                    del self._index[key]
+
+    # -- publishing ----------------------------------------------------------
+
+    @staticmethod
+    def message(
+        topic: str,
+        payload: Any,
+        key: Optional[Hashable] = None,
+        sport: Optional[str] = None,
+        teams: Iterable[Any] = (),
+        players: Iterable[Any] = (),
+    ) -> Message:
+        return Message(
+            topic=topic,
+            text=encode({"topic": topic, "data": payload}),
+            key=(topic, key) if key is not None else None,
+            sport=str(sport).strip().lower() if sport else None,
+            teams=_normalize(teams),
+            players=_normalize(players),
+        )
+
+    def publish(self, topic: str, payload: Any, **kwargs: Any) -> None:
+        self.publish_many([self.message(topic, payload, **kwargs)])
+
+    def publish_many(self, messages: List[Message]) -> None:
+        """Deliver pre-built messages; safe to call from any thread."""
+        if not messages:
+            return
+        if self.backplane is not None:
+            self.backplane.publish(messages)
+        self._hand_off(messages)
+        self.published += len(messages)
+
+    def receive(self, messages: List[Message]) -> None:
+        """Deliver messages published by another worker; any thread."""
+        self._hand_off(messages)
+        self.received += len(messages)
+
+    def _hand_off(self, messages: List[Message]) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # nobody has ever connected
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._dispatch(messages)
+        else:
+            loop.call_soon_threadsafe(self._dispatch, messages)
+
+    def _dispatch(self, messages: List[Message]) -> None:
+        for message in messages:
+            if message.topic in CONTROL_TOPICS:
+                candidates = self._clients
+            else:
+                candidates = self._candidates(message)
+            for client in candidates:
+                if client.subscription.matches(message):
+                    client.offer(message)
+                    self.delivered += 1
+
+    def _candidates(self, message: Message) -> Set[Client]:
+        index = self._index
+        candidates = set(self._wildcard)
+        if message.sport is not None:
+            candidates.update(index.get(("sport", message.sport), ()))
+        for team in message.teams:
+            candidates.update(index.get(("team", team), ()))
+        for player in message.players:
+            candidates.update(index.get(("player", player), ()))
+        return candidates
+
+    def stats(self) -> Dict[str, Any]:
+        clients = list(self._clients)
+        return {
+            "name": "broadcaster",
+            "clients": len(clients),
+            "published": self.published,
+            "received": self.received,
+            "delivered": self.delivered,
+            "sent": self._departed["sent"] + sum(c.sent for c in clients),
+            "dropped": self._departed["dropped"] + sum(c.dropped for c in clients),
+            "coalesced": self._departed["coalesced"] + sum(c.coalesced for c in clients),
+            "max_queue_depth": max((len(c.pending) for c in clients), default=0),
+            "backplane": self.backplane.stats() if self.backplane is not None else None,
+        }
+
+
+# Global broadcaster behind /ws/scores
+broadcaster = Broadcaster(max_queue=Config.WS_MAX_QUEUE, max_frame=Config.WS_MAX_FRAME)
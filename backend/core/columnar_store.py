@@ -0,0 +1,229 @@
+import json
+import os
+import time
+import types
+import typing
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from core.data_store import PREDICTIONS_CSV, PREDICTIONS_DIR, PREDICTIONS_MANIFEST, write_atomic
+from models.predictions import Prediction
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # without pyarrow the CSV stays the canonical format
+    pa = None
+    pa_ipc = None
+
+MANIFEST_PATH = PREDICTIONS_MANIFEST
+PARTITION_COLUMNS = ["sport", "date"]
+# Superseded partition files are kept this long for readers still mapping them
+GC_GRACE_SECONDS = 300
+EXPORT_CSV = os.getenv("PREDICTIONS_EXPORT_CSV", "false").lower() in ("true", "1", "t")
+
+# float64, not float32: a price like 1.91 must read back as 1.91, not 1.9099999
+_PY_TO_ARROW = {str: "string", float: "float64", int: "int64", bool: "bool"}
+# Low-cardinality columns are stored dictionary-encoded
+DICTIONARY_COLUMNS = {"sport", "bookmaker", "market", "team"}
+# Odds ingestion columns beyond the Prediction model
+EXTRA_FIELDS = {
+    "sport": str,
+    "date": str,
+    "event_id": str,
+    "commence_time": str,
+    "bookmaker": str,
+    "market": str,
+    "outcome_name": str,
+    "point": float,
+    "price": float,
+    "outcome": str,
+}
+
+
+def _arrow_type(name: str, annotation: Any):
+    # Optional[X] / X | None -> X
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        annotation = args[0]
+    arrow_type = getattr(pa, _PY_TO_ARROW[annotation])()
+    if name in DICTIONARY_COLUMNS:
+        return pa.dictionary(pa.int32(), arrow_type)
+    return arrow_type
+
+
+def schema_from_model(model=Prediction, extra: Optional[Dict[str, Any]] = None):
+    """Arrow schema with one nullable field per model annotation plus ``extra``."""
+    fields = dict(typing.get_type_hints(model))
+    for name, annotation in (extra or {}).items():
+        fields.setdefault(name, annotation)
+    return pa.schema([pa.field(name, _arrow_type(name, annotation)) for name, annotation in fields.items()])
+
+
+PREDICTIONS_SCHEMA = schema_from_model(Prediction, EXTRA_FIELDS) if pa is not None else None
+
+
+def _partition_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Partition of each row; rows without a sport/date go to "unknown"/today
+    without adding those columns to the stored table."""
+    if "date" in df.columns:
+        date = df["date"].astype("string")
+    elif "commence_time" in df.columns:
+        date = df["commence_time"].astype("string").str.slice(0, 10)
+    else:
+        date = pd.Series(time.strftime("%Y-%m-%d"), index=df.index, dtype="string")
+    sport = df["sport"].astype("string") if "sport" in df.columns else pd.Series(pd.NA, index=df.index, dtype="string")
+    return pd.DataFrame({"sport": sport.fillna("unknown"), "date": date.fillna("unknown")})
+
+
+def conform(df: pd.DataFrame) -> "pa.Table":
+    """Cast ``df`` to the declared schema; unknown columns are kept as inferred."""
+    if "date" not in df.columns and "commence_time" in df.columns:
+        df = df.assign(date=df["commence_time"].astype("string").str.slice(0, 10))
+    arrays, fields = [], []
+    for field in PREDICTIONS_SCHEMA:
+        if field.name not in df.columns:
+            continue
+        column = df[field.name]
+        value_type = field.type.value_type if pa.types.is_dictionary(field.type) else field.type
+        if pa.types.is_string(value_type):
+            column = column.astype("string")
+        else:
+            column = pd.to_numeric(column, errors="coerce")
+        arrays.append(pa.array(column, type=value_type, from_pandas=True))
+        fields.append(field)
+        if pa.types.is_dictionary(field.type):
+            arrays[-1] = arrays[-1].dictionary_encode()
+    declared = {field.name for field in fields}
+    for name in df.columns:
+        if name not in declared:
+            arrays.append(pa.array(df[name], from_pandas=True))
+            fields.append(pa.field(name, arrays[-1].type))
+    table = pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+    return table.select(list(df.columns))
+
+
+def _write_ipc(table: "pa.Table", path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    # Uncompressed so readers can memory-map the file
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa_ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def read_manifest() -> Optional[Dict[str, Any]]:
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _collect_garbage(live: Iterable[str]) -> None:
+    live = {os.path.normpath(os.path.join(PREDICTIONS_DIR, p)) for p in live}
+    cutoff = time.time() - GC_GRACE_SECONDS
+    for root, _, files in os.walk(PREDICTIONS_DIR):
+        for name in files:
+            path = os.path.normpath(os.path.join(root, name))
+            if name.endswith(".arrow") and path not in live and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+
+
+def write_predictions(df: pd.DataFrame, export_csv: bool = EXPORT_CSV) -> None:
+    """Publish ``df`` as the canonical predictions table.
+
+    Rows are partitioned into one Arrow IPC file per sport/date. A manifest
+    listing the new files is swapped in last, so readers always see one
+    complete version. CSV export is an explicit opt-in.
+    """
+    if pa is None:
+        write_atomic(df, PREDICTIONS_CSV)
+        return
+    table = conform(df)
+    token = uuid.uuid4().hex[:12]
+    partitions: List[Dict[str, Any]] = []
+    keys = _partition_keys(df.reset_index(drop=True))
+    for (sport, date), positions in keys.groupby(PARTITION_COLUMNS, sort=True).indices.items():
+        relative = os.path.join(f"sport={sport}", f"date={date}", f"part-{token}.arrow")
+        _write_ipc(table.take(pa.array(positions)), os.path.join(PREDICTIONS_DIR, relative))
+        partitions.append({"path": relative, "sport": sport, "date": date, "rows": len(positions)})
+    manifest = {"written_at": time.time(), "rows": table.num_rows, "partitions": partitions}
+    if export_csv:
+        # Recorded so the export is not mistaken for a newer legacy CSV
+        export_predictions_csv(table.to_pandas(), PREDICTIONS_CSV)
+        st = os.stat(PREDICTIONS_CSV)
+        manifest["csv_export"] = [st.st_mtime_ns, st.st_size]
+    tmp_path = f"{MANIFEST_PATH}.tmp.{os.getpid()}"
+    os.makedirs(PREDICTIONS_DIR, exist_ok=True)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, MANIFEST_PATH)
+    _collect_garbage(p["path"] for p in partitions)
+
+
+def read_predictions(
+    sports: Optional[Iterable[str]] = None,
+    dates: Optional[Iterable[str]] = None,
+    columns: Optional[Iterable[str]] = None,
+) -> Optional[pd.DataFrame]:
+    """Memory-map the current partitions, pruned by sport/date; None if never written.
+
+    Mapping and pruning are zero-copy, but the returned DataFrame is not:
+    ``to_pandas`` copies whatever is left out of the mapping. Pass
+    ``columns`` to convert only those (unknown names are skipped).
+    """
+    manifest = read_manifest() if pa is not None else None
+    if manifest is None:
+        return None
+    sports = set(sports) if sports is not None else None
+    dates = set(dates) if dates is not None else None
+    columns = list(columns) if columns is not None else None
+    tables = []
+    for partition in manifest["partitions"]:
+        if sports is not None and partition["sport"] not in sports:
+            continue
+        if dates is not None and partition["date"] not in dates:
+            continue
+        with pa.memory_map(os.path.join(PREDICTIONS_DIR, partition["path"]), "r") as source:
+            table = pa_ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select([c for c in columns if c in table.column_names])
+        tables.append(table)
+    if not tables:
+        empty = PREDICTIONS_SCHEMA.empty_table()
+        if columns is not None:
+            empty = empty.select([c for c in columns if c in empty.column_names])
+        return empty.to_pandas()
+    return pa.concat_tables(tables, promote_options="permissive").to_pandas()
+
+
+def _legacy_csv_is_newer(manifest: Dict[str, Any]) -> bool:
+    """True when something other than our own export wrote the CSV after the
+    manifest, e.g. generate_sample_predictions.py."""
+    try:
+        st = os.stat(PREDICTIONS_CSV)
+    except FileNotFoundError:
+        return False
+    if manifest.get("csv_export") == [st.st_mtime_ns, st.st_size]:
+        return False
+    return st.st_mtime > manifest.get("written_at", 0)
+
+
+def load_predictions_table() -> pd.DataFrame:
+    """Canonical predictions table, falling back to the legacy CSV when there
+    is no columnar table yet or a legacy writer replaced the CSV since."""
+    manifest = read_manifest() if pa is not None else None
+    if manifest is not None and not _legacy_csv_is_newer(manifest):
+        df = read_predictions()
+        if df is not None:
+            return df
+    return pd.read_csv(PREDICTIONS_CSV)
+
+
+def export_predictions_csv(df: Optional[pd.DataFrame] = None, path: str = PREDICTIONS_CSV) -> None:
+    """Explicit CSV export of the canonical table for legacy tools."""
+    write_atomic(df if df is not None else load_predictions_table(), path)
@@ -0,0 +1,95 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+class Config:
+    """Production-ready configuration"""
+
+    # API Keys - Load from environment
+    ODDS_API_KEY = os.getenv("ODDS_API_KEY") or os.getenv("THEODDS_API_KEY")
+    SPORTRADAR_API_KEY = os.getenv("SPORTRADAR_API_KEY")
+
+    # App Settings
+    APP_NAME = "AI Sports Betting Platform"
+    VERSION = "2.0.0"
+    DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+
+    # Supported sports
+    SUPPORTED_SPORTS = ['nba', 'wnba', 'soccer', 'mlb', 'nhl']
+
+    # API Endpoints
+    # Overridable so the score ingester can run against recorded fixtures
+    ESPN_BASE = os.getenv("ESPN_BASE_URL", "http://site.api.espn.com/apis/site/v2/sports")
+    ESPN_ENDPOINTS = {
+        'nba': '/basketball/nba/scoreboard',
+        'wnba': '/basketball/wnba/scoreboard',
+        'mlb': '/baseball/mlb/scoreboard',
+        'nhl': '/hockey/nhl/scoreboard',
+        'soccer': '/soccer/usa.1/scoreboard'
+    }
+
+    ODDS_API_BASE = "https://api.the-odds-api.com/v4"
+    ODDS_SPORTS_MAP = {
+        'nba': 'basketball_nba',
+        'wnba': 'basketball_wnba',
+        'mlb': 'baseball_mlb',
+        'nhl': 'icehockey_nhl',
+        'soccer': 'soccer_usa_mls'
+    }
+    ODDS_MARKETS = ['player_points', 'player_rebounds', 'player_assists', 'h2h', 'spreads', 'totals']
+    # Concurrent Odds API requests, and the quota floor below which ingestion stops
+    ODDS_MAX_CONCURRENCY = int(os.getenv("ODDS_MAX_CONCURRENCY", "6"))
+    ODDS_MIN_REQUESTS_REMAINING = int(os.getenv("ODDS_MIN_REQUESTS_REMAINING", "10"))
+
+    # Single predictions are coalesced into batches of up to this many rows / ms
+    MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "64"))
+    MICRO_BATCH_MAX_WAIT_MS = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "5"))
+
+    # Worker processes for CPU-bound route work (0 = cores - 1, or this
+    # server worker's share of the cores under WEB_CONCURRENCY) and default job timeout
+    CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", "0"))
+    CPU_POOL_TIMEOUT = float(os.getenv("CPU_POOL_TIMEOUT", "60"))
+    # Model training runs in its own process (not the request pool), for up to this long
+    TRAIN_TIMEOUT = float(os.getenv("TRAIN_TIMEOUT", "7200"))
+
+    # Websocket push: per-client pending messages, messages per frame, and how
+    # often the line feed checks for versions published by other processes
+    WS_MAX_QUEUE = int(os.getenv("WS_MAX_QUEUE", "1000"))
+    WS_MAX_FRAME = int(os.getenv("WS_MAX_FRAME", "200"))
+    LINE_FEED_POLL_SECONDS = float(os.getenv("LINE_FEED_POLL_SECONDS", "2"))
+    # Relays websocket updates between uvicorn workers: "unix" (same host,
+    # sockets under WS_BACKPLANE_DIR), "redis" (REDIS_URL) or "none"
+    WS_BACKPLANE = os.getenv("WS_BACKPLANE", "unix")
+    WS_BACKPLANE_DIR = os.getenv("WS_BACKPLANE_DIR", "")
+    WS_BACKPLANE_CHANNEL = os.getenv("WS_BACKPLANE_CHANNEL", "ws_updates")
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+    # Live score polling: while a game is in progress, once one starts within
+    # the pregame lead, and otherwise (nothing soon, or every game final).
+    # Off by default so dev servers leave ESPN and the predictions table alone;
+    # scripts/prod/start_prod.py turns it on
+    SCORE_INGEST_ENABLED = os.getenv("SCORE_INGEST_ENABLED", "False").lower() == "true"
+    SCORE_POLL_LIVE_SECONDS = float(os.getenv("SCORE_POLL_LIVE_SECONDS", "15"))
+    SCORE_POLL_PRE_SECONDS = float(os.getenv("SCORE_POLL_PRE_SECONDS", "60"))
+    SCORE_POLL_IDLE_SECONDS = float(os.getenv("SCORE_POLL_IDLE_SECONDS", "1800"))
+    SCORE_PREGAME_LEAD_SECONDS = float(os.getenv("SCORE_PREGAME_LEAD_SECONDS", "1800"))
+
+    # Requests slower than this are logged with their phase timings (0 = never)
+    METRICS_SLOW_REQUEST_MS = float(os.getenv("METRICS_SLOW_REQUEST_MS", "1000"))
+
+    SPORTRADAR_ENDPOINTS = {
+        'nba': 'https://api.sportradar.us/nba/trial/v8/en',
+        'wnba': 'https://api.sportradar.us/wnba/trial/v8/en',
+        'mlb': 'https://api.sportradar.us/mlb/trial/v7/en',
+        'nhl': 'https://api.sportradar.us/nhl/trial/v7/en',
+        'soccer': 'https://api.sportradar.us/soccer/trial/v4/en'
+    }
+
+    # Cache settings
+    CACHE_TTL = {
+        'odds': 300,      # 5 minutes
+        'stats': 3600,    # 1 hour
+        'predictions': 600 # 10 minutes
+    }
@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock; writers are not run concurrently there
+    fcntl = None
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BACKEND_DIR, "data")
+PREDICTIONS_CSV = os.path.join(DATA_DIR, "predictions_latest.csv")
+ESPN_STATS_CSV = os.path.join(DATA_DIR, "espn_player_stats.csv")
+# Canonical columnar predictions (see core.columnar_store); the CSV is a legacy fallback
+PREDICTIONS_DIR = os.path.join(DATA_DIR, "predictions")
+PREDICTIONS_MANIFEST = os.path.join(PREDICTIONS_DIR, "_manifest.json")
+# Held by every process that reads, changes and republishes the predictions table
+PREDICTIONS_LOCK = os.path.join(DATA_DIR, "predictions.lock")
+
+# (mtime_ns, size) per watched file, None when the file is missing
+Signature = Tuple[Optional[Tuple[int, int]], ...]
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One immutable, fully loaded version of a watched data file.
+
+    Consumers must treat ``data`` as read-only and copy before mutating.
+    """
+    data: Any
+    version: int
+    signature: Signature
+    loaded_at: float = field(default_factory=time.time)
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def write_atomic(df: pd.DataFrame, path: str) -> None:
+    """Write ``df`` as CSV next to ``path`` and rename it into place."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Exclusive lock on ``path`` across processes, held for the block.
+
+    Serializes read-modify-write cycles on shared data files; released when
+    the block exits or the process dies.
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_CREAT | os.O_RDWR)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+class SnapshotStore:
+    """Process-wide cache of a file-backed table.
+
+    Every ``get()`` does a cheap ``stat`` of the watched files; the loader only
+    runs when their mtime/size changes, and the new snapshot replaces the old
+    one in a single reference swap so readers never see a half-loaded table.
+    """
+
+    def __init__(self, paths: Sequence[str], loader: Callable[[], Any], name: str = "store") -> None:
+        self.paths = tuple(paths)
+        self.loader = loader
+        self.name = name
+        self._snapshot: Optional[Snapshot] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def _signature(self) -> Signature:
+        return tuple(_stat(p) for p in self.paths)
+
+    def get(self) -> Optional[Snapshot]:
+        """Return the current snapshot, reloading if the files changed.
+
+        Returns None when none of the watched files exist.
+        """
+        signature = self._signature()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.signature == signature:
+            self.hits += 1
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.signature == signature:
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+            if all(s is None for s in signature):
+                self._snapshot = None
+                return None
+            data = self.loader()
+            version = snapshot.version + 1 if snapshot is not None else 1
+            if snapshot is not None:
+                self.reloads += 1
+            # The signature was taken before loading, so a write that races
+            # the load leaves a stale signature and triggers another reload
+            self._snapshot = Snapshot(data=data, version=version, signature=signature)
+            return self._snapshot
+
+    def invalidate(self) -> None:
+        """Force the next ``get()`` to reload, e.g. after an in-process write."""
+        with self._lock:
+            if self._snapshot is not None:
+                self._snapshot = Snapshot(
+                    data=self._snapshot.data,
+                    version=self._snapshot.version,
+                    signature=(),
+                    loaded_at=self._snapshot.loaded_at,
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "version": snapshot.version if snapshot else None,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+        }
+
+
+def _load_predictions() -> pd.DataFrame:
+    from core.columnar_store import load_predictions_table
+    return load_predictions_table()
+
+
+# Global predictions store shared by every route
+predictions_store = SnapshotStore([PREDICTIONS_MANIFEST, PREDICTIONS_CSV], _load_predictions, name="predictions")
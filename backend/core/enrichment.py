@@ -0,0 +1,145 @@
+import json
+import os
+import re
+import unicodedata
+from typing import Optional
+
+import pandas as pd
+
+from core.data_store import DATA_DIR, ESPN_STATS_CSV, SnapshotStore, predictions_store
+from core.metrics import span
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # without pyarrow the enriched table stays in memory only
+    pa = None
+    pa_ipc = None
+
+ENRICHED_PATH = os.path.join(DATA_DIR, "lineup_enriched.arrow")
+SIGNATURE_KEY = b"source_signature"
+
+NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+_NON_ALNUM = re.compile(r"[^a-z0-9 ]+")
+
+
+def normalize_player_name(name: object) -> Optional[str]:
+    """Join key for player names: no accents, punctuation, case or suffixes.
+
+    "Luka Dončić" -> "luka doncic", "Jaren Jackson Jr." -> "jaren jackson".
+    """
+    if not isinstance(name, str) or not name.strip():
+        return None
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = _NON_ALNUM.sub("", text.replace("-", " "))
+    tokens = text.split()
+    while len(tokens) > 1 and tokens[-1] in NAME_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens) or None
+
+
+def _first_column(df: pd.DataFrame, candidates) -> Optional[str]:
+    for col in candidates:
+        if col in df.columns:
+            return col
+    return None
+
+
+def _normalize_team(team: object) -> str:
+    return str(team).strip().upper() if isinstance(team, str) else ""
+
+
+def enrich_predictions(predictions: pd.DataFrame, espn: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Left-join ESPN player stats onto predictions by normalized player name.
+
+    Names that appear more than once in the ESPN table are disambiguated by
+    team when both sides carry one.
+    """
+    df = predictions.copy()
+    name_col = _first_column(df, ("name", "player"))
+    espn_name_col = _first_column(espn, ("PLAYER", "Name", "NAME")) if espn is not None else None
+    if name_col is None or espn_name_col is None:
+        return df
+
+    espn = espn.copy()
+    espn_key = espn[espn_name_col].map(normalize_player_name)
+    espn_team_col = _first_column(espn, ("TEAM", "Team"))
+    ambiguous = espn_key.duplicated(keep=False) & espn_key.notna()
+    if espn_team_col is not None:
+        espn_key = espn_key.where(~ambiguous, espn_key + "|" + espn[espn_team_col].map(_normalize_team))
+    # Ambiguous names without a team to tell them apart are left unmatched
+    espn["_join_key"] = espn_key
+    espn = espn[espn["_join_key"].notna()].drop_duplicates("_join_key", keep=False)
+
+    df_key = df[name_col].map(normalize_player_name)
+    ambiguous_names = set(espn_key[ambiguous].str.split("|").str[0])
+    if ambiguous_names and "team" in df.columns:
+        needs_team = df_key.isin(ambiguous_names)
+        df_key = df_key.where(~needs_team, df_key + "|" + df["team"].map(_normalize_team))
+    df["_join_key"] = df_key
+
+    merged = df.merge(espn, on="_join_key", how="left", suffixes=("", "_espn"))
+    return merged.drop(columns=["_join_key"])
+
+
+def _write_artifact(df: pd.DataFrame, signature: str) -> None:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SIGNATURE_KEY] = signature.encode("utf-8")
+    table = table.replace_schema_metadata(metadata)
+    tmp_path = f"{ENRICHED_PATH}.tmp.{os.getpid()}"
+    # Uncompressed Arrow IPC so readers can memory-map it
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa_ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, ENRICHED_PATH)
+
+
+def _read_artifact(signature: str) -> Optional[pd.DataFrame]:
+    if not os.path.exists(ENRICHED_PATH):
+        return None
+    with pa.memory_map(ENRICHED_PATH, "r") as source:
+        reader = pa_ipc.open_file(source)
+        if (reader.schema.metadata or {}).get(SIGNATURE_KEY) != signature.encode("utf-8"):
+            return None
+        return reader.read_all().to_pandas()
+
+
+def _source_signature(predictions_version_sig, espn_path: str) -> str:
+    espn_stat = os.stat(espn_path) if os.path.exists(espn_path) else None
+    return json.dumps({
+        "predictions": predictions_version_sig,
+        "espn": [espn_stat.st_mtime_ns, espn_stat.st_size] if espn_stat else None,
+    })
+
+
+def _load_enriched() -> pd.DataFrame:
+    # Inside a request these show up as its "load" and "merge" phases
+    with span("load"):
+        snapshot = predictions_store.get()
+        if snapshot is None:
+            return pd.DataFrame()
+        signature = _source_signature(snapshot.signature, ESPN_STATS_CSV)
+        df = None
+        if pa is not None:
+            # Another worker may already have materialized this exact join
+            try:
+                df = _read_artifact(signature)
+            except (OSError, pa.ArrowInvalid):
+                df = None
+        if df is not None:
+            return df
+        espn = pd.read_csv(ESPN_STATS_CSV) if os.path.exists(ESPN_STATS_CSV) else None
+    with span("merge"):
+        df = enrich_predictions(snapshot.data, espn)
+    if pa is not None:
+        try:
+            _write_artifact(df, signature)
+        except (OSError, pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+    return df
+
+
+# Predictions joined with ESPN stats, rebuilt only when either source changes
+enriched_store = SnapshotStore([*predictions_store.paths, ESPN_STATS_CSV], _load_enriched, name="lineup_enriched")
@@ -0,0 +1,187 @@
+import asyncio
+import importlib.util
+import logging
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger("app.http")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass(frozen=True)
+class SourceConfig:
+    """Timeouts, retry policy and default headers for one external data source."""
+    name: str
+    timeout: float = 10.0
+    connect_timeout: float = 5.0
+    retries: int = 2
+    backoff: float = 0.5
+    max_backoff: float = 8.0
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class SourceStats:
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_status: Optional[int] = None
+    last_error: Optional[str] = None
+
+    def record(self, elapsed_ms: float, status: Optional[int], error: Optional[str]) -> None:
+        self.requests += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.last_status = status
+        if error is not None:
+            self.errors += 1
+            self.last_error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["avg_ms"] = self.total_ms / self.requests if self.requests else 0.0
+        return data
+
+
+BROWSER_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+SOURCES: Dict[str, SourceConfig] = {
+    "odds_api": SourceConfig("odds_api", timeout=15.0, retries=2),
+    "espn": SourceConfig("espn", timeout=10.0, retries=2, headers=BROWSER_HEADERS),
+    "espn_scoreboard": SourceConfig("espn_scoreboard", timeout=5.0, retries=1, headers=BROWSER_HEADERS),
+    "prizepicks": SourceConfig(
+        "prizepicks",
+        timeout=10.0,
+        retries=2,
+        headers={**BROWSER_HEADERS, "Accept": "application/json, text/plain, */*"},
+    ),
+}
+
+
+class SourceClient:
+    """Shared, pooled HTTP client for every external data source.
+
+    One ``httpx.AsyncClient`` lives on a private event loop thread, so its
+    keep-alive pools are reused by async routes (``await get(...)``), sync
+    routes and scripts (``get_sync(...)``) alike without ever blocking the
+    server's event loop. Pass ``transport`` to point it at a stub server.
+    """
+
+    def __init__(
+        self,
+        sources: Dict[str, SourceConfig],
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+    ) -> None:
+        self.sources = dict(sources)
+        self.stats: Dict[str, SourceStats] = {name: SourceStats() for name in self.sources}
+        self._transport = transport
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=30.0,
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="http-sources", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Only called on the client loop, so no locking is needed
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=self._limits,
+                http2=importlib.util.find_spec("h2") is not None,
+                follow_redirects=True,
+                transport=self._transport,
+            )
+        return self._client
+
+    def _source(self, name: str) -> SourceConfig:
+        if name not in self.sources:
+            self.sources[name] = SourceConfig(name)
+            self.stats[name] = SourceStats()
+        return self.sources[name]
+
+    async def _request(self, source_name: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        source = self._source(source_name)
+        stats = self.stats[source_name]
+        client = self._get_client()
+        headers = {**source.headers, **(kwargs.pop("headers", None) or {})}
+        timeout = httpx.Timeout(source.timeout, connect=source.connect_timeout)
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, headers=headers, timeout=timeout, **kwargs)
+            except httpx.TransportError as e:
+                stats.record((time.perf_counter() - started) * 1000, None, repr(e))
+                if attempt >= source.retries:
+                    raise
+                delay = None
+            else:
+                error = None if response.status_code < 400 else f"HTTP {response.status_code}"
+                stats.record((time.perf_counter() - started) * 1000, response.status_code, error)
+                if response.status_code not in RETRY_STATUSES or attempt >= source.retries:
+                    return response
+                retry_after = response.headers.get("retry-after", "")
+                delay = float(retry_after) if retry_after.isdigit() else None
+            attempt += 1
+            stats.retries += 1
+            # Full jitter: uniform over [0, capped exponential backoff]
+            cap = min(source.max_backoff, source.backoff * (2 ** attempt))
+            await asyncio.sleep(min(delay, source.max_backoff) if delay is not None else random.uniform(0, cap))
+            logger.debug(f"Retrying {source_name} {url} (attempt {attempt + 1})")
+
+    async def request(self, source: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(self._request(source, method, url, **kwargs), loop)
+        return await asyncio.wrap_future(future)
+
+    async def get(self, source: str, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request(source, "GET", url, **kwargs)
+
+    def request_sync(self, source: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        loop = self._ensure_started()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("request_sync() cannot be called from the HTTP client loop; await get() instead")
+        future = asyncio.run_coroutine_threadsafe(self._request(source, method, url, **kwargs), loop)
+        return future.result()
+
+    def get_sync(self, source: str, url: str, **kwargs: Any) -> httpx.Response:
+        return self.request_sync(source, "GET", url, **kwargs)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
+
+    def close(self) -> None:
+        with self._lock:
+            loop, client = self._loop, self._client
+            self._loop, self._thread, self._client = None, None, None
+        if loop is None:
+            return
+        if client is not None:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+
+
+# Global client shared by every external data source
+source_client = SourceClient(SOURCES)
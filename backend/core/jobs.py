@@ -0,0 +1,78 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("app.jobs")
+
+
+@dataclass
+class Job:
+    id: str
+    key: str
+    status: str = "queued"  # queued -> running -> succeeded | failed
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class JobRunner:
+    """Runs background jobs on a small thread pool with single-flight per key.
+
+    Submitting a key that is already queued or running returns the existing
+    job instead of starting another one, so N concurrent refresh requests
+    cost one scrape.
+    """
+
+    def __init__(self, max_workers: int = 2, history: int = 200) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jobs")
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Job] = {}
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._history = history
+
+    def submit(self, key: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Job:
+        with self._lock:
+            job = self._inflight.get(key)
+            if job is not None:
+                return job
+            job = Job(id=uuid.uuid4().hex, key=key)
+            self._inflight[key] = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self._history:
+                self._jobs.popitem(last=False)
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: Any, kwargs: Any) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            fn(*args, **kwargs)
+            job.status = "succeeded"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"Background job {job.key} failed: {e}", exc_info=True)
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._inflight.pop(job.key, None)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global background job runner
+background_jobs = JobRunner()
@@ -0,0 +1,65 @@
+import json
+from functools import reduce
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+INDEXED_COLUMNS = ("date", "status", "team", "sport")
+
+
+class LineupIndex:
+    """Read-only query index over one lineup snapshot.
+
+    Each indexed column is factorized into integer codes and every distinct
+    value gets a packed row bitmap, so any combination of equality filters
+    resolves by AND-ing a few byte arrays instead of masking the whole frame.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: Sequence[str] = INDEXED_COLUMNS) -> None:
+        self.size = len(df)
+        # JSON round-trip once so NaN from joins becomes None and rows are plain dicts
+        self.records: List[Dict[str, Any]] = json.loads(df.to_json(orient="records", date_format="iso"))
+        self.codes: Dict[str, np.ndarray] = {}
+        self.labels: Dict[str, List[Any]] = {}
+        self.sorted_codes: Dict[str, np.ndarray] = {}
+        self.bitmaps: Dict[str, Dict[Any, np.ndarray]] = {}
+        for col in columns:
+            codes, uniques = pd.factorize(df[col], use_na_sentinel=True)
+            labels = uniques.tolist()
+            self.codes[col] = codes
+            self.labels[col] = labels
+            self.sorted_codes[col] = np.array(sorted(range(len(labels)), key=lambda i: str(labels[i])), dtype=np.int64)
+            self.bitmaps[col] = {
+                label: np.packbits(codes == i) for i, label in enumerate(labels)
+            }
+        self.facets = {col: self.facet_counts(col) for col in columns}
+
+    def query(self, filters: Mapping[str, Optional[Any]]) -> np.ndarray:
+        """Return the row positions matching every non-None equality filter."""
+        bitmaps = []
+        for col, value in filters.items():
+            if value is None:
+                continue
+            bitmap = self.bitmaps[col].get(value)
+            if bitmap is None:
+                return np.empty(0, dtype=np.int64)
+            bitmaps.append(bitmap)
+        if not bitmaps:
+            return np.arange(self.size, dtype=np.int64)
+        combined = reduce(np.bitwise_and, bitmaps)
+        return np.flatnonzero(np.unpackbits(combined, count=self.size))
+
+    def facet_counts(self, col: str, positions: Optional[np.ndarray] = None) -> Dict[Any, int]:
+        """Value counts of ``col`` over ``positions`` (all rows by default), sorted by value."""
+        codes = self.codes[col] if positions is None else self.codes[col][positions]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.labels[col]))
+        return {
+            self.labels[col][i]: int(counts[i])
+            for i in self.sorted_codes[col]
+            if counts[i] > 0
+        }
+
+    def rows(self, positions: np.ndarray) -> List[Dict[str, Any]]:
+        records = self.records
+        return [records[i] for i in positions]
@@ -0,0 +1,293 @@
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.config import Config
+
+logger = logging.getLogger("app.metrics")
+
+# Latency bucket upper bounds in seconds: every half power of two from ~61us to
+# 128s, fine enough that interpolated p99s stay within ~20% of the true value
+LATENCY_BUCKETS: Tuple[float, ...] = tuple(2.0 ** (e / 2) for e in range(-28, 15))
+# Body size bucket upper bounds in bytes: powers of four from 64B to 64MB
+SIZE_BUCKETS: Tuple[float, ...] = tuple(float(4 ** e) for e in range(3, 14))
+QUANTILES = (0.5, 0.95, 0.99)
+# Label for requests no route matched, so stray paths cannot grow the series set
+UNMATCHED = "<unmatched>"
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``observe`` is a bisect and two additions."""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "_lock")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> Tuple[List[int], int, float]:
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+    def quantile(self, q: float, counts: Optional[List[int]] = None) -> float:
+        """Estimate the ``q`` quantile by interpolating inside its bucket."""
+        if counts is None:
+            counts = self.snapshot()[0]
+        total = sum(counts)
+        if total == 0:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1]  # beyond the last bound
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+
+class RequestTrace:
+    """Phase spans of one request, filled in by ``span`` wherever it runs.
+
+    The trace lives in a context variable; sync routes run in the threadpool
+    with a copy of the request's context, so they append to the same object.
+    """
+
+    __slots__ = ("spans",)
+
+    def __init__(self) -> None:
+        self.spans: List[Tuple[str, float]] = []
+
+
+_current_trace: "contextvars.ContextVar[Optional[RequestTrace]]" = contextvars.ContextVar("request_trace", default=None)
+
+
+@contextmanager
+def span(phase: str) -> Iterator[None]:
+    """Time a phase of the current request; a no-op outside a request."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.spans.append((phase, time.perf_counter() - start))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class HttpMetrics:
+    """Per-route request metrics in memory, rendered as Prometheus text.
+
+    Series are keyed by the route template (``/api/lineup/refresh/{job_id}``)
+    rather than the raw path. Each worker process keeps its own counts;
+    Prometheus scrapes them per instance.
+    """
+
+    def __init__(self, slow_request_ms: float = 0.0) -> None:
+        self.slow_request_ms = slow_request_ms
+        self._lock = threading.Lock()
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.request_size: Dict[Tuple[str, str], Histogram] = {}
+        self.response_size: Dict[Tuple[str, str], Histogram] = {}
+        self.phases: Dict[Tuple[str, str], Histogram] = {}
+        self.statuses: Dict[Tuple[str, str, int], int] = {}
+        self.in_flight = 0
+
+    def _histogram(self, series: Dict, key: Tuple, bounds: Sequence[float]) -> Histogram:
+        histogram = series.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = series.setdefault(key, Histogram(bounds))
+        return histogram
+
+    def begin(self) -> RequestTrace:
+        with self._lock:
+            self.in_flight += 1
+        return RequestTrace()
+
+    def end(
+        self,
+        route: str,
+        method: str,
+        status: int,
+        seconds: float,
+        request_bytes: int,
+        response_bytes: int,
+        trace: RequestTrace,
+    ) -> None:
+        key = (route, method)
+        self._histogram(self.latency, key, LATENCY_BUCKETS).observe(seconds)
+        self._histogram(self.request_size, key, SIZE_BUCKETS).observe(request_bytes)
+        self._histogram(self.response_size, key, SIZE_BUCKETS).observe(response_bytes)
+        for phase, elapsed in trace.spans:
+            self._histogram(self.phases, (route, phase), LATENCY_BUCKETS).observe(elapsed)
+        with self._lock:
+            self.in_flight -= 1
+            status_key = (route, method, status)
+            self.statuses[status_key] = self.statuses.get(status_key, 0) + 1
+        if self.slow_request_ms and seconds * 1000 >= self.slow_request_ms:
+            phases = " ".join(f"{p}={e * 1000:.1f}ms" for p, e in trace.spans)
+            logger.warning(f"Slow request {method} {route} status={status} total={seconds * 1000:.1f}ms {phases}".rstrip())
+
+    def summary(self) -> Dict[str, Any]:
+        """p50/p95/p99 latency per route, in milliseconds, for JSON consumers."""
+        out = {}
+        for (route, method), histogram in sorted(list(self.latency.items())):
+            counts, count, total = histogram.snapshot()
+            out[f"{method} {route}"] = {
+                "count": count,
+                "mean_ms": round(total / count * 1000, 3) if count else 0.0,
+                **{f"p{int(q * 100)}_ms": round(histogram.quantile(q, counts) * 1000, 3) for q in QUANTILES},
+            }
+        return out
+
+    def _render_histograms(self, lines: List[str], name: str, help_text: str, series: Dict, label_names: Sequence[str]) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for key, histogram in sorted(list(series.items())):
+            counts, count, total = histogram.snapshot()
+            cumulative = 0
+            bucket_names = (*label_names, "le")
+            for bound, n in zip(histogram.bounds, counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(bucket_names, (*key, repr(bound)))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(bucket_names, (*key, '+Inf'))} {count}")
+            lines.append(f"{name}_sum{_labels(label_names, key)} {total!r}")
+            lines.append(f"{name}_count{_labels(label_names, key)} {count}")
+
+    def render(self) -> str:
+        """All series in the Prometheus text exposition format (0.0.4)."""
+        lines: List[str] = []
+        lines.append("# HELP http_requests_in_flight Requests currently being served.")
+        lines.append("# TYPE http_requests_in_flight gauge")
+        lines.append(f"http_requests_in_flight {self.in_flight}")
+        lines.append("# HELP http_requests_total Completed requests by route, method and status code.")
+        lines.append("# TYPE http_requests_total counter")
+        with self._lock:
+            statuses = sorted(self.statuses.items())
+        for (route, method, status), n in statuses:
+            lines.append(f"http_requests_total{_labels(('route', 'method', 'status'), (route, method, status))} {n}")
+        self._render_histograms(lines, "http_request_duration_seconds", "Request latency by route.", self.latency, ("route", "method"))
+        # Quantiles estimated from the buckets above, for dashboards without histogram_quantile
+        lines.append("# HELP http_request_duration_quantile_seconds Estimated latency quantiles by route.")
+        lines.append("# TYPE http_request_duration_quantile_seconds gauge")
+        for key, histogram in sorted(list(self.latency.items())):
+            counts = histogram.snapshot()[0]
+            for q in QUANTILES:
+                labels = _labels(("route", "method", "quantile"), (*key, q))
+                lines.append(f"http_request_duration_quantile_seconds{labels} {histogram.quantile(q, counts)!r}")
+        self._render_histograms(lines, "http_request_size_bytes", "Request body size by route.", self.request_size, ("route", "method"))
+        self._render_histograms(lines, "http_response_size_bytes", "Response body size by route.", self.response_size, ("route", "method"))
+        self._render_histograms(lines, "http_request_phase_seconds", "Time spent in named phases of a request.", self.phases, ("route", "phase"))
+        return "\n".join(lines) + "\n"
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """Full template of the matched route, ``include_router`` prefix included.
+
+    ``scope["route"]`` only knows its path inside its router, so the prefix is
+    recovered from the request path: it is whatever precedes the part the
+    route's own pattern matches (the earliest such split, as prefixes are
+    literal).
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if not template:
+        return UNMATCHED
+    path = scope.get("path", "")
+    pattern = getattr(route, "path_regex", None)
+    if pattern is None or pattern.match(path):
+        return template
+    start = path.find("/", 1)
+    while start != -1:
+        if pattern.match(path[start:]):
+            return path[:start] + template
+        start = path.find("/", start + 1)
+    return template
+
+
+class MetricsMiddleware:
+    """ASGI middleware feeding ``HttpMetrics``; websockets pass straight through.
+
+    Body sizes are counted from the ASGI messages, so streamed responses are
+    measured in full. Spans recorded during the request are also returned in
+    a ``Server-Timing`` header when the route finishes them before responding.
+    """
+
+    def __init__(self, app: Any, metrics: "HttpMetrics" = None) -> None:
+        self.app = app
+        self.metrics = metrics if metrics is not None else http_metrics
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        metrics = self.metrics
+        trace = metrics.begin()
+        token = _current_trace.set(trace)
+        start = time.perf_counter()
+        status = 500
+        request_bytes = 0
+        response_bytes = 0
+
+        async def counting_receive():
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if trace.spans:
+                    timing = ", ".join(f"{p};dur={e * 1000:.2f}" for p, e in trace.spans)
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode("latin-1"))]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            _current_trace.reset(token)
+            metrics.end(
+                route_template(scope),
+                scope["method"],
+                status,
+                time.perf_counter() - start,
+                request_bytes,
+                response_bytes,
+                trace,
+            )
+
+
+# Global request metrics, fed by MetricsMiddleware and served at /metrics
+http_metrics = HttpMetrics(slow_request_ms=Config.METRICS_SLOW_REQUEST_MS)
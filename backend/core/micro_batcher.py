@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("app.micro_batcher")
+
+
+class MicroBatcher:
+    """Coalesces concurrent single calls into batched calls of ``fn``.
+
+    Callers ``await submit(item)``; a worker collects items until
+    ``max_batch`` are queued or ``max_wait_ms`` has passed since the first
+    one, runs ``fn(items)`` once in a worker thread and resolves each
+    caller's future with its element of the returned sequence.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[Any]], Sequence[Any]],
+        max_batch: int = 64,
+        max_wait_ms: float = 5.0,
+        name: str = "batcher",
+        latency_window: int = 10_000,
+    ) -> None:
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._queue: Optional["asyncio.Queue[Tuple[Any, asyncio.Future, float]]"] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self.batch_sizes: Counter = Counter()
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        # Queues and tasks belong to one loop; rebuild if the app's loop changed
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self.requests += 1
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future, float]]:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Anything already queued joins without waiting
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            items = [item for item, _, _ in batch]
+            self.batches += 1
+            self.batch_sizes[len(batch)] += 1
+            try:
+                results = list(await self._loop.run_in_executor(None, self.fn, items))
+                if len(results) != len(items):
+                    # zip() would leave the unmatched callers waiting forever
+                    raise ValueError(f"{self.name} returned {len(results)} results for {len(items)} items")
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"{self.name} batch of {len(items)} failed: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finished = time.perf_counter()
+            for (_, future, queued_at), result in zip(batch, results):
+                self._latencies.append(finished - queued_at)
+                if not future.done():
+                    future.set_result(result)
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            if self._loop is asyncio.get_running_loop():
+                try:
+                    await self._worker
+                except asyncio.CancelledError:
+                    pass
+            self._worker = None
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = np.fromiter(self._latencies, dtype=np.float64)
+        p50, p99 = (float(v) for v in np.percentile(latencies, [50, 99]) * 1000) if len(latencies) else (None, None)
+        return {
+            "name": self.name,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "requests": self.requests,
+            "batches": self.batches,
+            "errors": self.errors,
+            "batch_size_histogram": {str(size): count for size, count in sorted(self.batch_sizes.items())},
+            "latency_ms": {"p50": p50, "p99": p99},
+        }
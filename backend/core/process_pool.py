@@ -0,0 +1,173 @@
+import asyncio
+import functools
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from core.config import Config
+
+logger = logging.getLogger("app.process_pool")
+
+# Callables ("module:attr.path") each worker runs once at start-up so jobs
+# find the model and data snapshots already loaded
+DEFAULT_WARMUP = (
+    "core.data_store:predictions_store.get",
+    "advanced.model_registry:model_store.get",
+)
+
+
+def _resolve(target: str) -> Callable[[], Any]:
+    module_name, _, attr_path = target.partition(":")
+    obj: Any = importlib.import_module(module_name)
+    for attr in attr_path.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _warm_worker(warmup: Sequence[str]) -> None:
+    for target in warmup:
+        try:
+            _resolve(target)()
+        except Exception as e:  # a missing snapshot must not kill the worker
+            logging.getLogger("app.process_pool").warning(f"warm-up {target} failed: {e}")
+
+
+def default_workers() -> int:
+    """cores - 1 for a single server process; with several uvicorn workers
+    (WEB_CONCURRENCY), each one's pool gets its share of the cores."""
+    cpus = os.cpu_count() or 2
+    try:
+        servers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    except ValueError:
+        servers = 1
+    if servers > 1:
+        return max(1, cpus // servers)
+    return max(1, cpus - 1)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class CpuPool:
+    """Managed process pool for CPU-bound work called from async routes.
+
+    Workers are spawned (not forked, the server runs threads) and warmed by
+    ``warmup`` before taking jobs. ``run`` awaits a job without blocking the
+    event loop; a timeout fails the caller but cannot interrupt the worker,
+    which finishes the job in the background.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        warmup: Sequence[str] = DEFAULT_WARMUP,
+        timeout: float = 60.0,
+        name: str = "cpu_pool",
+    ) -> None:
+        self.max_workers = max_workers or default_workers()
+        self.name = name
+        self.warmup = tuple(warmup)
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.in_flight = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+                initargs=(self.warmup,),
+            )
+        # Start every worker now rather than on the first real job
+        for _ in range(self.max_workers):
+            self._executor.submit(_ping)
+        logger.info(f"{self.name} started with {self.max_workers} workers")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Queue ``fn(*args, **kwargs)``; ``fn`` must be picklable (module level)."""
+        if self._executor is None:
+            self.start()
+        job = functools.partial(fn, *args, **kwargs)
+        try:
+            future = self._executor.submit(job)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); replace the pool once and retry
+            logger.warning(f"{self.name} broken, restarting workers")
+            self.shutdown()
+            self.start()
+            future = self._executor.submit(job)
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future: Future) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def call(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """Blocking variant for background threads."""
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout or self.timeout)
+        except TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """Await ``fn(*args, **kwargs)`` in a worker; raises asyncio.TimeoutError."""
+        started = time.perf_counter()
+        future = asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            logger.warning(f"{getattr(fn, '__name__', fn)} timed out after {time.perf_counter() - started:.1f}s")
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "workers": self.max_workers,
+            "running": self._executor is not None,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+        }
+
+
+# Global CPU pool for short request jobs; started and stopped with the app
+cpu_pool = CpuPool(max_workers=Config.CPU_POOL_WORKERS or None, timeout=Config.CPU_POOL_TIMEOUT)
+# Model training gets its own process, spawned on the first job, so an
+# hours-long fit never holds a worker that /api/lineup/optimize is waiting on
+train_pool = CpuPool(max_workers=1, warmup=(), timeout=Config.TRAIN_TIMEOUT, name="train_pool")
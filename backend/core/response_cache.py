@@ -0,0 +1,109 @@
+import gzip
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """A serialized JSON body plus its precompressed variants and ETag."""
+    body: bytes
+    gzip: bytes
+    br: Optional[bytes]
+    etag: str
+
+
+def build_cached_body(body: bytes) -> CachedBody:
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    return CachedBody(
+        body=body,
+        gzip=gzip.compress(body, compresslevel=6),
+        br=brotli.compress(body, quality=5) if brotli is not None else None,
+        etag=etag,
+    )
+
+
+def dataframe_to_json(df: pd.DataFrame) -> bytes:
+    """Serialize ``df`` as a JSON array of records (NaN becomes null)."""
+    return df.to_json(orient="records", date_format="iso", double_precision=15).encode("utf-8")
+
+
+class ResponseCache:
+    """Keeps one serialized body per key, rebuilt only when the version changes."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[Hashable, Tuple[Hashable, CachedBody]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def get_or_build(self, key: Hashable, version: Hashable, build: Callable[[], bytes]) -> CachedBody:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            cached = build_cached_body(build())
+            self._entries[key] = (version, cached)
+            self.builds += 1
+            return cached
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": "responses", "hits": self.hits, "builds": self.builds, "entries": len(self._entries)}
+
+
+def _etag_matches(if_none_match: str, etags: Tuple[str, ...]) -> bool:
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate in etags:
+            return True
+    return False
+
+
+def _variant_etag(etag: str, encoding: Optional[str]) -> str:
+    # Each content-coding is a distinct representation, so it gets its own strong tag
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def cached_json_response(request: Request, cached: CachedBody) -> Response:
+    """Serve ``cached`` as raw bytes, honouring If-None-Match and Accept-Encoding."""
+    accept_encoding = request.headers.get("accept-encoding", "")
+    if cached.br is not None and "br" in accept_encoding:
+        encoding, content = "br", cached.br
+    elif "gzip" in accept_encoding:
+        encoding, content = "gzip", cached.gzip
+    else:
+        encoding, content = None, cached.body
+
+    headers = {
+        "ETag": _variant_etag(cached.etag, encoding),
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "no-cache",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    variants = tuple(_variant_etag(cached.etag, e) for e in (None, "gzip", "br"))
+    if if_none_match and _etag_matches(if_none_match, variants):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+# Global cache of serialized response bodies
+response_cache = ResponseCache()
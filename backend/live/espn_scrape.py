@@ -1,35 +1,50 @@
-import requests
 import pandas as pd
 import os
+import sys
+import httpx
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from core.data_store import ESPN_STATS_CSV, write_atomic
+from core.http_client import source_client
+
 load_dotenv(os.path.join(os.path.dirname(__file__), '../../.env'))
 
-def fetch_espn_player_stats():
-    url = "https://www.espn.com/nba/stats/player"
-    response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-    if response.status_code != 200:
-        print("Failed to fetch ESPN stats")
-        return []
-    soup = BeautifulSoup(response.text, 'html.parser')
+ESPN_STATS_URL = "https://www.espn.com/nba/stats/player"
+
+def parse_espn_stats_table(html):
+    soup = BeautifulSoup(html, 'html.parser')
     players = []
     # ESPN's table structure: find the main stats table
     table = soup.find('table')
     if not table:
-        print("No table found on ESPN stats page.")
-        return []
+        return None
     headers = [th.get_text(strip=True) for th in table.find('thead').find_all('th')]
     for row in table.find('tbody').find_all('tr'):
         cols = row.find_all('td')
         if len(cols) == len(headers):
             player_data = {headers[i]: cols[i].get_text(strip=True) for i in range(len(headers))}
             players.append(player_data)
+    return players
+
+def fetch_espn_player_stats():
+    try:
+        response = source_client.get_sync("espn", ESPN_STATS_URL)
+    except httpx.HTTPError as e:
+        print(f"Failed to fetch ESPN stats: {e}")
+        return []
+    if response.status_code != 200:
+        print("Failed to fetch ESPN stats")
+        return []
+    players = parse_espn_stats_table(response.text)
+    if players is None:
+        print("No table found on ESPN stats page.")
+        return []
     # Save to CSV for backend use
     df = pd.DataFrame(players)
-    out_path = os.path.join("backend", "data", "espn_player_stats.csv")
-    df.to_csv(out_path, index=False)
-    print(f"Saved {len(df)} ESPN player stats to {out_path}")
+    write_atomic(df, ESPN_STATS_CSV)
+    print(f"Saved {len(df)} ESPN player stats to {ESPN_STATS_CSV}")
     return players
 
 if __name__ == "__main__":
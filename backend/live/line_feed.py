@@ -0,0 +1,109 @@
+# live/line_feed.py
+import asyncio
+import logging
+import re
+import threading
+
+import numpy as np
+
+from core.broadcaster import Broadcaster
+from core.config import Config
+from live import line_history
+
+logger = logging.getLogger("app.line_feed")
+
+_MATCHUP_SPLIT = re.compile(r"\s+(?:vs\.?|@|at)\s+", re.IGNORECASE)
+# Odds API sport keys -> the short names clients filter on ('basketball_nba' -> 'nba')
+SPORT_NAMES = {key: name for name, key in Config.ODDS_SPORTS_MAP.items()}
+
+
+def matchup_teams(matchup):
+    """'Away vs Home' -> ('Away', 'Home'); anything else -> ()."""
+    if not isinstance(matchup, str) or not matchup:
+        return ()
+    return tuple(part.strip() for part in _MATCHUP_SPLIT.split(matchup) if part.strip())
+
+
+def line_messages(version, changes):
+    """One message per changed line, keyed by the line so a newer move of the
+    same line replaces an unsent one, plus a version marker."""
+    records = changes.replace({np.nan: None}).to_dict(orient="records")
+    messages = []
+    for row in records:
+        key = tuple(row.get(col) for col in line_history.KEY_COLUMNS)
+        row.pop("version", None)
+        row.pop("recorded_at", None)
+        messages.append(Broadcaster.message(
+            "line",
+            {"version": version, **row},
+            key=key,
+            sport=SPORT_NAMES.get(row.get("sport"), row.get("sport")),
+            teams=matchup_teams(row.get("matchup")),
+            players=[row.get("player")],
+        ))
+    messages.append(Broadcaster.message("version", {"version": version, "changes": len(records)}, key="predictions"))
+    return messages
+
+
+class LineFeed:
+    """Pushes line movements to the broadcaster as they are recorded.
+
+    In-process updates arrive through ``line_history.subscribe``; updates
+    written by another process (the scheduled ``update_predictions`` run) are
+    picked up by polling the version file and reading the movement log. A
+    version is published once whichever path sees it first. With several
+    workers only the ``leader`` polls; the backplane carries its messages to
+    the others.
+    """
+
+    def __init__(self, broadcaster, poll_interval=Config.LINE_FEED_POLL_SECONDS, leader=None):
+        self.broadcaster = broadcaster
+        self.poll_interval = poll_interval
+        self.leader = leader
+        self.last_version = line_history.read_version()
+        self._lock = threading.Lock()
+        self._task = None
+        line_history.subscribe(self._on_snapshot)
+
+    def _on_snapshot(self, version, changes):
+        with self._lock:
+            if version <= self.last_version:
+                return
+            self.last_version = version
+        self.broadcaster.publish_many(line_messages(version, changes))
+
+    def poll(self):
+        version = line_history.read_version()
+        with self._lock:
+            since = self.last_version
+            if version <= since:
+                return
+            self.last_version = version
+        if self.leader is not None and not self.leader.is_leader():
+            return  # the leader publishes it; a takeover starts from here
+        deltas = line_history.read_deltas(since)
+        for delta_version, changes in deltas.groupby("version", sort=True):
+            self.broadcaster.publish_many(line_messages(int(delta_version), changes))
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.poll)
+            except Exception as e:
+                logger.error(f"Line feed poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.leader is not None:
+            self.leader.release()
@@ -0,0 +1,219 @@
+# live/line_history.py
+import bisect
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.data_store import DATA_DIR, file_lock
+
+MOVEMENTS_LOG = os.path.join(DATA_DIR, "line_movements.csv")
+# "version,byte offset" of each version's first row in the movement log
+MOVEMENTS_INDEX = os.path.join(DATA_DIR, "line_movements.idx")
+VERSION_PATH = os.path.join(DATA_DIR, "predictions_version.json")
+# Held from reading the current version to writing the next one
+VERSION_LOCK = os.path.join(DATA_DIR, "predictions_version.lock")
+
+KEY_COLUMNS = ["event_id", "bookmaker", "market", "outcome_name", "player"]
+VALUE_COLUMNS = ["point", "price"]
+# Filled in by the score ingester; a line whose result changed is "settled"
+SETTLEMENT_COLUMNS = ["actual_points", "outcome"]
+# Appended last, so rows logged before settlements were tracked still parse
+MOVEMENT_COLUMNS = (
+    ["version", "recorded_at", "change"] + KEY_COLUMNS
+    + VALUE_COLUMNS + ["prev_point", "prev_price", "sport", "matchup"]
+    + SETTLEMENT_COLUMNS
+)
+
+_listeners = []
+_listeners_lock = threading.Lock()
+# Parsed prefix of MOVEMENTS_INDEX, extended as the file grows
+_index = {"size": 0, "versions": [], "offsets": []}
+_index_lock = threading.Lock()
+
+
+def subscribe(callback):
+    """Register ``callback(version, changes_df)``, called after each published delta."""
+    with _listeners_lock:
+        _listeners.append(callback)
+
+
+def _keyed(df):
+    keyed = pd.DataFrame({
+        col: df[col].astype(object).where(df[col].notna(), "") if col in df.columns else ""
+        for col in KEY_COLUMNS
+    }, index=df.index)
+    for col in VALUE_COLUMNS:
+        # Rounded so a price reread from a CSV export matches the one just pulled
+        keyed[col] = pd.to_numeric(df[col], errors="coerce").astype(np.float64).round(4) if col in df.columns else np.nan
+    for col in ("sport", "matchup"):
+        keyed[col] = df[col].astype(object) if col in df.columns else None
+    keyed["actual_points"] = pd.to_numeric(df["actual_points"], errors="coerce").astype(np.float64).round(4) if "actual_points" in df.columns else np.nan
+    keyed["outcome"] = df["outcome"].astype(object).where(df["outcome"].notna(), "") if "outcome" in df.columns else ""
+    return keyed.drop_duplicates(KEY_COLUMNS, keep="last")
+
+
+def _unkeyed(changes):
+    # An unsettled line goes out with no outcome, not an empty one
+    changes["outcome"] = changes["outcome"].where(changes["outcome"].ne("") & changes["outcome"].notna(), None)
+    return changes
+
+
+def diff_snapshots(previous, current):
+    """Rows added, removed, moved or settled between two odds tables, keyed
+    by (event, bookmaker, market, outcome, player)."""
+    current_keyed = _keyed(current)
+    if previous is None or previous.empty or not set(KEY_COLUMNS[:3]).issubset(previous.columns):
+        changes = current_keyed.assign(change="added", prev_point=np.nan, prev_price=np.nan)
+        return _unkeyed(changes.reset_index(drop=True))
+    previous_keyed = _keyed(previous)
+    merged = previous_keyed.merge(
+        current_keyed, on=KEY_COLUMNS, how="outer", suffixes=("_prev", ""), indicator=True
+    )
+    moved = np.zeros(len(merged), dtype=bool)
+    for col in VALUE_COLUMNS:
+        new, old = merged[col].to_numpy(), merged[f"{col}_prev"].to_numpy()
+        moved |= ~((new == old) | (np.isnan(new) & np.isnan(old)))
+    new, old = merged["actual_points"].to_numpy(), merged["actual_points_prev"].to_numpy()
+    settled = ~((new == old) | (np.isnan(new) & np.isnan(old)))
+    settled |= merged["outcome"].to_numpy() != merged["outcome_prev"].to_numpy()
+    change = np.select(
+        [merged["_merge"].eq("right_only"), merged["_merge"].eq("left_only"), moved, settled],
+        ["added", "removed", "changed", "settled"],
+        default="",
+    )
+    merged["change"] = change
+    merged = merged[merged["change"] != ""]
+    for col in ("sport", "matchup"):
+        merged[col] = merged[col].where(merged[col].notna(), merged[f"{col}_prev"])
+    return _unkeyed(merged.rename(columns={"point_prev": "prev_point", "price_prev": "prev_price"})[
+        KEY_COLUMNS + VALUE_COLUMNS + ["prev_point", "prev_price", "sport", "matchup"]
+        + SETTLEMENT_COLUMNS + ["change"]
+    ].reset_index(drop=True))
+
+
+def read_version():
+    try:
+        with open(VERSION_PATH, encoding="utf-8") as f:
+            return json.load(f).get("version", 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _write_version(version, rows, changes):
+    tmp_path = f"{VERSION_PATH}.tmp.{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "updated_at": time.time(), "rows": rows, "changes": changes}, f)
+    os.replace(tmp_path, VERSION_PATH)
+
+
+def _scan_offsets():
+    """(version, offset) of each version's first row, from the log itself."""
+    entries = []
+    with open(MOVEMENTS_LOG, "rb") as f:
+        offset = len(f.readline())  # header
+        for line in f:
+            version = int(line.split(b",", 1)[0])
+            if not entries or entries[-1][0] != version:
+                entries.append((version, offset))
+            offset += len(line)
+    return entries
+
+
+def append_movements(version, changes):
+    """Append one version's changes to the movement log (never rewritten)
+    and index where they start. Callers hold VERSION_LOCK."""
+    log = changes.assign(version=version, recorded_at=pd.Timestamp.now(tz="UTC").isoformat())
+    os.makedirs(DATA_DIR, exist_ok=True)
+    if not os.path.exists(MOVEMENTS_LOG):
+        pd.DataFrame(columns=MOVEMENT_COLUMNS).to_csv(MOVEMENTS_LOG, index=False)
+        if os.path.exists(MOVEMENTS_INDEX):
+            os.remove(MOVEMENTS_INDEX)
+    elif not os.path.exists(MOVEMENTS_INDEX):
+        # A log written before the index existed: index it once
+        with open(MOVEMENTS_INDEX, "w", encoding="utf-8") as f:
+            f.writelines(f"{v},{o}\n" for v, o in _scan_offsets())
+    offset = os.path.getsize(MOVEMENTS_LOG)
+    log[MOVEMENT_COLUMNS].to_csv(MOVEMENTS_LOG, mode="a", header=False, index=False)
+    with open(MOVEMENTS_INDEX, "a", encoding="utf-8") as f:
+        f.write(f"{version},{offset}\n")
+
+
+def _offset_after(since_version):
+    """Log offset of the first version after ``since_version``; None without
+    an index, the log size when nothing is newer."""
+    try:
+        size = os.path.getsize(MOVEMENTS_INDEX)
+    except FileNotFoundError:
+        return None
+    with _index_lock:
+        if size < _index["size"]:
+            _index.update(size=0, versions=[], offsets=[])
+        if size > _index["size"]:
+            with open(MOVEMENTS_INDEX, "rb") as f:
+                f.seek(_index["size"])
+                chunk = f.read(size - _index["size"])
+            chunk = chunk[:chunk.rfind(b"\n") + 1]  # complete lines only
+            versions, offsets = _index["versions"], _index["offsets"]
+            for line in chunk.splitlines():
+                version, offset = (int(x) for x in line.split(b","))
+                # A version re-logged after a crashed run replaces the orphaned one
+                while versions and versions[-1] >= version:
+                    versions.pop()
+                    offsets.pop()
+                versions.append(version)
+                offsets.append(offset)
+            _index["size"] += len(chunk)
+        i = bisect.bisect_right(_index["versions"], since_version)
+        if i < len(_index["offsets"]):
+            return _index["offsets"][i]
+    return os.path.getsize(MOVEMENTS_LOG)
+
+
+def read_deltas(since_version=0):
+    """Movement-log rows with a version greater than ``since_version``.
+
+    Only the tail of the log from the first newer version is parsed, so the
+    cost follows the size of the delta, not of the whole history.
+    """
+    empty = pd.DataFrame(columns=MOVEMENT_COLUMNS)
+    if not os.path.exists(MOVEMENTS_LOG):
+        return empty
+    offset = _offset_after(since_version)
+    if offset is None:
+        log = pd.read_csv(MOVEMENTS_LOG)
+        return log[log["version"] > since_version]
+    with open(MOVEMENTS_LOG, "rb") as f:
+        f.seek(offset)
+        try:
+            log = pd.read_csv(f, names=MOVEMENT_COLUMNS, header=None)
+        except pd.errors.EmptyDataError:
+            return empty
+    return log[log["version"] > since_version]
+
+
+def record_snapshot(previous, current, publish):
+    """Diff ``current`` against ``previous``, publish it and log the delta.
+
+    ``publish(current)`` runs before the log and version are written, so a
+    consumer that sees version N can already read the matching table.
+    Returns ``(version, changes)``; when nothing moved nothing is published
+    or written, the version is not bumped and ``changes`` is empty.
+    """
+    changes = diff_snapshots(previous, current)
+    if changes.empty:
+        return read_version(), changes
+    # Another process bumping the version in between would reuse the number
+    with file_lock(VERSION_LOCK):
+        publish(current)
+        version = read_version() + 1
+        append_movements(version, changes)
+        _write_version(version, len(current), len(changes))
+    with _listeners_lock:
+        listeners = list(_listeners)
+    for callback in listeners:
+        callback(version, changes)
+    return version, changes
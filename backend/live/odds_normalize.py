@@ -0,0 +1,134 @@
+# live/odds_normalize.py
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib parser is a drop-in fallback
+    orjson = None
+
+CATEGORY_COLUMNS = ["sport", "bookmaker", "market", "team"]
+FLOAT_COLUMNS = ["point", "price"]
+OBJECT_COLUMNS = ["event_id", "commence_time", "matchup", "outcome_name", "player"]
+COLUMN_ORDER = [
+    "sport", "event_id", "commence_time", "matchup", "bookmaker", "market",
+    "outcome_name", "player", "team", "point", "price",
+    "predicted_points", "actual_points", "outcome",
+]
+
+
+def loads(payload):
+    """Parse a raw Odds API body; already-decoded lists pass through."""
+    if isinstance(payload, (bytes, bytearray, memoryview, str)):
+        return orjson.loads(payload) if orjson is not None else json.loads(payload)
+    return payload
+
+
+class OddsTableBuilder:
+    """Accumulates Odds API responses straight into typed column arrays.
+
+    Each response is counted first so its columns are allocated once, then
+    filled by position: no per-outcome dicts are created. Low-cardinality
+    columns are dictionary-encoded as they are filled and come out as
+    categoricals, prices and points as float64 (float32 would turn a
+    1.91 price into 1.909999966621399 in the API).
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._categories = {name: {} for name in CATEGORY_COLUMNS}
+        self.rows = 0
+
+    def _code(self, column, value):
+        codes = self._categories[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+        return code
+
+    def add(self, payload, sport, market_key):
+        data = loads(payload)
+        markets = [
+            (game, bookmaker, market)
+            for game in data
+            for bookmaker in game.get("bookmakers", ())
+            for market in bookmaker.get("markets", ())
+            if market.get("key") == market_key
+        ]
+        total = sum(len(market.get("outcomes", ())) for _, _, market in markets)
+        if total == 0:
+            return 0
+
+        event_id = [None] * total
+        commence_time = [None] * total
+        matchup = [None] * total
+        outcome_name = [None] * total
+        point = [None] * total
+        price = [None] * total
+        bookmaker_codes = np.empty(total, dtype=np.int32)
+        team_codes = np.full(total, -1, dtype=np.int32)
+        is_player_market = market_key.startswith("player_")
+        player = [None] * total if is_player_market else None
+
+        i = 0
+        for game, bookmaker, market in markets:
+            outcomes = market.get("outcomes", ())
+            n = len(outcomes)
+            end = i + n
+            event_id[i:end] = [game.get("id")] * n
+            commence_time[i:end] = [game.get("commence_time")] * n
+            matchup[i:end] = [f"{game.get('away_team')} vs {game.get('home_team')}"] * n
+            bookmaker_codes[i:end] = self._code("bookmaker", bookmaker.get("key"))
+            for j, outcome in enumerate(outcomes, i):
+                name = outcome.get("name")
+                outcome_name[j] = name
+                point[j] = outcome.get("point")
+                price[j] = outcome.get("price")
+                if is_player_market:
+                    player[j] = outcome.get("description") or name
+                else:
+                    team_codes[j] = self._code("team", name)
+            i = end
+
+        self._chunks.append({
+            "sport": np.full(total, self._code("sport", sport), dtype=np.int32),
+            "market": np.full(total, self._code("market", market_key), dtype=np.int32),
+            "bookmaker": bookmaker_codes,
+            "team": team_codes,
+            "event_id": event_id,
+            "commence_time": commence_time,
+            "matchup": matchup,
+            "outcome_name": outcome_name,
+            "player": player if player is not None else [None] * total,
+            "point": np.array(point, dtype=np.float64),
+            "price": np.array(price, dtype=np.float64),
+            "is_player_market": is_player_market,
+        })
+        self.rows += total
+        return total
+
+    def to_frame(self):
+        if not self._chunks:
+            return pd.DataFrame(columns=COLUMN_ORDER)
+        columns = {}
+        for name in CATEGORY_COLUMNS:
+            codes = np.concatenate([chunk[name] for chunk in self._chunks])
+            categories = list(self._categories[name])
+            columns[name] = pd.Categorical.from_codes(codes, categories=pd.Index(categories, dtype=object))
+        for name in OBJECT_COLUMNS:
+            column = []
+            for chunk in self._chunks:
+                column.extend(chunk[name])
+            columns[name] = np.array(column, dtype=object)
+        for name in FLOAT_COLUMNS:
+            columns[name] = np.concatenate([chunk[name] for chunk in self._chunks])
+        # Player markets carry the line as the predicted value
+        player_mask = np.concatenate([
+            np.full(len(chunk["point"]), chunk["is_player_market"]) for chunk in self._chunks
+        ])
+        columns["predicted_points"] = np.where(player_mask, columns["point"], np.nan)
+        columns["actual_points"] = np.full(self.rows, np.nan)
+        columns["outcome"] = np.full(self.rows, None, dtype=object)
+        return pd.DataFrame(columns)[COLUMN_ORDER]
@@ -0,0 +1,36 @@
+import httpx
+from core.http_client import source_client
+
+PRIZEPICKS_PAGE_URL = "https://app.prizepicks.com/projections"
+PRIZEPICKS_API_URL = "https://api.prizepicks.com/projections"
+
+async def fetch_prizepicks_lines(league_id="7"):
+    """Fetch live PrizePicks projections; returns None if the API is unavailable."""
+    try:
+        # Get the main page to establish cookies/session
+        await source_client.get("prizepicks", PRIZEPICKS_PAGE_URL)
+        # PrizePicks data is loaded via XHR to this endpoint (NBA league_id=7)
+        params = {"league_id": league_id, "per_page": 1000}
+        resp = await source_client.get("prizepicks", PRIZEPICKS_API_URL, params=params)
+    except httpx.HTTPError:
+        return None
+    if resp.status_code != 200:
+        return None
+    data = resp.json()
+    # Parse player lines
+    lines = []
+    for projection in data.get("data", []):
+        player = projection.get("attributes", {}).get("name")
+        stat_type = projection.get("attributes", {}).get("stat_type")
+        line_score = projection.get("attributes", {}).get("line_score")
+        team = projection.get("attributes", {}).get("team")
+        sport = projection.get("attributes", {}).get("league")
+        if player and stat_type and line_score:
+            lines.append({
+                "player": player,
+                "line": line_score,
+                "stat": stat_type,
+                "team": team,
+                "sport": sport
+            })
+    return lines
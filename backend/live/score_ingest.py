@@ -0,0 +1,479 @@
+# live/score_ingest.py
+import argparse
+import asyncio
+import logging
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from core.config import Config
+from core.http_client import source_client
+from live.line_feed import SPORT_NAMES, matchup_teams
+from live.line_history import KEY_COLUMNS
+
+logger = logging.getLogger("app.score_ingest")
+
+SOURCE = "espn_scoreboard"
+# Player prop markets and the box-score column that settles them
+MARKET_STATS = {
+    "player_points": "PTS",
+    "player_rebounds": "REB",
+    "player_assists": "AST",
+    "player_threes": "3PT",
+}
+# Counting stats only go up: once past the line, the Over has won
+MONOTONIC_MARKETS = set(MARKET_STATS) | {"totals"}
+# A row belongs to a game when its commence_time is this close to the ESPN
+# start; the same teams meet again days apart, never within hours
+MATCH_WINDOW_SECONDS = 12 * 3600
+
+
+def _norm(name):
+    return re.sub(r"[^a-z0-9 ]", "", str(name).lower()).strip() if name else ""
+
+
+def _stat_value(raw):
+    # "27" -> 27.0; made-attempted pairs like "4-9" -> 4.0
+    try:
+        return float(str(raw).split("-")[0])
+    except ValueError:
+        return np.nan
+
+
+def parse_scoreboard(data):
+    """ESPN scoreboard JSON -> one dict per game."""
+    games = []
+    for event in data.get("events", ()):
+        status = event.get("status", {}).get("type", {})
+        competition = (event.get("competitions") or [{}])[0]
+        sides = {c.get("homeAway"): c for c in competition.get("competitors", ())}
+        home, away = sides.get("home", {}), sides.get("away", {})
+        games.append({
+            "id": str(event.get("id")),
+            "state": status.get("state", "pre"),
+            "completed": bool(status.get("completed")),
+            "detail": status.get("detail"),
+            "start": pd.Timestamp(event["date"]).timestamp() if event.get("date") else None,
+            "home": home.get("team", {}).get("displayName"),
+            "away": away.get("team", {}).get("displayName"),
+            "home_abbr": home.get("team", {}).get("abbreviation"),
+            "away_abbr": away.get("team", {}).get("abbreviation"),
+            "home_score": _stat_value(home.get("score", "nan")),
+            "away_score": _stat_value(away.get("score", "nan")),
+        })
+    return games
+
+
+def parse_boxscore(data):
+    """ESPN summary JSON -> {normalized player name: {stat label: value}}."""
+    players = {}
+    for team in data.get("boxscore", {}).get("players", ()):
+        for group in team.get("statistics", ()):
+            labels = group.get("labels") or group.get("names") or []
+            for athlete in group.get("athletes", ()):
+                name = _norm(athlete.get("athlete", {}).get("displayName"))
+                stats = players.setdefault(name, {})
+                for label, value in zip(labels, athlete.get("stats", ())):
+                    stats[label] = _stat_value(value)
+    return players
+
+
+def game_key(sport, teams):
+    """Sport plus both teams; rows with the same key are told apart by start time."""
+    return f"{sport}|" + "|".join(sorted(_norm(t) for t in teams))
+
+
+def row_starts(df):
+    """commence_time of each row as epoch seconds, NaN when missing."""
+    if "commence_time" not in df.columns:
+        return np.full(len(df), np.nan)
+    starts = pd.to_datetime(df["commence_time"].astype(object), utc=True, errors="coerce")
+    seconds = (starts - pd.Timestamp(0, tz="UTC")).dt.total_seconds()
+    return seconds.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def game_rows(keys, starts, game):
+    """Positions of the rows for ``game``: same teams, commence_time within
+    MATCH_WINDOW_SECONDS of its start. Rows without a time are never matched,
+    so a repeat matchup or a stale row is not settled with this box score."""
+    if game["start"] is None:
+        return np.empty(0, dtype=np.int64)
+    same_teams = keys == game_key(game["sport"], (game["home"], game["away"]))
+    return np.flatnonzero(same_teams & (np.abs(starts - game["start"]) <= MATCH_WINDOW_SECONDS))
+
+
+def settle_game(df, rows, game, box):
+    """Actual values and outcomes for prediction ``rows`` of one game.
+
+    ``outcome`` is always "Won", "Lost" or "Push" for the row's own side
+    (its ``outcome_name``), whatever the market. Player props and totals get
+    their running value while the game is live; once the value passes the
+    line the Over has won and the Under lost. Everything else is decided at
+    the final whistle. Returns (positions, actual, outcome) arrays for the
+    rows that changed.
+    """
+    final = game["state"] == "post" and game["completed"]
+    home, away = game["home_score"], game["away_score"]
+    markets = df["market"].to_numpy(dtype=object)[rows]
+    names = df["outcome_name"].to_numpy(dtype=object)[rows]
+    players = df["player"].to_numpy(dtype=object)[rows] if "player" in df.columns else np.full(len(rows), None)
+    point = pd.to_numeric(df["point"], errors="coerce").to_numpy(dtype=np.float64)[rows]
+    actual = np.full(len(rows), np.nan)
+    outcome = np.full(len(rows), None, dtype=object)
+    for i, market in enumerate(markets):
+        if market in MARKET_STATS:
+            actual[i] = box.get(_norm(players[i]), {}).get(MARKET_STATS[market], np.nan)
+        elif market == "totals":
+            actual[i] = home + away
+        elif market in ("h2h", "spreads"):
+            side = _norm(names[i])
+            own, other = (home, away) if side == _norm(game["home"]) else (away, home) if side == _norm(game["away"]) else (np.nan, np.nan)
+            margin = own - other
+            if market == "h2h":
+                actual[i] = own
+                if final and not np.isnan(margin):
+                    outcome[i] = "Won" if margin > 0 else "Lost" if margin < 0 else "Push"
+            else:
+                actual[i] = margin
+                if final and not np.isnan(margin) and not np.isnan(point[i]):
+                    covered = margin + point[i]
+                    outcome[i] = "Won" if covered > 0 else "Lost" if covered < 0 else "Push"
+            continue
+        side = _norm(names[i])
+        if np.isnan(actual[i]) or np.isnan(point[i]) or side not in ("over", "under"):
+            continue
+        if final or (actual[i] > point[i] and market in MONOTONIC_MARKETS):
+            over_by = actual[i] - point[i] if side == "over" else point[i] - actual[i]
+            outcome[i] = "Won" if over_by > 0 else "Lost" if over_by < 0 else "Push"
+
+    current_actual = pd.to_numeric(df["actual_points"], errors="coerce").to_numpy(dtype=np.float64)[rows]
+    current_outcome = df["outcome"].to_numpy(dtype=object)[rows]
+    same_actual = (actual == current_actual) | (np.isnan(actual) & np.isnan(current_actual))
+    same_outcome = np.array([a == b or (a is None and pd.isna(b)) for a, b in zip(outcome, current_outcome)], dtype=bool)
+    changed = ~(same_actual & same_outcome)
+    # A missing value never erases one already recorded
+    changed &= ~(np.isnan(actual) & ~np.isnan(current_actual))
+    return rows[changed], actual[changed], outcome[changed]
+
+
+def carry_settlements(previous, current):
+    """Copy actual_points/outcome from ``previous`` onto the same lines in
+    ``current``; a fresh odds pull starts them empty."""
+    if previous is None or previous.empty or "actual_points" not in previous.columns:
+        return current
+    settled = previous[previous["actual_points"].notna() | previous["outcome"].notna()]
+    keys = [c for c in KEY_COLUMNS if c in settled.columns and c in current.columns]
+    if settled.empty or not keys:
+        return current
+
+    def keyed(df):
+        return pd.MultiIndex.from_frame(df[keys].astype(object).where(df[keys].notna(), ""))
+
+    lookup = pd.Series(np.arange(len(settled)), index=keyed(settled))
+    lookup = lookup[~lookup.index.duplicated(keep="last")]
+    positions = lookup.reindex(keyed(current)).to_numpy()
+    hit = ~np.isnan(positions)
+    if not hit.any():
+        return current
+    source = positions[hit].astype(np.int64)
+    current = current.copy()
+    actual = current["actual_points"].to_numpy(dtype=np.float64, copy=True)
+    actual[hit] = settled["actual_points"].to_numpy(dtype=np.float64)[source]
+    current["actual_points"] = actual.astype(current["actual_points"].dtype)
+    outcome = current["outcome"].to_numpy(dtype=object, copy=True)
+    outcome[hit] = settled["outcome"].to_numpy(dtype=object)[source]
+    current["outcome"] = outcome
+    return current
+
+
+def _load_predictions():
+    from core.data_store import predictions_store
+    snapshot = predictions_store.get()
+    return snapshot.data.copy() if snapshot is not None else None
+
+
+def _save_predictions(df):
+    # Versioned like an odds pull, so the feed and /changes see settlements
+    from core.data_store import predictions_store
+    from live.line_history import record_snapshot
+    from live.update_predictions import publish_predictions
+    snapshot = predictions_store.get()
+    record_snapshot(snapshot.data if snapshot is not None else None, df, publish_predictions)
+
+
+def _predictions_lock():
+    from core.data_store import PREDICTIONS_LOCK, file_lock
+    return file_lock(PREDICTIONS_LOCK)
+
+
+class ScoreIngester:
+    """Polls ESPN scoreboards and settles predictions as stats come in.
+
+    Each sport is polled on its own schedule: every LIVE seconds while a
+    game is in progress, every PRE seconds once one starts within LEAD
+    seconds, otherwise rarely (IDLE) — when every game is final the sport
+    just waits for the next slate. Box scores are only fetched for live
+    games and once more when a game goes final. All requests carry the last
+    ETag/Last-Modified, so unchanged boards cost a 304 and no work.
+    Settled rows are written in one publish per cycle, under the same
+    ``lock`` as ``update_predictions`` so neither overwrites the other, and
+    pushed through ``publish`` (the broadcaster) as score and settlement
+    events. A final game stops being polled only once its settlement is saved;
+    its cached box score goes with it, and games that leave the scoreboard
+    are forgotten, so the caches follow the current slate.
+    """
+
+    def __init__(
+        self,
+        client=source_client,
+        base_url=None,
+        sports=None,
+        load=_load_predictions,
+        save=_save_predictions,
+        lock=_predictions_lock,
+        publish=None,
+        leader=None,
+        clock=time.time,
+    ):
+        self.client = client
+        self.base_url = (base_url or Config.ESPN_BASE).rstrip("/")
+        self.endpoints = {s: p for s, p in Config.ESPN_ENDPOINTS.items() if sports is None or s in sports}
+        self.load = load
+        self.save = save
+        self.lock = lock
+        self.publish = publish
+        self.leader = leader
+        self.clock = clock
+        self.next_poll = {sport: 0.0 for sport in self.endpoints}
+        self.games = {}
+        # Settled final games still on the scoreboard -> their sport
+        self.finalized = {}
+        self._validators = {}
+        self._bodies = {}
+        self._task = None
+        self.requests = 0
+        self.not_modified = 0
+        self.settled_rows = 0
+        self.errors = 0
+
+    # -- fetching ------------------------------------------------------------
+
+    async def _fetch(self, url):
+        """GET ``url`` conditionally; returns (data, changed)."""
+        validators = self._validators.get(url, {})
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        self.requests += 1
+        response = await self.client.get(SOURCE, url, headers=headers)
+        if response.status_code == 304 and url in self._bodies:
+            self.not_modified += 1
+            return self._bodies[url], False
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code} from {url}")
+        self._validators[url] = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+        }
+        data = response.json()
+        self._bodies[url] = data
+        return data, True
+
+    def delay_for(self, games, now):
+        if any(g["state"] == "in" for g in games):
+            return Config.SCORE_POLL_LIVE_SECONDS
+        starts = [g["start"] for g in games if g["state"] == "pre" and g["start"] is not None]
+        if starts:
+            until = min(starts) - now
+            if until <= Config.SCORE_PREGAME_LEAD_SECONDS:
+                return Config.SCORE_POLL_PRE_SECONDS
+            return min(until - Config.SCORE_PREGAME_LEAD_SECONDS, Config.SCORE_POLL_IDLE_SECONDS)
+        return Config.SCORE_POLL_IDLE_SECONDS
+
+    def _summary_url(self, sport, game_id):
+        return f"{self.base_url}{self.endpoints[sport].replace('/scoreboard', '/summary')}?event={game_id}"
+
+    def _forget(self, sport, game_id):
+        """Drop a game and its cached box score."""
+        self.games.pop(game_id, None)
+        url = self._summary_url(sport, game_id)
+        self._bodies.pop(url, None)
+        self._validators.pop(url, None)
+
+    async def poll_sport(self, sport):
+        """Refresh one sport; returns its games whose box score changed as
+        (game, box) pairs, plus every game whose score line changed."""
+        path = self.endpoints[sport]
+        board, changed = await self._fetch(self.base_url + path)
+        games = parse_scoreboard(board)
+        now = self.clock()
+        self.next_poll[sport] = now + self.delay_for(games, now)
+        updates, scores = [], []
+        for game in games:
+            game["sport"] = sport
+            if game["id"] in self.finalized:
+                continue
+            previous = self.games.get(game["id"])
+            if changed and previous != game:
+                scores.append(game)
+            self.games[game["id"]] = game
+            if game["state"] == "pre":
+                continue
+            box, box_changed = await self._fetch(self._summary_url(sport, game["id"]))
+            # A final game is settled again until a save succeeds (see run_once)
+            if box_changed or previous != game or game["state"] == "post":
+                updates.append((game, parse_boxscore(box)))
+        # Postponed games and yesterday's finals drop off the board
+        on_board = {game["id"] for game in games}
+        for game_id in [i for i, g in self.games.items() if g["sport"] == sport and i not in on_board]:
+            self._forget(sport, game_id)
+        for game_id in [i for i, s in self.finalized.items() if s == sport and i not in on_board]:
+            del self.finalized[game_id]
+        return updates, scores
+
+    # -- settlement ----------------------------------------------------------
+
+    def settle(self, updates):
+        """Apply box-score updates to the predictions table; one save."""
+        if not updates:
+            return []
+        with self.lock():
+            return self._settle(updates)
+
+    def _settle(self, updates):
+        df = self.load()
+        if df is None or df.empty:
+            return []
+        for column in ("actual_points", "outcome"):
+            if column not in df.columns:
+                df[column] = np.nan if column == "actual_points" else None
+        df["outcome"] = df["outcome"].astype(object)
+        sports = df["sport"].astype(object).map(lambda s: SPORT_NAMES.get(s, s)).to_numpy() if "sport" in df.columns else np.full(len(df), None)
+        matchups = df["matchup"].astype(object).to_numpy() if "matchup" in df.columns else np.full(len(df), None)
+        keys = np.array([game_key(s, matchup_teams(m)) for s, m in zip(sports, matchups)], dtype=object)
+        starts = row_starts(df)
+        actual_column = df["actual_points"].to_numpy(dtype=np.float64, copy=True)
+        outcome_column = df["outcome"].to_numpy(dtype=object, copy=True)
+        changed_rows = []
+        for game, box in updates:
+            rows = game_rows(keys, starts, game)
+            if not len(rows):
+                continue
+            positions, actual, outcome = settle_game(df, rows, game, box)
+            actual_column[positions] = actual
+            outcome_column[positions] = outcome
+            changed_rows.extend(positions.tolist())
+        if not changed_rows:
+            return []
+        df["actual_points"] = actual_column.astype(df["actual_points"].dtype if df["actual_points"].dtype.kind == "f" else np.float64)
+        df["outcome"] = outcome_column
+        self.save(df)
+        self.settled_rows += len(changed_rows)
+        return df.iloc[sorted(set(changed_rows))]
+
+    def _publish(self, scores, settled):
+        if self.publish is None:
+            return
+        from core.broadcaster import Broadcaster
+        messages = [
+            Broadcaster.message(
+                "score",
+                {k: (None if isinstance(v, float) and np.isnan(v) else v) for k, v in game.items()},
+                key=game["id"], sport=game["sport"],
+                teams=[game["home"], game["away"], game["home_abbr"], game["away_abbr"]],
+            )
+            for game in scores
+        ]
+        if len(settled):
+            columns = [c for c in KEY_COLUMNS + ["sport", "matchup", "point", "actual_points", "outcome"] if c in settled.columns]
+            for row in settled[columns].astype(object).where(settled[columns].notna(), None).to_dict(orient="records"):
+                messages.append(Broadcaster.message(
+                    "settlement", row,
+                    key=tuple(row.get(c) for c in KEY_COLUMNS),
+                    sport=SPORT_NAMES.get(row.get("sport"), row.get("sport")),
+                    teams=matchup_teams(row.get("matchup")),
+                    players=[row.get("player")],
+                ))
+        self.publish(messages)
+
+    # -- loop ----------------------------------------------------------------
+
+    async def run_once(self, force=False):
+        """Poll every sport that is due (all of them with ``force``)."""
+        now = self.clock()
+        due = [s for s, at in self.next_poll.items() if force or at <= now]
+        results = await asyncio.gather(*(self.poll_sport(s) for s in due), return_exceptions=True)
+        updates, scores = [], []
+        for sport, result in zip(due, results):
+            if isinstance(result, Exception):
+                self.errors += 1
+                self.next_poll[sport] = now + Config.SCORE_POLL_PRE_SECONDS
+                logger.warning(f"Score poll for {sport} failed: {result}")
+                continue
+            updates.extend(result[0])
+            scores.extend(result[1])
+        settled = await asyncio.to_thread(self.settle, updates) if updates else []
+        # Only now, with the results stored, can final games drop out of polling
+        for game, _ in updates:
+            if game["state"] == "post":
+                self.finalized[game["id"]] = game["sport"]
+                self._forget(game["sport"], game["id"])
+        self._publish(scores, settled)
+        return {"polled": due, "games": len(scores), "settled": len(settled)}
+
+    async def run(self):
+        while True:
+            if self.leader is None or self.leader.is_leader():
+                try:
+                    await self.run_once()
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"Score ingest cycle failed: {e}")
+                wait = min(self.next_poll.values(), default=self.clock() + 60) - self.clock()
+            else:
+                wait = Config.SCORE_POLL_PRE_SECONDS  # another worker ingests
+            await asyncio.sleep(min(max(wait, 1.0), Config.SCORE_POLL_IDLE_SECONDS))
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        now = self.clock()
+        return {
+            "name": "score_ingest",
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "settled_rows": self.settled_rows,
+            "errors": self.errors,
+            "live_games": sum(g["state"] == "in" for g in self.games.values()),
+            "next_poll_in": {s: round(max(at - now, 0.0), 1) for s, at in self.next_poll.items()},
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Poll ESPN scoreboards and settle predictions.")
+    parser.add_argument("--once", action="store_true", help="poll every sport once and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    ingester = ScoreIngester()
+    if args.once:
+        print(asyncio.run(ingester.run_once(force=True)), ingester.stats())
+    else:
+        asyncio.run(ingester.run())
@@ -1,79 +1,160 @@
 # live/update_predictions.py
-import requests
-import pandas as pd
+import asyncio
+import time
+import httpx
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from core.config import Config
+from core.columnar_store import MANIFEST_PATH, write_predictions
+from core.data_store import PREDICTIONS_LOCK, file_lock, predictions_store
+from core.http_client import source_client
+from live.odds_normalize import OddsTableBuilder, loads
+from live.line_history import record_snapshot
+from live.score_ingest import carry_settlements
+
 load_dotenv(os.path.join(os.path.dirname(__file__), '../.env'))
 
 # Configuration
-ODDS_API_KEY = os.getenv("THEODDS_API_KEY")
-BASE_URL_TEMPLATE = "https://api.the-odds-api.com/v4/sports/{sport}/odds"
-DATA_DIR = os.path.join("backend", "data")
-CSV_PATH = os.path.join(DATA_DIR, "predictions_latest.csv")
-
-# Helper: fetch odds for a given market
-def fetch_odds(sport, market):
-    url = BASE_URL_TEMPLATE.format(sport=sport)
-    params = {
+ODDS_API_KEY = os.getenv("THEODDS_API_KEY") or Config.ODDS_API_KEY
+BASE_URL_TEMPLATE = Config.ODDS_API_BASE + "/sports/{sport}/odds"
+# Player props are only served per event
+EVENTS_URL_TEMPLATE = Config.ODDS_API_BASE + "/sports/{sport}/events"
+EVENT_ODDS_URL_TEMPLATE = Config.ODDS_API_BASE + "/sports/{sport}/events/{event_id}/odds"
+
+def _odds_params(market):
+    return {
         "apiKey": ODDS_API_KEY,
         "regions": "us",
         "markets": market,
         "oddsFormat": "decimal"
     }
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"API returned {response.status_code} for market '{market}'.")
-        return []
+
+class OddsQuota:
+    """Tracks the Odds API quota from its x-requests-remaining response header."""
+
+    def __init__(self, floor=Config.ODDS_MIN_REQUESTS_REMAINING):
+        self.floor = floor
+        self.remaining = None
+        self.skipped = 0
+
+    def update(self, headers):
+        remaining = headers.get("x-requests-remaining")
+        if remaining is not None:
+            try:
+                value = int(float(remaining))
+            except ValueError:
+                return
+            # Concurrent responses can arrive out of order; keep the lowest count seen
+            self.remaining = value if self.remaining is None else min(self.remaining, value)
+
+    @property
+    def exhausted(self):
+        return self.remaining is not None and self.remaining <= self.floor
+
+async def _get(url, params, label, semaphore, quota):
+    """One Odds API request under the shared concurrency limit and quota; None on failure."""
+    async with semaphore:
+        if quota.exhausted:
+            quota.skipped += 1
+            return None
+        try:
+            response = await source_client.get("odds_api", url, params=params)
+        except httpx.HTTPError as e:
+            print(f"Odds API request failed for {label}: {e}")
+            return None
+        quota.update(response.headers)
+        if response.status_code != 200:
+            print(f"API returned {response.status_code} for {label}.")
+            return None
+        return response.content
+
+async def _fetch_market(sport, odds_sport, market, semaphore, quota):
+    url = BASE_URL_TEMPLATE.format(sport=odds_sport)
+    payload = await _get(url, _odds_params(market), f"{odds_sport}/{market}", semaphore, quota)
+    return [(sport, market, payload or [])]
+
+async def _fetch_event_props(sport, odds_sport, event_id, markets, semaphore, quota):
+    # One request covers every prop market of the event
+    url = EVENT_ODDS_URL_TEMPLATE.format(sport=odds_sport, event_id=event_id)
+    payload = await _get(url, _odds_params(",".join(markets)), f"{odds_sport}/{event_id}", semaphore, quota)
+    games = [loads(payload)] if payload else []
+    return [(sport, market, games) for market in markets]
+
+async def _fetch_props(sport, odds_sport, markets, semaphore, quota):
+    """Player-prop markets: list the sport's events, then fetch each one's props."""
+    url = EVENTS_URL_TEMPLATE.format(sport=odds_sport)
+    payload = await _get(url, {"apiKey": ODDS_API_KEY}, f"{odds_sport}/events", semaphore, quota)
+    events = loads(payload) if payload else []
+    results = await asyncio.gather(*(
+        _fetch_event_props(sport, odds_sport, event["id"], markets, semaphore, quota) for event in events
+    ))
+    return [entry for result in results for entry in result]
+
+async def ingest_odds(sports=None, markets=None, concurrency=Config.ODDS_MAX_CONCURRENCY):
+    """Fan out requests with bounded concurrency into one table.
+
+    Game markets are fetched per sport and market; player props per event,
+    since the sport-level endpoint rejects them. Responses are normalized as
+    they complete, so a full refresh takes about as long as the slowest
+    request rather than the sum of all of them.
+    """
+    sports = sports or list(Config.ODDS_SPORTS_MAP)
+    markets = markets or Config.ODDS_MARKETS
+    game_markets = [m for m in markets if not m.startswith("player_")]
+    prop_markets = [m for m in markets if m.startswith("player_")]
+    semaphore = asyncio.Semaphore(concurrency)
+    quota = OddsQuota()
+    tasks = [
+        asyncio.ensure_future(_fetch_market(sport, Config.ODDS_SPORTS_MAP[sport], market, semaphore, quota))
+        for sport in sports
+        for market in game_markets
+    ]
+    if prop_markets:
+        tasks += [
+            asyncio.ensure_future(_fetch_props(sport, Config.ODDS_SPORTS_MAP[sport], prop_markets, semaphore, quota))
+            for sport in sports
+        ]
+    builder = OddsTableBuilder()
+    for next_done in asyncio.as_completed(tasks):
+        for sport, market, payload in await next_done:
+            builder.add(payload, sport, market)
+    if quota.skipped:
+        print(f"Skipped {quota.skipped} requests: Odds API quota at {quota.remaining} remaining.")
+    return builder.to_frame()
+
+def publish_predictions(df):
+    """Atomically replace the predictions table read by the API.
+
+    The CSV copy is only written when PREDICTIONS_EXPORT_CSV is set.
+    """
+    write_predictions(df)
+    predictions_store.invalidate()
 
 # Main update function
-def update_predictions():
-    os.makedirs(DATA_DIR, exist_ok=True)
-    # Try player props market first
-    data = fetch_odds("basketball_nba", "player_points")
-    if not data:
-        # Fallback to head-to-head moneyline
-        print("Falling back to h2h odds.")
-        data = fetch_odds("basketball_nba", "h2h")
-        # We'll map team moneyline to predictions table
-        predictions = []
-        for game in data:
-            matchup = f"{game['home_team']} vs {game['away_team']}"
-            for bookmaker in game.get("bookmakers", []):
-                for market in bookmaker.get("markets", []):
-                    if market.get("key") == "h2h":
-                        for outcome in market.get("outcomes", []):
-                            predictions.append({
-                                "entity": outcome.get("name"),
-                                "matchup": matchup,
-                                "odds": outcome.get("price"),
-                                "type": "moneyline"
-                            })
-        df = pd.DataFrame(predictions)
-    else:
-        # Format player props data
-        predictions = []
-        for game in data:
-            home = game.get("home_team")
-            away = game.get("away_team")
-            for bookmaker in game.get("bookmakers", []):
-                for market in bookmaker.get("markets", []):
-                    if market.get("key") == "player_points":
-                        for outcome in market.get("outcomes", []):
-                            predictions.append({
-                                "player": outcome.get("name"),
-                                "team": outcome.get("name", "").split()[-1],
-                                "matchup": f"{away} vs {home}",
-                                "predicted_points": outcome.get("point"),
-                                "actual_points": None,
-                                "outcome": None
-                            })
-        df = pd.DataFrame(predictions)
-
-    df.to_csv(CSV_PATH, index=False)
-    print(f"Saved {len(df)} entries to {CSV_PATH}")
+def update_predictions(sports=None, markets=None):
+    started = time.perf_counter()
+    df = asyncio.run(ingest_odds(sports, markets))
+    if df.empty:
+        print("No odds returned; keeping the previous predictions.")
+        return
+    # The score ingester republishes the table too; holding the lock from
+    # read to publish keeps either writer from overwriting the other
+    with file_lock(PREDICTIONS_LOCK):
+        snapshot = predictions_store.get()
+        previous = snapshot.data if snapshot is not None else None
+        # Keep actual results the score ingester already settled on these lines
+        df = carry_settlements(previous, df)
+        # Only lines that moved are logged; an unchanged pull rewrites nothing
+        version, changes = record_snapshot(previous, df, publish_predictions)
+    elapsed = time.perf_counter() - started
+    if changes.empty:
+        print(f"No line changes across {len(df)} entries ({elapsed:.1f}s); predictions left as is.")
+        return
+    counts = changes["change"].value_counts().to_dict()
+    print(f"Saved {len(df)} entries to {MANIFEST_PATH} as version {version} ({counts}) in {elapsed:.1f}s")
 
 if __name__ == "__main__":
     update_predictions()
@@ -1,28 +1,21 @@
-from fastapi import APIRouter
-import shap
-import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from advanced.explainer import explainer_service
+from core.metrics import span
 
 router = APIRouter()
 
 @router.get("/api/shap")
-def get_shap_summary():
-    # dummy example SHAP summary for placeholder until hooked into ensemble
-    X = pd.DataFrame({
-        "fatigue": np.random.rand(100),
-        "travel": np.random.rand(100),
-        "pts": np.random.rand(100),
-        "odds_shift": np.random.rand(100),
-    })
-    y = np.random.randint(0, 2, 100)
-    model = RandomForestClassifier().fit(X, y)
-
-    explainer = shap.Explainer(model, X)
-    shap_values = explainer(X[:1])
-    summary = dict(zip(X.columns, shap_values.values[0]))
-
-    return {"shap": summary}
+async def get_shap_summary(row: int = Query(0, ge=0)):
+    # Lookup against the preloaded explainer; only uncached rows hit SHAP
+    # "fit" only does work when a new model version has to be loaded
+    with span("fit"):
+        await run_in_threadpool(explainer_service.warm)
+    if row >= len(explainer_service.slate):
+        raise HTTPException(status_code=404, detail="Row not in current slate")
+    with span("explain"):
+        summary = await run_in_threadpool(explainer_service.explain, row)
+    return {"shap": summary, "model_version": explainer_service.version}
 
 @router.get("/api/analytics")
 async def get_analytics():
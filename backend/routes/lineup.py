@@ -1,145 +1,285 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
 import pandas as pd
 import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Union
+from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
-from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
-import requests
-from bs4 import BeautifulSoup
+from core.data_store import DATA_DIR, predictions_store, ESPN_STATS_CSV, write_atomic
+from core.process_pool import cpu_pool
+from advanced.lineup_optimizer import LineupConstraints, optimize_lineups
+from advanced.lineup_simulator import PAYOUT_TABLES, LineupSimulator, lineups_from_players
+from core.lineup_index import LineupIndex
+from core.metrics import span
+from core.enrichment import enriched_store
+from core.jobs import background_jobs
+from core.http_client import source_client
+from live.espn_scrape import ESPN_STATS_URL, parse_espn_stats_table
 
 load_dotenv(os.path.join(os.path.dirname(__file__), '../../.env'))
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 1000
+SAVED_LINEUPS = os.path.join(DATA_DIR, "saved_lineups.jsonl")
+_saved_lineups_lock = threading.Lock()
+
+# Pool columns the optimizer reads, first match wins
+PROBABILITY_COLUMNS = ['probability', 'confidence']
+PROJECTION_COLUMNS = ['projection', 'predicted_points', 'predicted']
+
 # --- ESPN Integration: Load/refresh player stats from ESPN ---
 def update_espn_stats():
-    url = "https://www.espn.com/nba/stats/player"
-    response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
+    response = source_client.get_sync("espn", ESPN_STATS_URL)
     if response.status_code != 200:
         return None
-    soup = BeautifulSoup(response.text, 'html.parser')
-    table = soup.find('table')
-    if not table:
+    players = parse_espn_stats_table(response.text)
+    if players is None:
         return None
-    headers = [th.get_text(strip=True) for th in table.find('thead').find_all('th')]
-    players = []
-    for row in table.find('tbody').find_all('tr'):
-        cols = row.find_all('td')
-        if len(cols) == len(headers):
-            player_data = {headers[i]: cols[i].get_text(strip=True) for i in range(len(headers))}
-            players.append(player_data)
     df = pd.DataFrame(players)
-    out_path = os.path.join("backend", "data", "espn_player_stats.csv")
-    df.to_csv(out_path, index=False)
+    write_atomic(df, ESPN_STATS_CSV)
     return df
 
-# --- PrizePicks Integration: Scrape live lines ---
-def fetch_prizepicks_lines():
-    url = "https://app.prizepicks.com/projections"
-    headers = {
-        "User-Agent": "Mozilla/5.0",
-        "Accept": "application/json, text/plain, */*"
-    }
-    session = requests.Session()
-    session.get(url, headers=headers)
-    api_url = "https://api.prizepicks.com/projections"
-    params = {"league_id": "7", "per_page": 1000}
-    resp = session.get(api_url, headers=headers, params=params)
-    if resp.status_code != 200:
-        return []
-    data = resp.json()
-    lines = []
-    for projection in data.get("data", []):
-        player = projection.get("attributes", {}).get("name")
-        stat_type = projection.get("attributes", {}).get("stat_type")
-        line_score = projection.get("attributes", {}).get("line_score")
-        team = projection.get("attributes", {}).get("team")
-        sport = projection.get("attributes", {}).get("league")
-        if player and stat_type and line_score:
-            lines.append({
-                "player": player,
-                "line": line_score,
-                "stat": stat_type,
-                "team": team,
-                "sport": sport
-            })
-    return lines
+def refresh_espn_stats_job():
+    if update_espn_stats() is None:
+        raise RuntimeError("ESPN stats refresh returned no data")
 
-def load_lineup_data():
-    data_path = os.path.join("backend", "data", "predictions_latest.csv")
-    if not os.path.exists(data_path):
-        raise HTTPException(status_code=404, detail="No lineup data available.")
-    df = pd.read_csv(data_path)
+def _apply_lineup_defaults(df, today):
     # Ensure required columns
     if 'id' not in df.columns:
         df['id'] = range(1, len(df) + 1)
     if 'name' not in df.columns and 'player' in df.columns:
         df['name'] = df['player']
     if 'date' not in df.columns:
-        today = datetime.now().strftime('%Y-%m-%d')
-        future = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+        future = (datetime.strptime(today, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
         df['date'] = [today]*2 + [future]*(len(df)-2)
     if 'status' not in df.columns:
         # Mark games as 'live' if date is today, else 'future'
-        today = datetime.now().strftime('%Y-%m-%d')
         df['status'] = df['date'].apply(lambda d: 'live' if d == today else 'future')
     for col in ['team', 'sport', 'position', 'stats']:
         if col not in df.columns:
             df[col] = ''
     return df
 
-@router.get("/api/lineup")
-def get_lineup(date: str = None, status: str = None, team: str = None, sport: str = None, refresh: bool = False):
-    # Optionally refresh ESPN stats for latest enrichment
-    if refresh:
-        update_espn_stats()
-    data_path = os.path.join("backend", "data", "predictions_latest.csv")
-    if not os.path.exists(data_path):
+def load_lineup_data():
+    snapshot = predictions_store.get()
+    if snapshot is None:
         raise HTTPException(status_code=404, detail="No lineup data available.")
-    df = pd.read_csv(data_path)
-    # Enrich with ESPN stats if available
-    espn_path = os.path.join("backend", "data", "espn_player_stats.csv")
-    if os.path.exists(espn_path):
-        espn_df = pd.read_csv(espn_path)
-        # Merge on player name if possible
-        if 'PLAYER' in espn_df.columns and 'name' in df.columns:
-            df = df.merge(espn_df, left_on='name', right_on='PLAYER', how='left')
-    # ...existing code for id, name, date, status, filtering, dropdowns...
-    if 'id' not in df.columns:
-        df['id'] = range(1, len(df) + 1)
-    if 'name' not in df.columns and 'player' in df.columns:
-        df['name'] = df['player']
-    if 'date' not in df.columns:
-        today = datetime.now().strftime('%Y-%m-%d')
-        future = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
-        df['date'] = [today]*2 + [future]*(len(df)-2)
-    if 'status' not in df.columns:
-        today = datetime.now().strftime('%Y-%m-%d')
-        df['status'] = df['date'].apply(lambda d: 'live' if d == today else 'future')
-    for col in ['team', 'sport', 'position', 'stats']:
-        if col not in df.columns:
-            df[col] = ''
+    today = datetime.now().strftime('%Y-%m-%d')
+    return _apply_lineup_defaults(snapshot.data.copy(), today)
+
+# Index of the current lineup snapshot, rebuilt when its inputs change
+_lineup_index = None
+_lineup_index_lock = threading.Lock()
+
+def get_lineup_index():
+    global _lineup_index
+    snapshot = enriched_store.get()
+    if snapshot is None or snapshot.data.empty:
+        raise HTTPException(status_code=404, detail="No lineup data available.")
+    today = datetime.now().strftime('%Y-%m-%d')
+    key = (snapshot.version, today)
+    cached = _lineup_index
+    if cached is not None and cached[0] == key:
+        return cached[1], snapshot.version
+    with _lineup_index_lock:
+        if _lineup_index is None or _lineup_index[0] != key:
+            with span("index"):
+                df = _apply_lineup_defaults(snapshot.data.copy(), today)
+                _lineup_index = (key, LineupIndex(df))
+        return _lineup_index[1], snapshot.version
+
+def _date_filter(date):
+    # Dates are compared as 'YYYY-MM-DD' strings; anything else would just match nothing
+    if not date:
+        return None
+    try:
+        datetime.strptime(date, '%Y-%m-%d')
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid date '{date}', expected YYYY-MM-DD.")
+    return date
+
+@router.get("/api/lineup")
+def get_lineup(
+    date: str = None,
+    status: str = None,
+    team: str = None,
+    sport: str = None,
+    refresh: bool = False,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    # Optionally refresh ESPN stats in the background; the current snapshot is
+    # served right away and the enriched store picks up the new CSV when written
+    refresh_job = background_jobs.submit("espn_stats", refresh_espn_stats_job) if refresh else None
+    # Spans: load/merge only when the sources changed, index when the snapshot did
+    index, version = get_lineup_index()
     # Filtering
-    if date:
-        df = df[df['date'] == date]
-    if status and status != 'All':
-        df = df[df['status'] == status]
-    if team and team != 'All':
-        df = df[df['team'] == team]
-    if sport and sport != 'All':
-        df = df[df['sport'] == sport]
-    teams = sorted(df['team'].dropna().unique().tolist())
-    sports = sorted(df['sport'].dropna().unique().tolist())
-    return {"lineup": df.to_dict(orient="records"), "teams": teams, "sports": sports}
-
-@router.get("/api/prizepicks")
-def get_prizepicks():
-    lines = fetch_prizepicks_lines()
-    return {"lines": lines}
+    filters = {
+        'date': _date_filter(date),
+        'status': status if status and status != 'All' else None,
+        'team': team if team and team != 'All' else None,
+        'sport': sport if sport and sport != 'All' else None,
+    }
+    with span("filter"):
+        positions = index.query(filters)
+        if any(v is not None for v in filters.values()):
+            team_counts = index.facet_counts('team', positions)
+            sport_counts = index.facet_counts('sport', positions)
+        else:
+            team_counts, sport_counts = index.facets['team'], index.facets['sport']
+    # Pagination: the cursor is the offset of the next row in the filtered result
+    try:
+        offset = int(cursor) if cursor else 0
+    except ValueError:
+        offset = -1
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    page = positions[offset:offset + limit] if limit else positions[offset:]
+    next_offset = offset + len(page)
+    with span("serialize"):
+        rows = index.rows(page)
+    return {
+        "lineup": rows,
+        "teams": list(team_counts),
+        "sports": list(sport_counts),
+        "counts": {"team": team_counts, "sport": sport_counts},
+        "total": int(len(positions)),
+        "next_cursor": str(next_offset) if next_offset < len(positions) else None,
+        "version": version,
+        "refresh_job_id": refresh_job.id if refresh_job else None,
+    }
+
+@router.get("/api/lineup/refresh/{job_id}")
+def get_refresh_status(job_id: str):
+    job = background_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown refresh job.")
+    return job.to_dict()
+
+class OptimizeRequest(BaseModel):
+    size: int = Field(6, ge=2, le=10)
+    objective: str = Field("probability", pattern="^(probability|points)$")
+    salary_cap: Optional[float] = Field(None, gt=0)
+    max_per_team: Optional[int] = Field(None, ge=1)
+    max_per_game: Optional[int] = Field(1, ge=1)
+    positions: Dict[str, int] = {}
+    top_k: int = Field(5, ge=1, le=50)
+    max_overlap: Optional[int] = Field(None, ge=0)
+    # Pool filters, same as GET /api/lineup; ignored when players are given
+    date: Optional[str] = None
+    team: Optional[str] = None
+    sport: Optional[str] = None
+    players: Optional[List[Dict[str, Any]]] = None
+
+def _optimizer_pool(body):
+    if body.players is not None:
+        pool = pd.DataFrame.from_records(body.players)
+    else:
+        index, _ = get_lineup_index()
+        filters = {
+            'date': _date_filter(body.date),
+            'team': body.team if body.team and body.team != 'All' else None,
+            'sport': body.sport if body.sport and body.sport != 'All' else None,
+        }
+        pool = pd.DataFrame.from_records(index.rows(index.query(filters)))
+    source = PROBABILITY_COLUMNS if body.objective == 'probability' else PROJECTION_COLUMNS
+    column = next((c for c in source if c in pool.columns), None)
+    if column is None:
+        raise HTTPException(status_code=422, detail=f"Player pool has none of {source}")
+    target = 'probability' if body.objective == 'probability' else 'projection'
+    pool[target] = pd.to_numeric(pool[column], errors='coerce')
+    return pool
+
+@router.post("/api/lineup/optimize")
+async def optimize_lineup(body: OptimizeRequest):
+    if body.positions and sum(body.positions.values()) != body.size:
+        raise HTTPException(status_code=400, detail="Position counts must add up to size.")
+    # A cold lineup index is read, merged and built from disk; not on the loop
+    pool = await run_in_threadpool(_optimizer_pool, body)
+    if len(pool) < body.size:
+        raise HTTPException(status_code=404, detail="Not enough players for a lineup.")
+    constraints = LineupConstraints(
+        size=body.size,
+        salary_cap=body.salary_cap,
+        max_per_team=body.max_per_team,
+        max_per_game=body.max_per_game,
+        positions=body.positions,
+    )
+    # Branch-and-bound is pure CPU; keep it off the event loop
+    try:
+        result = await cpu_pool.run(
+            optimize_lineups, pool, body.objective, constraints, body.top_k, body.max_overlap
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Lineup optimization timed out.")
+    return {"status": "success", **result}
+
+class SimulateRequest(BaseModel):
+    # Lineups as player records, e.g. the "players" of /api/lineup/optimize results
+    lineups: List[List[Dict[str, Any]]] = Field(..., min_length=1, max_length=200)
+    payout: str = Field("power", pattern="^(power|flex)$")
+    simulations: int = Field(100_000, ge=1_000, le=2_000_000)
+    chunk_size: int = Field(20_000, ge=1_000, le=100_000)
+    rho_team: float = Field(0.15, ge=0, lt=1)
+    rho_game: float = Field(0.05, ge=0, lt=1)
+    seed: Optional[int] = None
+
+@router.post("/api/lineup/simulate")
+def simulate_lineups(body: SimulateRequest):
+    if body.rho_game > body.rho_team:
+        raise HTTPException(status_code=400, detail="rho_game cannot exceed rho_team.")
+    payouts = PAYOUT_TABLES[body.payout]
+    if any(len(lineup) not in payouts for lineup in body.lineups):
+        sizes = ", ".join(str(size) for size in sorted(payouts))
+        raise HTTPException(status_code=422, detail=f"{body.payout} lineups need {sizes} players.")
+    pool, indexed = lineups_from_players(body.lineups)
+    if any(len(set(legs)) != len(legs) for legs in indexed):
+        raise HTTPException(status_code=422, detail="A lineup lists the same player more than once.")
+    column = next((c for c in PROBABILITY_COLUMNS if c in pool.columns), None)
+    if column is None:
+        raise HTTPException(status_code=422, detail=f"Players have none of {PROBABILITY_COLUMNS}")
+    pool['probability'] = pd.to_numeric(pool[column], errors='coerce')
+    if pool['probability'].isna().any():
+        raise HTTPException(status_code=422, detail="Every player needs a numeric probability.")
+    simulator = LineupSimulator(pool, indexed, body.rho_team, body.rho_game, payouts)
+    # One NDJSON summary per chunk so clients can show estimates converging;
+    # the sync generator is iterated in the threadpool, off the event loop
+    summaries = simulator.iter_summaries(body.simulations, body.chunk_size, body.seed)
+    return StreamingResponse(
+        (json.dumps(summary) + "\n" for summary in summaries),
+        media_type="application/x-ndjson",
+    )
+
+class SavedLineup(BaseModel):
+    name: Optional[str] = None
+    players: List[Dict[str, Any]] = Field(..., min_length=1, max_length=50)
 
 @router.post("/api/lineup/save")
-def save_lineup(request: Request):
-    data = request.json()
-    # Here you would save the lineup to a file or database
-    # For now, just return success
-    return JSONResponse(content={"status": "success", "message": "Lineup saved."})
\ No newline at end of file
+def save_lineup(body: Union[SavedLineup, List[Dict[str, Any]]]):
+    # The lineup builder posts the selected players as a bare array
+    if isinstance(body, list) and not 1 <= len(body) <= 50:
+        raise HTTPException(status_code=422, detail="A lineup needs 1 to 50 players.")
+    lineup = body if isinstance(body, SavedLineup) else SavedLineup(players=body)
+    missing = [i for i, p in enumerate(lineup.players) if p.get('id') is None and not p.get('name')]
+    if missing:
+        raise HTTPException(status_code=422, detail={"players_missing_id_or_name": missing})
+    record = {
+        "id": uuid.uuid4().hex,
+        "saved_at": time.time(),
+        "name": lineup.name,
+        "players": lineup.players,
+    }
+    line = json.dumps(record, default=str) + "\n"
+    with _saved_lineups_lock:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        with open(SAVED_LINEUPS, "a", encoding="utf-8") as f:
+            f.write(line)
+    return {"status": "success", "message": "Lineup saved.", "id": record["id"]}
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException
+from advanced.model_registry import get_current_model, list_versions
+from core.jobs import background_jobs
+from core.process_pool import train_pool
+
+router = APIRouter()
+
+def _train():
+    # Runs in the training process; imported there so the API never loads xgboost
+    from advanced.train_predict import train_and_register
+    version, accuracy = train_and_register()
+    return {"version": version, "accuracy": float(accuracy)}
+
+def train_model_job():
+    result = train_pool.call(_train)
+    if result is None:
+        raise RuntimeError("Training returned no model")
+
+@router.get("/api/models")
+def get_models():
+    artifacts = get_current_model()
+    return {
+        "current": artifacts.version if artifacts else None,
+        "metrics": artifacts.metrics if artifacts else None,
+        "versions": list_versions(),
+    }
+
+@router.post("/api/models/train")
+def train_model():
+    # Single-flight: a second request while training returns the running job
+    job = background_jobs.submit("train_model", train_model_job)
+    return job.to_dict()
+
+@router.get("/api/models/train/{job_id}")
+def get_train_status(job_id: str):
+    job = background_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown training job.")
+    return job.to_dict()
@@ -1,16 +1,16 @@
 # backend/routes/predictions.py
-from fastapi import APIRouter, HTTPException
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
 import pandas as pd
-import os
+from core.data_store import predictions_store
+from core.response_cache import response_cache, cached_json_response, dataframe_to_json
+from live.line_history import read_deltas, read_version
 
 router = APIRouter()
 
-@router.get("/")  # Serve at /api/predictions/
-def get_predictions():
-    csv_path = os.path.join("backend", "data", "predictions_latest.csv")
-    if not os.path.exists(csv_path):
-        raise HTTPException(status_code=404, detail="No predictions data available.")
-    df = pd.read_csv(csv_path)
+def build_predictions_frame(df: pd.DataFrame, today: str) -> pd.DataFrame:
+    df = df.copy()
     # Fill missing fields for UI
     for col in ['player', 'team', 'matchup', 'predicted', 'actual', 'outcome', 'confidence', 'sport', 'date']:
         if col not in df.columns:
@@ -21,7 +21,26 @@ def get_predictions():
     if df['sport'].eq('').all():
         df['sport'] = ['NBA', 'NBA', 'NBA', 'NBA', 'NBA'][:len(df)]
     if df['date'].eq('').all():
-        from datetime import datetime
-        today = datetime.now().strftime('%Y-%m-%d')
         df['date'] = [today]*len(df)
-    return df.to_dict(orient="records")
+    return df
+
+@router.get("/")  # Serve at /api/predictions/
+def get_predictions(request: Request):
+    snapshot = predictions_store.get()
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="No predictions data available.")
+    # The date fill depends on the day, so it is part of the body's version
+    today = datetime.now().strftime('%Y-%m-%d')
+    cached = response_cache.get_or_build(
+        "api_predictions",
+        (snapshot.version, today),
+        lambda: dataframe_to_json(build_predictions_frame(snapshot.data, today)),
+    )
+    return cached_json_response(request, cached)
+
+@router.get("/changes")  # Serve at /api/predictions/changes
+def get_prediction_changes(since: int = 0):
+    """Line movements recorded after data version ``since``."""
+    deltas = read_deltas(since)
+    body = b'{"version":%d,"changes":%s}' % (read_version(), dataframe_to_json(deltas))
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import json
+import logging
+import os
+from core.backplane import LeaderLock, backplane_dir
+from core.broadcaster import Subscription, broadcaster
+from live.line_feed import LineFeed
+from live.score_ingest import ScoreIngester
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Publishes line movements from line_history to the broadcaster; under several
+# workers one of them polls for new versions and the backplane fans them out
+line_feed = LineFeed(broadcaster, leader=LeaderLock(os.path.join(backplane_dir(), "line_feed.lock")))
+
+# Polls ESPN scoreboards, settles predictions and pushes score/settlement events
+score_ingester = ScoreIngester(publish=broadcaster.publish_many, leader=LeaderLock(os.path.join(backplane_dir(), "score_ingest.lock")))
+
+# Live push: lines, scores and prediction updates, filtered per client.
+# Filters come from the query string (?sport=nba&team=LAL,BOS&player=...&topic=line)
+# and can be replaced later by sending {"action": "subscribe", "sports": [...], ...}.
+# Frames are JSON arrays of {"topic": ..., "data": ...} events.
+@router.websocket("/ws/scores")
+async def websocket_scores(websocket: WebSocket):
+    await websocket.accept()
+    client = await broadcaster.connect(websocket.send_text, Subscription.from_params(websocket.query_params))
+    broadcaster.send_to(client, "subscribed", client.subscription.to_dict())
+    try:
+        while True:
+            data = await websocket.receive_text()
+            try:
+                request = json.loads(data)
+            except ValueError:
+                request = None
+            if not isinstance(request, dict) or request.get("action") != "subscribe":
+                broadcaster.send_to(client, "error", {"detail": "Expected {\"action\": \"subscribe\", ...}"})
+                continue
+            broadcaster.subscribe(client, Subscription.from_params(request))
+            broadcaster.send_to(client, "subscribed", client.subscription.to_dict())
+    except WebSocketDisconnect:
+        logger.info("Client disconnected")
+    finally:
+        await broadcaster.disconnect(client)
+
+@router.get("/api/ws/stats")
+async def get_ws_stats():
+    return {
+        "status": "success",
+        "broadcaster": broadcaster.stats(),
+        "line_version": line_feed.last_version,
+        "scores": score_ingester.stats(),
+    }
@@ -3,9 +3,10 @@ sys.path.append('core')
 from auto_logger import logger
 logger.logger.info("Backend server starting...")
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 import logging
 from datetime import datetime
 import pandas as pd
@@ -20,6 +21,22 @@ load_dotenv(os.path.join(os.path.dirname(__file__), '../.env'))
 from routes.settings import router as settings_router
 from routes.analytics_route import router as analytics_router
 from routes.predictions import router as predictions_router
+from routes.lineup import router as lineup_router
+from app.api.v1.endpoints.prediction import router as prediction_router, model_batcher
+from routes.models import router as models_router
+from routes.stream import router as stream_router, line_feed, score_ingester
+from core.data_store import predictions_store
+from core.jobs import background_jobs
+from core.http_client import source_client
+from core.enrichment import enriched_store
+from core.response_cache import response_cache, cached_json_response, dataframe_to_json
+from advanced.explainer import explainer_service
+from advanced.model_registry import model_store
+from core.config import Config
+from core.process_pool import cpu_pool, train_pool
+from core.broadcaster import broadcaster
+from core.backplane import create_backplane
+from core.metrics import MetricsMiddleware, http_metrics
 
 app = FastAPI()
 
@@ -30,13 +47,45 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so latency covers CORS handling too
+app.add_middleware(MetricsMiddleware, metrics=http_metrics)
 
 app.include_router(settings_router)
 app.include_router(analytics_router)
+app.include_router(lineup_router)
 app.include_router(predictions_router, prefix="/api/predictions")
+app.include_router(prediction_router, prefix="/api/v1")
+app.include_router(models_router)
+app.include_router(stream_router)
 
+# Session logger from auto_logger; its log calls only enqueue
+auto_export = logger
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def warm_models():
+    # Load the registered model and build its SHAP explainer before the first request
+    await run_in_threadpool(model_store.get)
+    await run_in_threadpool(explainer_service.warm)
+    # Spawns and warms the CPU workers in the background
+    await run_in_threadpool(cpu_pool.start)
+    # Pushes line movements to /ws/scores subscribers, in every worker
+    await broadcaster.start(create_backplane())
+    line_feed.start()
+    if Config.SCORE_INGEST_ENABLED:
+        score_ingester.start()
+
+@app.on_event("shutdown")
+async def shutdown_background_jobs():
+    await model_batcher.stop()
+    await line_feed.stop()
+    await score_ingester.stop()
+    await broadcaster.stop()
+    background_jobs.shutdown()
+    cpu_pool.shutdown()
+    train_pool.shutdown()
+    source_client.close()
+
 # Health check
 @app.get("/api/health")
 async def health_check():
@@ -44,19 +93,43 @@ async def health_check():
 
 # Predictions endpoint (no prefix)
 @app.get("/predictions")
-def get_predictions():
-    csv_path = os.path.join(os.path.dirname(__file__), "data", "predictions_latest.csv")
-    if not os.path.exists(csv_path):
+def get_predictions(request: Request):
+    snapshot = predictions_store.get()
+    if snapshot is None:
         return []
-    df = pd.read_csv(csv_path)
-    return df.to_dict(orient="records")
+    cached = response_cache.get_or_build(
+        "predictions", snapshot.version, lambda: dataframe_to_json(snapshot.data)
+    )
+    return cached_json_response(request, cached)
+
+# Predictions cache counters
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    return {"status": "success", "stores": [predictions_store.stats(), enriched_store.stats(), response_cache.stats(), model_store.stats(), explainer_service.stats()]}
+
+# External data source latency/error counters
+@app.get("/api/sources/stats")
+async def get_source_stats():
+    return {"status": "success", "sources": source_client.metrics()}
+
+# CPU worker pool counters
+@app.get("/api/pool/stats")
+async def get_pool_stats():
+    return {"status": "success", "pool": cpu_pool.stats(), "train_pool": train_pool.stats()}
 
-# Lineup endpoint
-@app.get("/api/lineup")
-async def get_lineup():
-    # TODO: integrate real optimization logic
-    sample = {"sport": "nba", "lineup": ["Player A", "Player B", "Player C"]}
-    return {"status": "success", "data": sample}
+# Log pipeline counters (queue depth, dropped records)
+@app.get("/api/logs/stats")
+async def get_log_stats():
+    return {"status": "success", "logging": auto_export.stats()}
+
+# Per-route request metrics in the Prometheus text format
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(http_metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/metrics/stats")
+async def get_metrics_stats():
+    return {"status": "success", "in_flight": http_metrics.in_flight, "routes": http_metrics.summary()}
 
 # Analytics endpoint
 @app.get("/api/analytics")
@@ -65,12 +138,6 @@ async def get_analytics():
     trends = {"ROI": [5.2, 6.1, 4.8], "dates": ["2025-05-27", "2025-05-28", "2025-05-29"]}
     return {"status": "success", "trends": trends}
 
-# SHAP explainability endpoint
-@app.get("/api/shap")
-async def get_shap():
-    # TODO: integrate SHAP values generation
-    return {"status": "success", "values": []}
-
 # Settings endpoint
 @app.get("/api/settings")
 async def get_settings():
@@ -84,22 +151,9 @@ async def post_feedback(request: dict):
     # TODO: capture and store user feedback
     return {"status": "success", "received": request}
 
-# WebSocket for live scores (example)
-@app.websocket("/ws/scores")
-async def websocket_scores(websocket: WebSocket):
-    await websocket.accept()
-    try:
-        while True:
-            data = await websocket.receive_text()
-            await websocket.send_text(f"Echo: {data}")
-    except WebSocketDisconnect:
-        logger.info("Client disconnected")
-
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
-    # Use the global logger from auto_logger
-    import core.auto_logger
-    core.auto_logger.logger.logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    auto_export.logger.error(f"Unhandled exception: {exc}", exc_info=True)
     return JSONResponse(
         status_code=500,
         content={"detail": "Internal server error", "error": str(exc)}
@@ -109,8 +163,7 @@ async def global_exception_handler(request: Request, exc: Exception) -> JSONResp
 async def receive_frontend_logs(log_data: Dict[str, Any]) -> Any:
     """Receive and store frontend logs from the frontend app."""
     try:
-        import core.auto_logger
-        core.auto_logger.logger.logger.info(f"Received frontend logs for session: {log_data.get('sessionId', 'unknown')}")
+        auto_export.logger.info(f"Received frontend logs for session: {log_data.get('sessionId', 'unknown')}")
         frontend_log_dir = Path("logs/frontend")
         frontend_log_dir.mkdir(parents=True, exist_ok=True)
         log_file = frontend_log_dir / f"frontend_{log_data.get('sessionId', 'unknown')}.json"
@@ -118,6 +171,5 @@ async def receive_frontend_logs(log_data: Dict[str, Any]) -> Any:
             json.dump(log_data, f, indent=2)
         return {"status": "success", "message": "Frontend logs saved."}
     except Exception as e:
-        import core.auto_logger
-        core.auto_logger.logger.logger.error(f"Failed to save frontend logs: {e}", exc_info=True)
+        auto_export.logger.error(f"Failed to save frontend logs: {e}", exc_info=True)
         return JSONResponse(status_code=500, content={"detail": "Failed to save frontend logs."})
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FixtureServer:
+    """Serves recorded ESPN responses on localhost with ETag/Last-Modified
+    and 304 handling, so the ingester runs end to end without the network.
+
+    ``routes`` maps a request path (query included) to a JSON-able body and
+    can be swapped between polls to replay a game's progression.
+    """
+
+    def __init__(self, routes=None):
+        self.routes = dict(routes or {})
+        self.hits = {"200": 0, "304": 0, "404": 0}
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = fixture.routes.get(self.path)
+                if body is None:
+                    fixture.hits["404"] += 1
+                    self.send_error(404)
+                    return
+                payload = json.dumps(body).encode()
+                etag = '"%s"' % hashlib.md5(payload).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    fixture.hits["304"] += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                fixture.hits["200"] += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", self.date_time_string())
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def from_directory(cls, directory):
+        """Recorded files: <sport path>/scoreboard.json and
+        <sport path>/summary/<event id>.json, e.g. basketball/nba/scoreboard.json."""
+        routes = {}
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                relative = os.path.relpath(os.path.join(root, name), directory).replace(os.sep, "/")[:-5]
+                head, _, tail = relative.rpartition("/")
+                path = f"/{head}?event={tail}" if head.endswith("/summary") else f"/{relative}"
+                with open(os.path.join(root, name), encoding="utf-8") as f:
+                    routes[path] = json.load(f)
+        return cls(routes)
+
+    def close(self):
+        self.server.shutdown()
@@ -0,0 +1,22 @@
+import logging
+import os
+
+from core.auto_logger import BatchFileHandler
+
+
+def _record(message):
+    return logging.LogRecord("app", logging.INFO, __file__, 1, message, None, None)
+
+
+def test_rotation_counts_bytes_not_characters(tmp_path):
+    path = tmp_path / "session.log"
+    handler = BatchFileHandler(path, max_bytes=1_000, rotate_seconds=0, backup_count=2)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    # 99 characters but 197 bytes per line in UTF-8
+    line = "é" * 98
+    for _ in range(6):
+        handler.emit_batch([_record(line)])
+    handler.close()
+    assert handler.size == os.path.getsize(path)
+    assert os.path.getsize(path) <= 1_000
+    assert (tmp_path / "session.log.1").exists()
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from core import backplane
+from core.backplane import MAX_DATAGRAM, MAX_SOCKET_PATH, LeaderLock, LocalRedis, RedisBackplane, UnixSocketBackplane, pack, unpack
+from core.broadcaster import Broadcaster, Subscription
+
+
+def _unix_pair(directory):
+    return UnixSocketBackplane(str(directory)), UnixSocketBackplane(str(directory))
+
+
+def _redis_pair(directory):
+    hub = LocalRedis()
+    return RedisBackplane(hub, "test"), RedisBackplane(hub, "test")
+
+
+async def _wait_for(condition, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        if loop.time() > deadline:
+            raise AssertionError("timed out")
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.parametrize("make_pair", [_unix_pair, _redis_pair], ids=["unix", "redis"])
+def test_relays_between_workers_and_reports_gaps(make_pair, tmp_path):
+    async def scenario():
+        first, second = Broadcaster(), Broadcaster()
+        plane_a, plane_b = make_pair(tmp_path)
+        await first.start(plane_a)
+        await second.start(plane_b)
+        frames = []
+
+        async def record(text):
+            frames.append(text)
+
+        await second.connect(record, Subscription.from_params({"team": "LAL"}))
+        first.publish("line", {"player": "LeBron James", "point": 27.5}, key="e1", sport="nba", teams=["LAL", "BOS"])
+        first.publish("line", {"player": "Jayson Tatum"}, key="e2", sport="nba", teams=["MIA", "BOS"])
+        plane_a._next_seq()  # lose one envelope
+        first.publish("line", {"player": "LeBron James", "point": 28.5}, key="e1", sport="nba", teams=["LAL", "BOS"])
+        await _wait_for(lambda: plane_b.gaps and frames and "28.5" in frames[-1])
+        events = [event for frame in frames for event in json.loads(frame)]
+        topics = [event["topic"] for event in events]
+        lines = [event["data"] for event in events if event["topic"] == "line"]
+        # Only LAL lines pass the filter; an unsent 27.5 may be coalesced into 28.5
+        assert "resync" in topics and lines[-1]["point"] == 28.5
+        assert all(line["player"] == "LeBron James" for line in lines)
+        assert plane_b.gaps == 1 and plane_b.received == 3
+        # A worker ignores its own envelopes: the broadcaster already delivered them
+        assert plane_a.received == 0
+        # The three relayed lines plus the resync notice
+        assert first.stats()["published"] == 3 and second.stats()["received"] == 4
+        await first.stop()
+        await second.stop()
+
+    asyncio.run(scenario())
+
+
+def test_envelopes_round_trip_coalescing_keys():
+    message = Broadcaster.message("line", {"point": 1.5}, key=("e1", "dk"), sport="NBA", teams=["LAL"], players=["LeBron James"])
+    envelope = unpack(pack("origin", 7, [message]))
+    assert (envelope["o"], envelope["s"]) == ("origin", 7)
+    assert envelope["m"] == [message]
+    hash(envelope["m"][0].key)
+
+
+def test_large_publishes_split_into_datagram_sized_envelopes():
+    sent = []
+    plane = RedisBackplane(LocalRedis(), "test")
+    plane.send = sent.append
+    messages = [Broadcaster.message("line", {"blob": "x" * 10_000}, key=i) for i in range(20)]
+    plane.publish(messages)
+    assert len(sent) > 1 and all(len(data) <= MAX_DATAGRAM for data in sent)
+    envelopes = [unpack(data) for data in sent]
+    assert [envelope["s"] for envelope in envelopes] == list(range(1, len(sent) + 1))
+    assert [m for envelope in envelopes for m in envelope["m"]] == messages
+
+
+def test_unix_backplane_forgets_dead_peers(tmp_path):
+    async def scenario():
+        plane = UnixSocketBackplane(str(tmp_path))
+        plane.start(lambda messages: None)
+        dead = tmp_path / "gone.sock"
+        dead.touch()  # a socket file nobody listens on any more
+        plane.publish([Broadcaster.message("line", {}, key=1)])
+        assert not dead.exists()
+        assert plane.errors == 0
+        plane.close()
+        assert not os.path.exists(plane.path)
+
+    asyncio.run(scenario())
+
+
+def test_leader_lock_elects_one_holder(tmp_path):
+    path = str(tmp_path / "leader.lock")
+    first, second = LeaderLock(path), LeaderLock(path)
+    assert first.is_leader()
+    assert not second.is_leader()
+    first.release()
+    assert second.is_leader()
+    second.release()
+
+
+def test_deep_directories_fall_back_to_a_short_socket_dir(tmp_path):
+    deep = tmp_path / ("nested" * 20)
+    plane = UnixSocketBackplane(str(deep))
+    assert len(plane.path) <= MAX_SOCKET_PATH
+    # Every worker of the deployment derives the same stand-in
+    assert UnixSocketBackplane(str(deep)).directory == plane.directory
+    assert UnixSocketBackplane(str(tmp_path)).directory == str(tmp_path)
+
+    async def scenario():
+        plane.start(lambda messages: None)
+        assert os.path.exists(plane.path)
+        plane.close()
+        os.rmdir(plane.directory)
+
+    asyncio.run(scenario())
+
+
+def test_unbindable_socket_disables_the_backplane(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.touch()
+
+    async def scenario():
+        plane = UnixSocketBackplane(str(blocker / "ws"))  # a file in the way of the directory
+        plane.start(lambda messages: None)
+        plane.publish([Broadcaster.message("line", {}, key=1)])
+        assert plane.stats()["errors"] == 1
+        plane.close()
+
+    asyncio.run(scenario())
+
+
+def test_peers_joining_within_one_mtime_tick_are_found(tmp_path, monkeypatch):
+    plane = UnixSocketBackplane(str(tmp_path))
+    assert plane.peers() == []
+    stat = os.stat(tmp_path)
+    (tmp_path / "other.sock").touch()
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))  # the join did not move the mtime
+    assert plane.peers() == []
+    monkeypatch.setattr(backplane, "PEERS_TTL_SECONDS", 0.0)
+    assert plane.peers() == [str(tmp_path / "other.sock")]
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import threading
+
+from core.broadcaster import Broadcaster, Subscription
+
+SPORTS = ["nba", "nfl", "mlb", "nhl"]
+
+
+class Socket:
+    """Records every frame; ``gate`` holds sends back to play a slow client."""
+
+    def __init__(self):
+        self.frames = []
+        self.gate = None
+
+    async def send(self, text):
+        if self.gate is not None:
+            await self.gate.wait()
+        self.frames.append(json.loads(text))
+
+    def messages(self):
+        return [message for frame in self.frames for message in frame]
+
+
+async def _settle(broadcaster, timeout=5.0):
+    """Wait until every client has sent all of its queued messages."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        stats = broadcaster.stats()
+        if stats["max_queue_depth"] == 0 and stats["sent"] + stats["dropped"] + stats["coalesced"] >= stats["delivered"]:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"clients did not drain: {broadcaster.stats()}")
+
+
+def _line(i):
+    sport = SPORTS[i % len(SPORTS)]
+    return Broadcaster.message(
+        "line", {"i": i}, key=i, sport=sport, teams=[f"{sport}-team{i % 10}"], players=[f"player{i % 50}"],
+    )
+
+
+def test_fan_out_to_many_filtered_clients_from_another_thread():
+    async def scenario():
+        broadcaster = Broadcaster()
+        sockets = []
+        for i in range(1_000):
+            socket = Socket()
+            sport = SPORTS[i % len(SPORTS)]
+            subscription = [
+                Subscription(),
+                Subscription(sports=frozenset({sport})),
+                Subscription(teams=frozenset({f"{sport}-team{i % 10}"})),
+                Subscription(players=frozenset({f"player{i % 50}"}), topics=frozenset({"line"})),
+            ][i % 4]
+            sockets.append((socket, subscription, await broadcaster.connect(socket.send, subscription)))
+        messages = [_line(i) for i in range(400)]
+        publisher = threading.Thread(target=lambda: [broadcaster.publish_many(messages[i:i + 50]) for i in range(0, 400, 50)])
+        publisher.start()
+        await asyncio.to_thread(publisher.join)
+        await _settle(broadcaster)
+
+        for socket, subscription, client in sockets:
+            expected = [{"topic": "line", "data": {"i": i}} for i, m in enumerate(messages) if subscription.matches(m)]
+            assert socket.messages() == expected
+            assert client.frames <= len(expected)
+        stats = broadcaster.stats()
+        assert stats["published"] == 400
+        assert stats["dropped"] == stats["coalesced"] == 0
+        assert stats["sent"] == stats["delivered"] == sum(len(s.messages()) for s, _, _ in sockets)
+        for _, _, client in sockets:
+            await broadcaster.disconnect(client)
+        assert broadcaster.stats()["clients"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_slow_client_coalesces_and_drops_oldest_without_stalling_others():
+    async def scenario():
+        broadcaster = Broadcaster(max_queue=10, max_frame=4)
+        slow, fast = Socket(), Socket()
+        slow.gate = asyncio.Event()
+        slow_client = await broadcaster.connect(slow.send)
+        fast_client = await broadcaster.connect(fast.send)
+        broadcaster.publish("line", {"i": -1}, key="first")
+        await asyncio.sleep(0.01)  # the slow client is now stuck sending its first frame
+        rounds = [range(8), range(8), range(8, 12)]
+        for round_, keys in enumerate(rounds):
+            # Keys repeat across rounds: a pending update for the same line is replaced
+            broadcaster.publish_many([Broadcaster.message("line", {"i": i, "round": round_}, key=i) for i in keys])
+            await asyncio.sleep(0.01)
+        assert len(fast.messages()) == 1 + 20
+        assert slow_client.dropped == 2 and slow_client.coalesced == 8
+        slow.gate.set()
+        await _settle(broadcaster)
+        pending = [m["data"] for m in slow.messages()[1:]]
+        # Lines 0 and 1 fell off the front; the rest carry their latest update
+        assert pending == [{"i": i, "round": 1} for i in range(2, 8)] + [{"i": i, "round": 2} for i in range(8, 12)]
+        assert max(len(frame) for frame in slow.frames) == 4
+        assert fast_client.dropped == 0
+        await broadcaster.disconnect(slow_client)
+        await broadcaster.disconnect(fast_client)
+        assert broadcaster.stats()["dropped"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_control_topics_reach_every_client_and_subscribe_reindexes():
+    async def scenario():
+        broadcaster = Broadcaster()
+        socket = Socket()
+        client = await broadcaster.connect(socket.send, Subscription.from_params({"sport": "nba"}))
+        broadcaster.publish("line", {"n": 1}, sport="NFL")
+        broadcaster.publish("version", {"v": 2})
+        broadcaster.subscribe(client, Subscription.from_params({"sports": "nfl,mlb", "team": "Chiefs"}))
+        broadcaster.publish("line", {"n": 2}, sport="nfl", teams=["Chiefs"])
+        broadcaster.publish("line", {"n": 3}, sport="nba", teams=["Chiefs"])
+        broadcaster.publish("line", {"n": 4}, sport="nfl", teams=["Bills"])
+        await _settle(broadcaster)
+        assert [m["data"] for m in socket.messages()] == [{"v": 2}, {"n": 2}]
+        await broadcaster.disconnect(client)
+
+    asyncio.run(scenario())
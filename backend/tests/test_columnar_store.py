@@ -0,0 +1,44 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from core import columnar_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar_store, "PREDICTIONS_DIR", str(tmp_path / "predictions"))
+    monkeypatch.setattr(columnar_store, "MANIFEST_PATH", str(tmp_path / "predictions" / "_manifest.json"))
+    monkeypatch.setattr(columnar_store, "PREDICTIONS_CSV", str(tmp_path / "predictions_latest.csv"))
+    return columnar_store
+
+
+def _table(player):
+    return pd.DataFrame({"player": [player], "sport": ["nba"], "date": ["2025-01-01"], "point": [20.5]})
+
+
+def test_columnar_table_wins_over_its_own_csv_export(store):
+    store.write_predictions(_table("Arrow"), export_csv=True)
+    assert list(store.load_predictions_table()["player"]) == ["Arrow"]
+    assert "csv_export" in store.read_manifest()
+
+
+def test_newer_legacy_csv_is_served(store):
+    store.write_predictions(_table("Arrow"), export_csv=False)
+    later = time.time() + 5
+    _table("Legacy").to_csv(store.PREDICTIONS_CSV, index=False)
+    os.utime(store.PREDICTIONS_CSV, (later, later))
+    assert list(store.load_predictions_table()["player"]) == ["Legacy"]
+    store.write_predictions(_table("Republished"), export_csv=False)
+    os.utime(store.PREDICTIONS_CSV, (later - 10, later - 10))
+    assert list(store.load_predictions_table()["player"]) == ["Republished"]
+
+
+def test_read_predictions_converts_only_requested_columns(store):
+    store.write_predictions(_table("Arrow"), export_csv=False)
+    df = store.read_predictions(columns=["player", "point", "missing"])
+    assert list(df.columns) == ["player", "point"]
+    assert list(df["player"]) == ["Arrow"]
+    assert list(store.read_predictions(sports=["nhl"], columns=["player"]).columns) == ["player"]
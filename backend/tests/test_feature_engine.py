@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from advanced.feature_engine import _synthetic_games, check_parity, compute_features
+
+
+def test_engine_matches_legacy_features_and_pandas_ewm():
+    check_parity(_synthetic_games(20_000))
+
+
+def test_missing_values_match_pandas():
+    df = _synthetic_games(5_000, teams=50, seed=5)
+    df.loc[df.sample(frac=0.05, random_state=1).index, ["goals", "win"]] = np.nan
+    check_parity(df)
+
+
+def test_without_current_row_features_only_see_earlier_games():
+    df = _synthetic_games(10_000, teams=100).drop_duplicates(["team", "match_date"])
+    with_current = compute_features(df, ewm_spans=(5,), rest_days=True)
+    earlier_only = compute_features(df, ewm_spans=(5,), rest_days=True, include_current=False)
+    columns = ["avg_goals_last_5", "win_streak", "form_ewm_5"]
+    # A row's pre-game features are the post-game features of the team's previous row
+    expected = with_current.groupby("team")[columns].shift(1)
+    for column in columns:
+        np.testing.assert_allclose(earlier_only[column], expected[column], rtol=1e-9, atol=1e-9, err_msg=column)
+    np.testing.assert_allclose(earlier_only["rest_days"], with_current["rest_days"], rtol=1e-9)
@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from advanced.feature_engine import _synthetic_games, compute_features
+from advanced.feature_store import FeatureStore
+
+
+def _games(team, days, goals, win):
+    return pd.DataFrame({
+        "team": team,
+        "match_date": pd.Timestamp("2024-01-01") + pd.to_timedelta(days, unit="D"),
+        "goals": np.asarray(goals, dtype=float),
+        "win": np.asarray(win, dtype=float),
+    })
+
+
+def test_out_of_order_batch_leaves_memory_and_disk_untouched(tmp_path):
+    store = FeatureStore(root=str(tmp_path))
+    store.update(_games(["A", "Z"], [0, 0], [1, 2], [1, 0]))
+    before = store.latest().sort_values("entity").reset_index(drop=True)
+    # A's game is fine and is folded first; Z's is older than Z's last one
+    bad = _games(["A", "Z"], [3, -1], [5, 9], [1, 1])
+    with pytest.raises(ValueError):
+        store.update(bad)
+    pd.testing.assert_frame_equal(store.latest().sort_values("entity").reset_index(drop=True), before)
+    assert len(store.read_log()) == 2
+    reopened = FeatureStore(root=str(tmp_path))
+    pd.testing.assert_frame_equal(reopened.latest().sort_values("entity").reset_index(drop=True), before)
+
+
+def test_failed_state_save_removes_the_log_part(tmp_path, monkeypatch):
+    store = FeatureStore(root=str(tmp_path))
+    store.update(_games(["A"], [0], [1], [1]))
+    before = store.latest()
+    parts = os.listdir(store._log_dir())
+
+    def fail():
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store, "_save_state", fail)
+    with pytest.raises(OSError):
+        store.update(_games(["A", "B"], [1, 1], [2, 3], [0, 1]))
+    assert os.listdir(store._log_dir()) == parts
+    pd.testing.assert_frame_equal(store.latest(), before)
+    monkeypatch.undo()
+    store.update(_games(["A", "B"], [1, 1], [2, 3], [0, 1]))
+    assert len(FeatureStore(root=str(tmp_path)).read_log()) == 3
+
+
+def test_reopening_with_other_settings_is_rejected(tmp_path):
+    FeatureStore(root=str(tmp_path), windows=(5,)).update(_games(["A"], [0], [1], [1]))
+    FeatureStore(root=str(tmp_path), windows=(5,), ewm_spans=(5.0,))
+    with pytest.raises(ValueError, match="windows"):
+        FeatureStore(root=str(tmp_path), windows=(3, 5))
+    with pytest.raises(ValueError, match="ewm_spans"):
+        FeatureStore(root=str(tmp_path), ewm_spans=(10,))
+
+
+def test_incremental_updates_match_batch_features(tmp_path):
+    games = _synthetic_games(20_000).drop_duplicates(["team", "match_date"])
+    games = games.sort_values("match_date", kind="stable").reset_index(drop=True)
+    for chunk in np.array_split(np.arange(len(games)), 5):
+        # Reopen between chunks so state round-trips through disk
+        store = FeatureStore(root=str(tmp_path))
+        store.update(games.iloc[chunk])
+    looked_up = store.lookup(games)
+    expected = compute_features(games, ewm_spans=(5,), rest_days=True, include_current=False).loc[games.index]
+    for column in store.feature_columns + ["rest_days"]:
+        np.testing.assert_allclose(looked_up[column], expected[column], rtol=1e-9, atol=1e-9, err_msg=column)
+
+
+def test_sync_only_folds_new_games_and_upcoming_uses_the_state(tmp_path):
+    games = _synthetic_games(5_000).drop_duplicates(["team", "match_date"])
+    games = games.sort_values("match_date", kind="stable").reset_index(drop=True)
+    played, later = games.iloc[:4_000], games.iloc[4_000:]
+    store = FeatureStore(root=str(tmp_path))
+    assert len(store.sync(played.iloc[:3_000])) == 3_000
+    assert len(store.sync(played)) == 1_000
+    assert store.sync(played).empty
+    expected = compute_features(games, ewm_spans=(5,), rest_days=True, include_current=False).loc[later.index]
+    # Each team's first game after the cutoff sees exactly the stored state
+    first = later.drop_duplicates("team")
+    upcoming = store.upcoming(first)
+    for column in store.feature_columns + ["rest_days"]:
+        np.testing.assert_allclose(upcoming[column], expected.loc[first.index, column], rtol=1e-9, atol=1e-9, err_msg=column)
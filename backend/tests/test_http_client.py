@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from core.http_client import SourceClient, SourceConfig
+
+URL = "http://stub.test/data"
+
+
+def _client(handler, retries=2, backoff=0.0, max_backoff=0.0):
+    source = SourceConfig("stub", retries=retries, backoff=backoff, max_backoff=max_backoff)
+    return SourceClient({"stub": source}, transport=httpx.MockTransport(handler))
+
+
+def _replies(*replies):
+    """Handler answering each request with the next reply; the rest repeat the last."""
+    calls = []
+
+    def handler(request):
+        reply = replies[min(len(calls), len(replies) - 1)]
+        calls.append(request)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    return handler, calls
+
+
+@pytest.fixture
+def make_client():
+    clients = []
+
+    def make(*args, **kwargs):
+        client = _client(*args, **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+def test_retries_server_errors_until_success(make_client):
+    handler, calls = _replies(httpx.Response(503), httpx.Response(502), httpx.Response(200, json={"ok": True}))
+    client = make_client(handler)
+    response = client.get_sync("stub", URL)
+    assert response.json() == {"ok": True}
+    assert len(calls) == 3
+    stats = client.stats["stub"]
+    assert (stats.requests, stats.retries, stats.errors, stats.last_status) == (3, 2, 2, 200)
+
+
+def test_gives_up_after_the_configured_retries(make_client):
+    handler, calls = _replies(httpx.Response(503))
+    client = make_client(handler, retries=1)
+    assert client.get_sync("stub", URL).status_code == 503
+    assert len(calls) == 2
+    assert client.stats["stub"].retries == 1
+
+
+def test_client_errors_are_not_retried(make_client):
+    handler, calls = _replies(httpx.Response(404), httpx.Response(200))
+    client = make_client(handler)
+    assert client.get_sync("stub", URL).status_code == 404
+    assert len(calls) == 1
+    assert client.stats["stub"].retries == 0
+
+
+def test_transport_errors_are_retried_then_raised(make_client):
+    handler, calls = _replies(httpx.ConnectError("refused"), httpx.Response(200))
+    client = make_client(handler)
+    assert client.get_sync("stub", URL).status_code == 200
+    assert client.stats["stub"].last_error.startswith("ConnectError")
+
+    handler, calls = _replies(httpx.ReadTimeout("slow"))
+    client = make_client(handler, retries=2)
+    with pytest.raises(httpx.ReadTimeout):
+        client.get_sync("stub", URL)
+    assert len(calls) == 3
+
+
+def test_retry_after_is_honored_up_to_max_backoff(make_client):
+    handler, calls = _replies(httpx.Response(429, headers={"Retry-After": "30"}), httpx.Response(200))
+    # No jitter budget, so any wait comes from Retry-After (capped at max_backoff)
+    client = make_client(handler, backoff=0.0, max_backoff=0.3)
+    started = time.perf_counter()
+    assert client.get_sync("stub", URL).status_code == 200
+    assert 0.3 <= time.perf_counter() - started < 5
+    assert len(calls) == 2
+
+
+def test_async_get_shares_the_client_loop(make_client):
+    handler, calls = _replies(httpx.Response(500), httpx.Response(200, text="done"))
+    client = make_client(handler)
+
+    async def fetch():
+        return await client.get("stub", URL, headers={"X-Test": "1"})
+
+    response = asyncio.run(fetch())
+    assert response.text == "done"
+    assert all(request.headers["x-test"] == "1" for request in calls)
+    assert len(calls) == 2
@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from live import line_history
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    for name, filename in [
+        ("MOVEMENTS_LOG", "line_movements.csv"),
+        ("MOVEMENTS_INDEX", "line_movements.idx"),
+        ("VERSION_PATH", "predictions_version.json"),
+        ("VERSION_LOCK", "predictions_version.lock"),
+    ]:
+        monkeypatch.setattr(line_history, name, str(tmp_path / filename))
+    monkeypatch.setattr(line_history, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(line_history, "_index", {"size": 0, "versions": [], "offsets": []})
+    return line_history
+
+
+def _odds(points):
+    n = len(points)
+    return pd.DataFrame({
+        "event_id": [f"e{i % 3}" for i in range(n)],
+        "bookmaker": "dk",
+        "market": "player_points",
+        "outcome_name": "Over",
+        "player": [f"Player {i}" for i in range(n)],
+        "point": points,
+        "price": 1.9,
+        "sport": "basketball_nba",
+        "matchup": "A vs B",
+    })
+
+
+def _publish_versions(history, count, rows=20):
+    rng = np.random.default_rng(1)
+    previous = None
+    for _ in range(count):
+        current = _odds(np.round(rng.normal(20, 5, rows), 1))
+        history.record_snapshot(previous, current, lambda df: None)
+        previous = current
+
+
+def _assert_same_as_full_read(history, since):
+    log = pd.read_csv(history.MOVEMENTS_LOG)
+    expected = log[log["version"] > since].reset_index(drop=True)
+    deltas = history.read_deltas(since).reset_index(drop=True)
+    if expected.empty:
+        assert deltas.empty
+    else:
+        pd.testing.assert_frame_equal(deltas, expected)
+
+
+def test_read_deltas_matches_a_full_read(history):
+    _publish_versions(history, 6)
+    assert history.read_version() == 6
+    for since in range(0, 8):
+        _assert_same_as_full_read(history, since)
+    assert history.read_deltas(6).empty
+
+
+def test_unchanged_snapshot_does_not_bump_the_version(history):
+    current = _odds([20.5, 21.5])
+    history.record_snapshot(None, current, lambda df: None)
+    version, changes = history.record_snapshot(current, current.copy(), lambda df: None)
+    assert version == 1 and changes.empty
+
+
+def test_settled_lines_are_logged_without_moving(history):
+    current = _odds([20.5, 21.5]).assign(actual_points=np.nan, outcome=None)
+    history.record_snapshot(None, current, lambda df: None)
+    settled = current.copy()
+    settled.loc[0, ["actual_points", "outcome"]] = [24.0, "Won"]
+    version, changes = history.record_snapshot(current, settled, lambda df: None)
+    assert version == 2
+    assert list(changes["change"]) == ["settled"]
+    assert changes.loc[0, "outcome"] == "Won" and changes.loc[0, "actual_points"] == 24.0
+    assert changes.loc[0, "point"] == changes.loc[0, "prev_point"] == 20.5
+    _assert_same_as_full_read(history, 1)
+
+
+def test_log_without_index_is_indexed_on_next_append(history):
+    _publish_versions(history, 3)
+    os.remove(history.MOVEMENTS_INDEX)
+    history._index.update(size=0, versions=[], offsets=[])
+    _assert_same_as_full_read(history, 1)
+    history.record_snapshot(None, _odds([1.5]), lambda df: None)
+    assert os.path.exists(history.MOVEMENTS_INDEX)
+    for since in range(0, 5):
+        _assert_same_as_full_read(history, since)
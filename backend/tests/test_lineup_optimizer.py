@@ -0,0 +1,73 @@
+import itertools
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from advanced.lineup_optimizer import LineupConstraints, LineupOptimizer, _synthetic_pool, optimize_lineups
+
+
+def _feasible(rows, c):
+    if c.salary_cap is not None and sum(row["salary"] for row in rows) > c.salary_cap:
+        return False
+    if c.max_per_team and max(Counter(row["team"] for row in rows).values()) > c.max_per_team:
+        return False
+    if c.max_per_game and max(Counter(row["matchup"] for row in rows).values()) > c.max_per_game:
+        return False
+    if c.positions and Counter(row["position"] for row in rows) != Counter(c.positions):
+        return False
+    return len({row["player"] for row in rows}) == len(rows)
+
+
+def _brute_force(pool, c):
+    """Values of every feasible lineup, best first."""
+    rows = pool.to_dict(orient="records")
+    found = []
+    for combo in itertools.combinations(rows, c.size):
+        if _feasible(combo, c):
+            found.append(sum(row["value"] for row in combo))
+    return sorted(found, reverse=True)
+
+
+@pytest.mark.parametrize("constraints", [
+    LineupConstraints(size=3, max_per_game=1),
+    LineupConstraints(size=4, max_per_game=None, max_per_team=1, salary_cap=24_000),
+    LineupConstraints(size=4, max_per_game=2, positions={"G": 2, "F": 1, "C": 1}),
+])
+def test_top_k_matches_brute_force(constraints):
+    pool = _synthetic_pool(players=18, seed=4)
+    pool["value"] = pool["projection"]
+    expected = _brute_force(pool, constraints)
+    optimizer = LineupOptimizer(pool, "value", constraints)
+    lineups = optimizer.top_k(5)
+    np.testing.assert_allclose([lineup.value for lineup in lineups], expected[:5])
+    assert len({frozenset(lineup.players) for lineup in lineups}) == len(lineups)
+    for lineup in lineups:
+        assert _feasible(optimizer.pool.iloc[lineup.players].to_dict(orient="records"), constraints)
+
+
+def test_probability_objective_maximizes_joint_hit_probability():
+    pool = _synthetic_pool(players=16, seed=9)
+    result = optimize_lineups(pool, objective="probability", constraints=LineupConstraints(size=3), top_k=1)
+    pool["value"] = np.log(pool["probability"])
+    best = _brute_force(pool, LineupConstraints(size=3))[0]
+    assert math.isclose(result["lineups"][0]["hit_probability"], math.exp(best))
+
+
+def test_max_overlap_limits_shared_players():
+    pool = _synthetic_pool(players=40, seed=2)
+    result = optimize_lineups(pool, objective="points", constraints=LineupConstraints(size=5, max_per_game=None),
+                              top_k=6, max_overlap=2)
+    picked = [{player["player"] for player in lineup["players"]} for lineup in result["lineups"]]
+    assert len(picked) == 6
+    for a, b in itertools.combinations(picked, 2):
+        assert len(a & b) <= 2
+
+
+def test_infeasible_constraints_yield_no_lineups():
+    pool = _synthetic_pool(players=10, seed=1)
+    pool["value"] = pool["projection"]
+    assert LineupOptimizer(pool, "value", LineupConstraints(size=3, salary_cap=1_000)).top_k(3) == []
+    with pytest.raises(ValueError):
+        LineupOptimizer(pool, "value", LineupConstraints(size=3, positions={"G": 1})).top_k(1)
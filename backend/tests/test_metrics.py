@@ -0,0 +1,77 @@
+import random
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from core.metrics import LATENCY_BUCKETS, QUANTILES, UNMATCHED, Histogram, HttpMetrics, MetricsMiddleware, span
+
+
+def test_interpolated_quantiles_track_exact_ones():
+    rng = random.Random(0)
+    values = sorted(rng.lognormvariate(-4, 1) for _ in range(100_000))
+    histogram = Histogram(LATENCY_BUCKETS)
+    for v in values:
+        histogram.observe(v)
+    for q in QUANTILES:
+        exact = values[int(q * len(values)) - 1]
+        assert abs(histogram.quantile(q) - exact) / exact < 0.05
+
+
+def _app(metrics):
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+    router = APIRouter()
+
+    @router.get("/")
+    def index():
+        return {}
+
+    @router.get("/items/{item_id}")
+    def item(item_id: str):
+        with span("load"):
+            return {"id": item_id}
+
+    other = APIRouter()
+
+    @other.get("/items/{item_id}")
+    def other_item(item_id: str):
+        return {}
+
+    @app.get("/health")
+    def health():
+        return {}
+
+    app.include_router(router, prefix="/api/things")
+    app.include_router(other, prefix="/api/v1")
+    return app
+
+
+def test_prefixed_routes_report_their_full_template():
+    metrics = HttpMetrics()
+    client = TestClient(_app(metrics))
+    client.get("/api/things/")
+    client.get("/api/things/items/1")
+    client.get("/api/things/items/2")
+    client.get("/api/v1/items/3")
+    client.get("/health")
+    client.get("/missing/path")
+    assert set(metrics.summary()) == {
+        "GET /api/things/",
+        "GET /api/things/items/{item_id}",
+        "GET /api/v1/items/{item_id}",
+        "GET /health",
+        f"GET {UNMATCHED}",
+    }
+    assert metrics.summary()["GET /api/things/items/{item_id}"]["count"] == 2
+    assert metrics.statuses[(UNMATCHED, "GET", 404)] == 1
+
+
+def test_spans_reach_phases_and_server_timing():
+    metrics = HttpMetrics()
+    response = TestClient(_app(metrics)).get("/api/things/items/1")
+    assert response.headers["server-timing"].startswith("load;dur=")
+    assert ("/api/things/items/{item_id}", "load") in metrics.phases
+    text = metrics.render()
+    assert 'http_request_phase_seconds_count{route="/api/things/items/{item_id}",phase="load"} 1' in text
+    assert 'http_requests_total{route="/api/things/items/{item_id}",method="GET",status="200"} 1' in text
+    assert metrics.in_flight == 0
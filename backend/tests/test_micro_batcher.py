@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from core.micro_batcher import MicroBatcher
+
+
+def test_concurrent_calls_share_one_batch():
+    calls = []
+
+    def double(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(double, max_batch=8, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        await batcher.stop()
+        return results
+
+    assert asyncio.run(scenario()) == [0, 2, 4, 6, 8]
+    assert calls == [[0, 1, 2, 3, 4]]
+
+
+def test_short_result_fails_every_caller_instead_of_hanging():
+    async def scenario():
+        batcher = MicroBatcher(lambda items: items[:-1], max_batch=8, max_wait_ms=50)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True), timeout=2,
+        )
+        stats = batcher.stats()
+        await batcher.stop()
+        return results, stats
+
+    results, stats = asyncio.run(scenario())
+    assert len(results) == 3 and all(isinstance(r, ValueError) for r in results)
+    assert stats["errors"] == 1
+
+
+def test_failing_batch_propagates_the_error():
+    def boom(items):
+        raise RuntimeError("model unavailable")
+
+    async def scenario():
+        batcher = MicroBatcher(boom, max_wait_ms=1)
+        try:
+            with pytest.raises(RuntimeError):
+                await batcher.submit(1)
+        finally:
+            await batcher.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,46 @@
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import columnar_store
+from core.data_store import Snapshot
+from live.odds_normalize import OddsTableBuilder
+from routes import predictions
+
+PAYLOAD = [{
+    "id": "e1",
+    "commence_time": "2025-01-01T00:00:00Z",
+    "home_team": "Boston Celtics",
+    "away_team": "Los Angeles Lakers",
+    "bookmakers": [{"key": "dk", "markets": [{"key": "player_points", "outcomes": [
+        {"name": "Over", "description": "LeBron James", "price": 1.91, "point": 27.3},
+        {"name": "Under", "description": "LeBron James", "price": 1.87, "point": 27.3},
+    ]}]}],
+}]
+
+
+class _Store:
+    def __init__(self, data):
+        self.snapshot = Snapshot(data=data, version=1, signature=None)
+
+    def get(self):
+        return self.snapshot
+
+
+def test_decimal_prices_survive_storage_and_the_api(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar_store, "PREDICTIONS_DIR", str(tmp_path / "predictions"))
+    monkeypatch.setattr(columnar_store, "MANIFEST_PATH", str(tmp_path / "predictions" / "_manifest.json"))
+    builder = OddsTableBuilder()
+    builder.add(json.dumps(PAYLOAD), "basketball_nba", "player_points")
+    columnar_store.write_predictions(builder.to_frame(), export_csv=False)
+    stored = columnar_store.load_predictions_table()
+    assert list(stored["price"]) == [1.91, 1.87]
+
+    monkeypatch.setattr(predictions, "predictions_store", _Store(stored))
+    monkeypatch.setattr(predictions, "response_cache", type(predictions.response_cache)())
+    app = FastAPI()
+    app.include_router(predictions.router, prefix="/api/predictions")
+    body = TestClient(app).get("/api/predictions/", headers={"Accept-Encoding": "identity"}).text
+    assert '"price":1.91' in body and '"point":27.3' in body
+    assert [row["price"] for row in json.loads(body)] == [1.91, 1.87]
@@ -0,0 +1,71 @@
+import gzip
+import json
+
+import pandas as pd
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from core.response_cache import ResponseCache, cached_json_response, dataframe_to_json
+
+ROWS = pd.DataFrame({"player": ["A", "B"], "probability": [0.61, float("nan")]})
+
+
+def _client():
+    app = FastAPI()
+    cache = ResponseCache()
+    state = {"version": 1}
+
+    @app.get("/rows")
+    def rows(request: Request):
+        cached = cache.get_or_build("rows", state["version"], lambda: dataframe_to_json(ROWS))
+        return cached_json_response(request, cached)
+
+    return TestClient(app), cache, state
+
+
+def test_body_is_built_once_per_version():
+    client, cache, state = _client()
+    first = client.get("/rows", headers={"Accept-Encoding": "identity"})
+    assert first.json() == [{"player": "A", "probability": 0.61}, {"player": "B", "probability": None}]
+    client.get("/rows", headers={"Accept-Encoding": "identity"})
+    assert (cache.builds, cache.hits) == (1, 1)
+    state["version"] = 2
+    client.get("/rows", headers={"Accept-Encoding": "identity"})
+    assert cache.builds == 2
+
+
+def test_if_none_match_returns_304():
+    client, _, _ = _client()
+    etag = client.get("/rows", headers={"Accept-Encoding": "identity"}).headers["etag"]
+    response = client.get("/rows", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert client.get("/rows", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_gzip_variant_has_its_own_etag_and_revalidates():
+    client, _, _ = _client()
+    plain = client.get("/rows", headers={"Accept-Encoding": "identity"})
+    zipped = client.get("/rows", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert zipped.headers["vary"] == "Accept-Encoding"
+    assert zipped.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    assert json.loads(zipped.content) == plain.json()
+    # Any variant's tag validates, whichever encoding the revalidation asks for
+    for encoding in ("gzip", "identity"):
+        response = client.get("/rows", headers={"Accept-Encoding": encoding, "If-None-Match": zipped.headers["etag"]})
+        assert response.status_code == 304
+
+
+def test_weak_and_listed_etags_match():
+    client, _, _ = _client()
+    etag = client.get("/rows", headers={"Accept-Encoding": "identity"}).headers["etag"]
+    for if_none_match in (f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get("/rows", headers={"Accept-Encoding": "identity", "If-None-Match": if_none_match})
+        assert response.status_code == 304, if_none_match
+
+
+def test_gzip_body_is_the_compressed_json():
+    cached = ResponseCache().get_or_build("k", 1, lambda: dataframe_to_json(ROWS))
+    assert gzip.decompress(cached.gzip) == cached.body
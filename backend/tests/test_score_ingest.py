@@ -0,0 +1,234 @@
+import asyncio
+import contextlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import data_store
+from core.config import Config
+from core.data_store import Snapshot
+from fixture_server import FixtureServer
+from live import line_history, update_predictions
+from live.score_ingest import ScoreIngester, carry_settlements
+
+NOW = 1_700_000_000.0
+START = NOW + 3 * 3600
+NBA = Config.ESPN_ENDPOINTS["nba"]
+SUMMARY = NBA.replace("/scoreboard", "/summary") + "?event=401"
+
+
+def _iso(t):
+    return pd.Timestamp(t, unit="s", tz="UTC").strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _game(state, home_score, away_score, event_id="401", start=START):
+    detail = {"pre": "7:30 PM ET", "in": "3rd Quarter", "post": "Final"}[state]
+    return {"events": [{
+        "id": event_id,
+        "date": pd.Timestamp(start, unit="s", tz="UTC").isoformat(),
+        "status": {"type": {"state": state, "completed": state == "post", "detail": detail}},
+        "competitions": [{"competitors": [
+            {"homeAway": "home", "score": str(home_score), "team": {"displayName": "Boston Celtics", "abbreviation": "BOS"}},
+            {"homeAway": "away", "score": str(away_score), "team": {"displayName": "Los Angeles Lakers", "abbreviation": "LAL"}},
+        ]}],
+    }]}
+
+
+def _box(points):
+    return {"boxscore": {"players": [{"statistics": [{
+        "labels": ["MIN", "PTS", "REB", "AST"],
+        "athletes": [{"athlete": {"displayName": name}, "stats": ["30", str(pts), "5", "4"]} for name, pts in points.items()],
+    }]}]}}
+
+
+def _table():
+    # The last row is the same matchup a week earlier and must stay unsettled
+    return pd.DataFrame({
+        "sport": ["basketball_nba"] * 7,
+        "event_id": ["odds-1"] * 6 + ["odds-0"],
+        "commence_time": [_iso(START)] * 6 + [_iso(START - 7 * 86400)],
+        "matchup": ["Los Angeles Lakers vs Boston Celtics"] * 7,
+        "bookmaker": ["dk"] * 7,
+        "market": ["player_points", "player_points", "player_points", "totals", "h2h", "spreads", "player_points"],
+        "outcome_name": ["Over", "Under", "Over", "Over", "Boston Celtics", "Los Angeles Lakers", "Over"],
+        "player": ["LeBron James", "LeBron James", "Jayson Tatum", None, None, None, "LeBron James"],
+        "point": [27.5, 27.5, 25.5, 220.5, np.nan, 4.5, 27.5],
+        "actual_points": np.full(7, np.nan),
+        "outcome": [None] * 7,
+    })
+
+
+def _outcomes(df):
+    return [o if isinstance(o, str) else None for o in df["outcome"]]
+
+
+class Replay:
+    """An ingester wired to a fixture server and an in-memory predictions table."""
+
+    def __init__(self):
+        self.now = NOW
+        self.table = _table()
+        self.saves = 0
+        self.fail_saves = 0
+        self.fixtures = FixtureServer({NBA: _game("pre", 0, 0)})
+        self.ingester = ScoreIngester(
+            base_url=self.fixtures.url, sports=["nba"], load=lambda: self.table.copy(), save=self.save,
+            lock=contextlib.nullcontext, clock=lambda: self.now,
+        )
+
+    def save(self, df):
+        if self.fail_saves:
+            self.fail_saves -= 1
+            raise OSError("disk full")
+        self.table, self.saves = df, self.saves + 1
+
+    def show(self, state, home_score, away_score, points=None):
+        self.fixtures.routes[NBA] = _game(state, home_score, away_score)
+        if points is not None:
+            self.fixtures.routes[SUMMARY] = _box(points)
+
+    def poll(self, force=True):
+        return asyncio.run(self.ingester.run_once(force=force))
+
+
+@pytest.fixture
+def replay():
+    replay = Replay()
+    yield replay
+    replay.fixtures.close()
+
+
+def test_pregame_polling_waits_for_the_lead_window_and_revalidates(replay):
+    replay.poll(force=False)
+    expected = min(3 * 3600 - Config.SCORE_PREGAME_LEAD_SECONDS, Config.SCORE_POLL_IDLE_SECONDS)
+    assert replay.ingester.next_poll["nba"] - replay.now == expected
+    replay.poll()
+    assert replay.ingester.not_modified == 1
+    assert replay.fixtures.hits["304"] == 1
+    assert replay.saves == 0
+
+
+def test_live_game_settles_props_incrementally(replay):
+    replay.poll()
+    replay.now = START + 3600
+    replay.show("in", 80, 78, {"LeBron James": 29, "Jayson Tatum": 18})
+    replay.poll(force=False)
+    assert replay.ingester.next_poll["nba"] - replay.now == Config.SCORE_POLL_LIVE_SECONDS
+    assert list(replay.table["actual_points"][:3]) == [29, 29, 18]
+    assert _outcomes(replay.table)[:3] == ["Won", "Lost", None]
+    assert np.isnan(replay.table["actual_points"].iloc[6]), "a week-old row of the same matchup was settled"
+    replay.poll()  # both boards unchanged: 304s, no save
+    assert replay.saves == 1
+
+
+def test_final_game_settles_every_market_then_stops_polling(replay):
+    replay.now = START + 3600
+    replay.show("in", 80, 78, {"LeBron James": 29, "Jayson Tatum": 18})
+    replay.poll()
+    replay.show("post", 112, 109, {"LeBron James": 31, "Jayson Tatum": 25})
+    result = replay.poll()
+    assert result["settled"] > 0
+    assert _outcomes(replay.table) == ["Won", "Lost", "Lost", "Won", "Won", "Won", None]
+    assert replay.ingester.next_poll["nba"] - replay.now == Config.SCORE_POLL_IDLE_SECONDS
+    requests = replay.ingester.requests
+    replay.poll()
+    assert replay.ingester.requests == requests + 1, "final games must not be re-fetched"
+
+
+def test_failed_save_keeps_a_final_game_polling_until_settled(replay):
+    replay.now = START + 3 * 3600
+    replay.show("post", 112, 109, {"LeBron James": 31, "Jayson Tatum": 25})
+    replay.fail_saves = 1
+    with pytest.raises(OSError):
+        replay.poll()
+    assert "401" not in replay.ingester.finalized
+    assert replay.saves == 0
+    # Nothing changed upstream (304s), but the final game is settled again
+    replay.poll()
+    assert replay.fixtures.hits["304"] == 2
+    assert replay.saves == 1
+    assert "401" in replay.ingester.finalized
+    assert _outcomes(replay.table) == ["Won", "Lost", "Lost", "Won", "Won", "Won", None]
+
+
+def test_caches_only_hold_the_current_slate(replay):
+    ingester = replay.ingester
+    for day in range(5):
+        event_id, start = str(500 + day), START + day * 86400
+        summary = NBA.replace("/scoreboard", "/summary") + f"?event={event_id}"
+        replay.now = start + 3600
+        replay.fixtures.routes[NBA] = _game("in", 80, 78, event_id, start)
+        replay.fixtures.routes[summary] = _box({"LeBron James": 29})
+        replay.poll()
+        assert set(ingester.games) == {event_id}
+        assert set(ingester.finalized) == set()
+        assert len(ingester._bodies) == len(ingester._validators) == 2
+        replay.fixtures.routes[NBA] = _game("post", 112, 109, event_id, start)
+        replay.poll()
+        # Settled: only the scoreboard stays cached until the game leaves it
+        assert ingester.games == {}
+        assert set(ingester.finalized) == {event_id}
+        assert set(ingester._bodies) == set(ingester._validators) == {replay.fixtures.url + NBA}
+
+
+def test_settlements_carry_over_to_a_fresh_odds_pull(replay):
+    replay.now = START + 3 * 3600
+    replay.show("post", 112, 109, {"LeBron James": 31, "Jayson Tatum": 25})
+    replay.poll()
+    carried = carry_settlements(replay.table, _table())
+    assert _outcomes(carried) == _outcomes(replay.table)
+    np.testing.assert_array_equal(carried["actual_points"], replay.table["actual_points"])
+
+
+def test_publishes_score_and_settlement_events(replay):
+    sent = []
+    replay.ingester.publish = sent.extend
+    replay.now = START + 3600
+    replay.show("in", 80, 78, {"LeBron James": 29, "Jayson Tatum": 18})
+    replay.poll()
+    topics = [message.topic for message in sent]
+    assert topics.count("score") == 1
+    # Every row of tonight's game gets its running value; last week's row none
+    settled = [message for message in sent if message.topic == "settlement"]
+    assert len(settled) == 6
+    assert all(message.sport == "nba" for message in sent)
+    assert all("lebron james" in message.players for message in settled[:2])
+
+
+def test_default_save_records_a_new_version(tmp_path, monkeypatch):
+    for name, filename in [
+        ("MOVEMENTS_LOG", "line_movements.csv"),
+        ("MOVEMENTS_INDEX", "line_movements.idx"),
+        ("VERSION_PATH", "predictions_version.json"),
+        ("VERSION_LOCK", "predictions_version.lock"),
+    ]:
+        monkeypatch.setattr(line_history, name, str(tmp_path / filename))
+    monkeypatch.setattr(line_history, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(line_history, "_index", {"size": 0, "versions": [], "offsets": []})
+    table = _table()
+    published = []
+
+    class Store:
+        def get(self):
+            return Snapshot(data=table, version=1, signature=None)
+
+    monkeypatch.setattr(data_store, "predictions_store", Store())
+    monkeypatch.setattr(update_predictions, "publish_predictions", published.append)
+    fixtures = FixtureServer({
+        NBA: _game("post", 112, 109),
+        SUMMARY: _box({"LeBron James": 31, "Jayson Tatum": 25}),
+    })
+    try:
+        ingester = ScoreIngester(
+            base_url=fixtures.url, sports=["nba"], load=table.copy,
+            lock=contextlib.nullcontext, clock=lambda: START + 3 * 3600,
+        )
+        asyncio.run(ingester.run_once(force=True))
+    finally:
+        fixtures.close()
+    assert len(published) == 1
+    assert line_history.read_version() == 1
+    deltas = line_history.read_deltas(0)
+    assert list(deltas["change"]) == ["settled"] * 6
+    assert sorted(deltas["outcome"]) == sorted(["Won", "Lost", "Lost", "Won", "Won", "Won"])
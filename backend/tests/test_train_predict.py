@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("xgboost")
+pytest.importorskip("skopt")
+
+from advanced.train_predict import bayesian_optimize
+
+
+def test_bayesian_optimize_fits_a_tiny_frame():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(80, 3))
+    y = (X[:, 0] + 0.3 * rng.normal(size=80) > 0).astype(int)
+    X_val = rng.normal(size=(20, 3))
+    y_val = (X_val[:, 0] > 0).astype(int)
+    model, score = bayesian_optimize(X, y, X_val, y_val, n_iter=2, cv=2, n_jobs=1)
+    assert 0.0 <= score <= 1.0
+    assert model.predict(X_val).shape == (20,)
+    assert 3 <= model.get_params()["max_depth"] <= 10
@@ -0,0 +1,70 @@
+import asyncio
+
+import httpx
+import pytest
+
+from core.http_client import SourceClient, SourceConfig
+from live import update_predictions
+
+
+def _event(event_id, market, outcomes):
+    return {
+        "id": event_id,
+        "commence_time": "2025-01-01T00:00:00Z",
+        "home_team": "Boston Celtics",
+        "away_team": "Los Angeles Lakers",
+        "bookmakers": [{"key": "dk", "markets": [{"key": market, "outcomes": outcomes}]}],
+    }
+
+
+@pytest.fixture
+def odds_api(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        path = request.url.path
+        if path.endswith("/basketball_nba/events"):
+            return httpx.Response(200, json=[{"id": "e1"}, {"id": "e2"}])
+        if "/events/" in path:
+            if request.url.params["markets"] != "player_points,player_assists":
+                return httpx.Response(422)
+            event_id = path.split("/")[-2]
+            event = _event(event_id, "player_points", [{"name": "Over", "description": f"Player {event_id}", "price": 1.9, "point": 20.5}])
+            event["bookmakers"][0]["markets"].append(
+                {"key": "player_assists", "outcomes": [{"name": "Over", "description": f"Player {event_id}", "price": 2.0, "point": 5.5}]}
+            )
+            return httpx.Response(200, json=event, headers={"x-requests-remaining": "500"})
+        if path.endswith("/basketball_nba/odds"):
+            market = request.url.params["markets"]
+            if market.startswith("player_"):
+                return httpx.Response(422)  # what the real API answers
+            return httpx.Response(200, json=[_event("e1", market, [{"name": "Boston Celtics", "price": 1.5}])])
+        return httpx.Response(404)
+
+    client = SourceClient({"odds_api": SourceConfig("odds_api", retries=0)}, transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(update_predictions, "source_client", client)
+    yield requests
+    client.close()
+
+
+def test_player_props_are_fetched_per_event(odds_api):
+    df = asyncio.run(update_predictions.ingest_odds(["nba"], ["player_points", "player_assists", "h2h"]))
+    assert sorted(df["market"].astype(str).value_counts().items()) == [("h2h", 1), ("player_assists", 2), ("player_points", 2)]
+    assert set(df.loc[df["market"] == "player_points", "player"]) == {"Player e1", "Player e2"}
+    paths = sorted(request.url.path.split("/v4")[-1] for request in odds_api)
+    assert paths == [
+        "/sports/basketball_nba/events",
+        "/sports/basketball_nba/events/e1/odds",
+        "/sports/basketball_nba/events/e2/odds",
+        "/sports/basketball_nba/odds",
+    ]
+
+
+def test_exhausted_quota_stops_event_requests(odds_api, monkeypatch):
+    quota = update_predictions.OddsQuota
+    monkeypatch.setattr(update_predictions, "OddsQuota", lambda: quota(floor=1_000))
+    df = asyncio.run(update_predictions.ingest_odds(["nba"], ["player_points", "player_assists"], concurrency=1))
+    # The first event's response reports 500 left, under the floor: the second is skipped
+    assert len(df) == 2
+    assert sum("/events/" in request.url.path for request in odds_api) == 1
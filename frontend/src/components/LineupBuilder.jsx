@@ -9,6 +9,8 @@ const Spinner = () => (
   </div>
 );
 
+const PAGE_SIZE = 200;
+
 const LineupBuilder = () => {
   const [players, setPlayers] = useState([]);
   const [selectedPlayers, setSelectedPlayers] = useState([]);
@@ -29,36 +31,70 @@ const LineupBuilder = () => {
   const [teams, setTeams] = useState([]);
   const [sports, setSports] = useState([]);
   const [refreshing, setRefreshing] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [total, setTotal] = useState(0);
   const toast = useToast();
 
-  // Fetch lineup data (with optional refresh)
-  const fetchLineup = async (refresh = false) => {
-    setLoading(true);
+  // Fetch lineup data (with optional refresh); a cursor appends the next page
+  const fetchLineup = async (refresh = false, cursor = null) => {
+    if (!cursor) setLoading(true);
     setError('');
     let url = '/api/lineup';
-    const params = [];
+    const params = [`limit=${PAGE_SIZE}`];
+    if (cursor) params.push(`cursor=${cursor}`);
     if (filterDate) params.push(`date=${filterDate}`);
     if (filterStatus !== 'All') params.push(`status=${filterStatus}`);
     if (filterTeam !== 'All') params.push(`team=${filterTeam}`);
     if (filterSport !== 'All') params.push(`sport=${filterSport}`);
     if (refresh) params.push('refresh=true');
-    if (params.length) url += '?' + params.join('&');
+    url += '?' + params.join('&');
     try {
       const res = await axios.get(url);
       const data = res.data.lineup || (Array.isArray(res.data) ? res.data : []);
-      setPlayers(Array.isArray(data) ? data : []);
+      const page = Array.isArray(data) ? data : [];
+      setPlayers(prev => (cursor ? [...prev, ...page] : page));
+      setNextCursor(res.data.next_cursor || null);
+      setTotal(res.data.total ?? page.length);
       if (res.data.teams) setTeams(res.data.teams);
       if (res.data.sports) setSports(res.data.sports);
-      if (refresh) toast('Lineup and stats refreshed!', 'success');
+      if (refresh && res.data.refresh_job_id) pollRefresh(res.data.refresh_job_id);
     } catch (err) {
       setError('Lineup fetch error');
       toast('Lineup fetch error', 'error');
+      setRefreshing(false);
     } finally {
       setLoading(false);
-      setRefreshing(false);
     }
   };
 
+  // The stats scrape runs server-side in the background; poll its job and
+  // reload the lineup once it has finished
+  const pollRefresh = (jobId) => {
+    const timer = setInterval(async () => {
+      try {
+        const res = await axios.get(`/api/lineup/refresh/${jobId}`);
+        if (res.data.status === 'succeeded' || res.data.status === 'failed') {
+          clearInterval(timer);
+          setRefreshing(false);
+          if (res.data.status === 'succeeded') {
+            toast('Lineup and stats refreshed!', 'success');
+            fetchLineup();
+          } else {
+            toast('Stats refresh failed', 'error');
+          }
+        }
+      } catch (err) {
+        clearInterval(timer);
+        setRefreshing(false);
+      }
+    }, 1000);
+  };
+
+  const handleRefresh = () => {
+    setRefreshing(true);
+    fetchLineup(true);
+  };
+
   // Run at startup and on filter change
   useEffect(() => {
     fetchLineup();
@@ -266,6 +302,18 @@ const LineupBuilder = () => {
         ))}
       </div>
 
+      {nextCursor && (
+        <div className="flex justify-center mt-4">
+          <button
+            className="px-3 py-1 text-sm bg-gray-200 rounded hover:bg-gray-300"
+            onClick={() => fetchLineup(false, nextCursor)}
+            title="Load more players"
+          >
+            Load more ({players.length}/{total})
+          </button>
+        </div>
+      )}
+
       {/* Modal for player details */}
       {modalPlayer && (
         <div className="fixed inset-0 bg-black bg-opacity-40 flex items-center justify-center z-50">
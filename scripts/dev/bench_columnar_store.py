@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Load time and frame memory of the legacy predictions CSV versus the
+partitioned Arrow store in core.columnar_store.
+
+    python scripts/dev/bench_columnar_store.py
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent.parent / "backend"
+sys.path.insert(0, str(BACKEND))
+
+import numpy as np
+import pandas as pd
+
+from core import columnar_store
+
+
+def _synthetic_predictions(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    sports = np.array(["nba", "wnba", "mlb", "nhl", "soccer"])
+    dates = pd.date_range("2025-01-01", periods=30).strftime("%Y-%m-%d").to_numpy()
+    return pd.DataFrame({
+        "player": np.char.add("Player ", rng.integers(0, 5000, rows).astype(str)),
+        "team": np.char.add("T", rng.integers(0, 150, rows).astype(str)),
+        "matchup": np.char.add("Game ", rng.integers(0, 2000, rows).astype(str)),
+        "predicted_points": rng.normal(20, 6, rows).round(1),
+        "actual_points": np.nan,
+        "sport": sports[rng.integers(0, len(sports), rows)],
+        "date": dates[rng.integers(0, len(dates), rows)],
+        "bookmaker": np.char.add("book", rng.integers(0, 12, rows).astype(str)),
+        "market": np.array(["player_points", "h2h", "totals"])[rng.integers(0, 3, rows)],
+        "point": rng.normal(20, 6, rows).round(1),
+        "price": rng.uniform(1.5, 2.5, rows).round(2),
+    })
+
+
+def benchmark(rows: int = 1_000_000) -> None:
+    """Compare load time and frame memory of CSV vs the columnar store."""
+    df = _synthetic_predictions(rows)
+    saved_paths = columnar_store.PREDICTIONS_DIR, columnar_store.MANIFEST_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "predictions.csv")
+        df.to_csv(csv_path, index=False)
+        started = time.perf_counter()
+        from_csv = pd.read_csv(csv_path)
+        csv_seconds = time.perf_counter() - started
+
+        columnar_store.PREDICTIONS_DIR = tmp
+        columnar_store.MANIFEST_PATH = os.path.join(tmp, "_manifest.json")
+        try:
+            columnar_store.write_predictions(df, export_csv=False)
+            started = time.perf_counter()
+            from_store = columnar_store.read_predictions()
+            store_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            columnar_store.read_predictions(sports=["nba"])
+            pruned_seconds = time.perf_counter() - started
+        finally:
+            # Later writers in this process must not target the deleted directory
+            columnar_store.PREDICTIONS_DIR, columnar_store.MANIFEST_PATH = saved_paths
+
+    print(f"{rows:,} rows")
+    print(f"CSV read_csv:      {csv_seconds:.2f}s, {from_csv.memory_usage(deep=True).sum() / 1e6:.0f} MB")
+    print(f"columnar (mmap):   {store_seconds:.2f}s, {from_store.memory_usage(deep=True).sum() / 1e6:.0f} MB")
+    print(f"columnar, one sport: {pruned_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    benchmark()
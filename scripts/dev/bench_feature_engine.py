@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Legacy groupby/apply team features versus the vectorized
+advanced.feature_engine, after checking the two agree.
+
+    python scripts/dev/bench_feature_engine.py
+"""
+import sys
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent.parent / "backend"
+sys.path.insert(0, str(BACKEND))
+
+from advanced.feature_engine import _synthetic_games, check_parity, compute_features, legacy_time_series_features
+
+
+def benchmark(rows: int = 1_000_000) -> None:
+    """Time the legacy groupby features against the vectorized engine."""
+    check_parity(_synthetic_games(50_000))
+    print(f"{rows:,} rows, parity checked")
+    for teams in (300, 5000):
+        df = _synthetic_games(rows, teams=teams)
+
+        started = time.perf_counter()
+        legacy_time_series_features(df)
+        legacy_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        compute_features(df)
+        engine_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        compute_features(df, windows=(3, 5, 10, 20), ewm_spans=(5, 10), rest_days=True)
+        full_seconds = time.perf_counter() - started
+
+        print(f"{teams} groups:")
+        print(f"  legacy groupby/apply:             {legacy_seconds:.2f}s")
+        print(f"  engine, same features:            {engine_seconds:.2f}s")
+        print(f"  engine, 4 windows + 2 EWM + rest: {full_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    benchmark()
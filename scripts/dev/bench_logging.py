@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Log call latency: direct file + console handlers versus the batched queue
+pipeline in core.auto_logger, on a fast sink and on one that stalls every write.
+
+    python scripts/dev/bench_logging.py
+"""
+import logging
+import os
+import queue
+import sys
+import tempfile
+import time
+from typing import Any
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent.parent / "backend"
+sys.path.insert(0, str(BACKEND))
+
+from core.auto_logger import (
+    LOG_QUEUE_SIZE,
+    TEXT_FORMAT,
+    BatchingQueueListener,
+    BatchStreamHandler,
+    DroppingQueueHandler,
+)
+
+
+class SlowStream:
+    """Sink that stalls every write, like a busy disk or a blocked console."""
+
+    def __init__(self, stream: Any, delay: float) -> None:
+        self.stream, self.delay = stream, delay
+
+    def write(self, text: str) -> int:
+        time.sleep(self.delay)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def benchmark(calls: int = 20_000, slow_calls: int = 2_000, stall: float = 0.0005) -> None:
+    """Per-call latency of a log call: direct file+console handlers (the old
+    setup) versus the queue pipeline, on a fast sink and a stalling one."""
+    def build(name: str, tmp: str, delay: float):
+        sinks = [open(Path(tmp) / f"{name}.log", "a", encoding="utf-8"), open(os.devnull, "w")]
+        streams = [SlowStream(sink, delay) if delay else sink for sink in sinks]
+        logger = logging.getLogger(f"bench.{name}.{delay}")
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        if name == "direct":
+            handlers = [logging.StreamHandler(stream) for stream in streams]
+            for handler in handlers:
+                handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+                logger.addHandler(handler)
+            return logger, None, None, sinks
+        handlers = [BatchStreamHandler(stream) for stream in streams]
+        for handler in handlers:
+            handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        log_queue: "queue.Queue[Any]" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        source = DroppingQueueHandler(log_queue)
+        listener = BatchingQueueListener(log_queue, *handlers, source=source)
+        listener.start()
+        logger.addHandler(source)
+        return logger, source, listener, sinks
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for delay, n in ((0.0, calls), (stall, slow_calls)):
+            print(f"{n:,} calls, sink stall {delay * 1e3:.1f} ms per write:")
+            for name in ("direct", "queued"):
+                logger, source, listener, sinks = build(name, tmp, delay)
+                timings = []
+                for i in range(n):
+                    started = time.perf_counter()
+                    logger.info("request %d served in %.1f ms", i, 12.5)
+                    timings.append(time.perf_counter() - started)
+                timings.sort()
+                p50, p99, p9999 = (timings[min(int(len(timings) * q), len(timings) - 1)] * 1e6 for q in (0.5, 0.99, 0.9999))
+                line = f"  {name:>6}: p50 {p50:8.1f} us  p99 {p99:8.1f} us  p99.99 {p9999:8.1f} us"
+                if listener is not None:
+                    listener.stop()
+                    line += f"  ({listener.batches} batches, {source.dropped} dropped)"
+                print(line)
+                for sink in sinks:
+                    sink.close()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Per-request cost of the HTTP metrics bookkeeping in core.metrics (no ASGI).
+
+    python scripts/dev/bench_metrics.py
+"""
+import sys
+import time
+from typing import Dict
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent.parent / "backend"
+sys.path.insert(0, str(BACKEND))
+
+from core.metrics import HttpMetrics, _current_trace, span
+
+
+def benchmark(requests: int = 200_000) -> Dict[str, float]:
+    """Per-request cost of the bookkeeping (no ASGI), in microseconds."""
+    metrics = HttpMetrics()
+    routes = [f"/api/route{i}" for i in range(20)]
+    start = time.perf_counter()
+    for i in range(requests):
+        trace = metrics.begin()
+        token = _current_trace.set(trace)
+        with span("load"):
+            pass
+        _current_trace.reset(token)
+        metrics.end(routes[i % len(routes)], "GET", 200, (i % 1000) / 1e4, 0, 2048, trace)
+    per_request = (time.perf_counter() - start) / requests * 1e6
+    start = time.perf_counter()
+    text = metrics.render()
+    return {
+        "record_us": round(per_request, 2),
+        "render_ms": round((time.perf_counter() - start) * 1000, 2),
+        "render_lines": text.count("\n"),
+    }
+
+
+if __name__ == "__main__":
+    print(benchmark())
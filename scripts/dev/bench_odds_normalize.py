@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Rows/sec and memory of live.odds_normalize.OddsTableBuilder versus building
+one dict per outcome and a DataFrame from them.
+
+    python scripts/dev/bench_odds_normalize.py
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent.parent / "backend"
+sys.path.insert(0, str(BACKEND))
+
+import pandas as pd
+
+from live.odds_normalize import OddsTableBuilder
+
+
+def normalize_odds_rows(data, sport, market_key):
+    """Per-outcome dict rows, the way odds were normalized before OddsTableBuilder."""
+    is_player_market = market_key.startswith("player_")
+    rows = []
+    for game in data:
+        home = game.get("home_team")
+        away = game.get("away_team")
+        matchup = f"{away} vs {home}"
+        for bookmaker in game.get("bookmakers", []):
+            for market in bookmaker.get("markets", []):
+                if market.get("key") != market_key:
+                    continue
+                for outcome in market.get("outcomes", []):
+                    name = outcome.get("name")
+                    player = (outcome.get("description") or name) if is_player_market else None
+                    rows.append({
+                        "sport": sport,
+                        "event_id": game.get("id"),
+                        "commence_time": game.get("commence_time"),
+                        "matchup": matchup,
+                        "bookmaker": bookmaker.get("key"),
+                        "market": market_key,
+                        "outcome_name": name,
+                        "player": player,
+                        "team": None if is_player_market else name,
+                        "point": outcome.get("point"),
+                        "price": outcome.get("price"),
+                        "predicted_points": outcome.get("point") if is_player_market else None,
+                        "actual_points": None,
+                        "outcome": None
+                    })
+    return rows
+
+
+def _synthetic_payload(games=15, bookmakers=12, outcomes_per_market=60, market_key="player_points"):
+    return [
+        {
+            "id": f"event{g}",
+            "commence_time": "2025-06-01T00:00:00Z",
+            "home_team": f"Home {g}",
+            "away_team": f"Away {g}",
+            "bookmakers": [
+                {
+                    "key": f"book{b}",
+                    "markets": [{
+                        "key": market_key,
+                        "outcomes": [
+                            {"name": "Over" if o % 2 else "Under", "description": f"Player {o // 2}",
+                             "point": 20.5 + o % 7, "price": 1.8 + (o % 5) / 10}
+                            for o in range(outcomes_per_market)
+                        ],
+                    }],
+                }
+                for b in range(bookmakers)
+            ],
+        }
+        for g in range(games)
+    ]
+
+
+def benchmark(repeats=20):
+    """Compare rows/sec of the column builder against per-outcome dict rows."""
+    raw = json.dumps(_synthetic_payload()).encode("utf-8")
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        legacy = pd.DataFrame(normalize_odds_rows(json.loads(raw), "nba", "player_points"))
+    legacy_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        builder = OddsTableBuilder()
+        builder.add(raw, "nba", "player_points")
+        columnar = builder.to_frame()
+    columnar_elapsed = time.perf_counter() - started
+
+    rows = len(columnar) * repeats
+    print(f"rows per pull: {len(columnar)}")
+    print(f"dict rows + DataFrame: {rows / legacy_elapsed:,.0f} rows/sec, {legacy.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+    print(f"column builder:        {rows / columnar_elapsed:,.0f} rows/sec, {columnar.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Load test for the /ws/scores broadcaster.
+
+Serves the stream routes with uvicorn (one worker, one event loop) in a
+background thread, opens N concurrent websocket clients against it, publishes
+line events through the broadcaster and reports connect time, fan-out latency,
+delivery counts and memory. A few clients can be made to stop reading to
+show slow consumers being dropped/coalesced without stalling the rest.
+
+    python scripts/dev/ws_load_test.py --clients 5000 --messages 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent.parent / "backend"
+sys.path[:0] = [str(BACKEND), str(BACKEND / "core")]
+
+import numpy as np
+import uvicorn
+import websockets
+from fastapi import FastAPI
+
+from core.broadcaster import Broadcaster, broadcaster
+from routes.stream import router as stream_router
+
+TEAMS = [f"T{i}" for i in range(30)]
+
+
+def start_server(port):
+    app = FastAPI()
+    app.include_router(stream_router)
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", backlog=8192)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def client_team(i, filtered):
+    # Every ``1/filtered``-th client follows one team, the rest take everything
+    return TEAMS[i % len(TEAMS)] if filtered and i % round(1 / filtered) == 0 else None
+
+
+def message_teams(j):
+    return TEAMS[j % len(TEAMS)], TEAMS[(j * 7 + 1) % len(TEAMS)]
+
+
+async def run_client(url, team, expected, latencies, done, slow):
+    query = f"?team={team}" if team else ""
+    # Slow clients buffer one frame, so TCP back-pressure reaches the server
+    async with websockets.connect(url + query, max_queue=1 if slow else None, open_timeout=60) as ws:
+        await ws.recv()  # subscription ack
+        done["connected"] += 1
+        if slow:
+            await asyncio.sleep(3600)  # never reads; the server must not stall on it
+        received = 0
+        while received < expected:
+            frame = json.loads(await ws.recv())
+            now = time.perf_counter()
+            for event in frame:
+                if event["topic"] == "line":
+                    latencies.append(now - event["data"]["sent_at"])
+                    received += 1
+        done["complete"] += 1
+
+
+async def main(args):
+    server, _ = start_server(args.port)
+    url = f"ws://127.0.0.1:{args.port}/ws/scores"
+    latencies, done = [], {"connected": 0, "complete": 0}
+    expected = []
+    for i in range(args.clients):
+        team = client_team(i, args.filtered)
+        count = args.messages if team is None else sum(team in message_teams(j) for j in range(args.messages))
+        expected.append((team, count))
+
+    started = time.perf_counter()
+    tasks = []
+    for i, (team, count) in enumerate(expected):
+        tasks.append(asyncio.create_task(run_client(url, team, count, latencies, done, i < args.slow)))
+        if i % 200 == 199:
+            await asyncio.sleep(0.05)  # stay under the listen backlog
+    while done["connected"] < args.clients:
+        await asyncio.sleep(0.1)
+        if time.perf_counter() - started > args.timeout:
+            break
+    connect_s = time.perf_counter() - started
+    print(f"connected {done['connected']:,}/{args.clients:,} sockets in {connect_s:.1f}s")
+
+    publish_started = time.perf_counter()
+    for j in range(args.messages):
+        home, away = message_teams(j)
+        broadcaster.publish_many([Broadcaster.message(
+            "line",
+            {"event_id": f"e{j}", "player": f"Player {j}", "point": 20.5 + j % 10, "sent_at": time.perf_counter()},
+            key=j, sport="nba", teams=[home, away], players=[f"Player {j}"],
+        )])
+        if args.interval:
+            await asyncio.sleep(args.interval)
+    readers = args.clients - args.slow
+    while done["complete"] < readers and time.perf_counter() - publish_started < args.timeout:
+        await asyncio.sleep(0.1)
+    elapsed = time.perf_counter() - publish_started
+
+    stats = broadcaster.stats()
+    lat = np.array(latencies) * 1000
+    print(f"published {args.messages} messages, delivered {stats['delivered']:,}, "
+          f"{done['complete']:,}/{readers:,} reading clients got everything in {elapsed:.2f}s")
+    if len(lat):
+        print(f"fan-out latency ms: p50 {np.percentile(lat, 50):.1f}  p99 {np.percentile(lat, 99):.1f}  max {lat.max():.1f}")
+    print(f"slow clients: {args.slow}, dropped {stats['dropped']:,}, coalesced {stats['coalesced']:,}, "
+          f"max queue depth {stats['max_queue_depth']}")
+    print(f"peak RSS (server + clients): {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--filtered", type=float, default=0.5, help="share of clients following one team")
+    parser.add_argument("--slow", type=int, default=20, help="clients that never read")
+    parser.add_argument("--interval", type=float, default=0.0, help="seconds between published messages")
+    parser.add_argument("--port", type=int, default=int(os.getenv("WS_LOAD_TEST_PORT", "8765")))
+    parser.add_argument("--timeout", type=float, default=120.0)
+    asyncio.run(main(parser.parse_args()))
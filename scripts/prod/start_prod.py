@@ -1,12 +1,40 @@
+#!/usr/bin/env python3
+"""Production startup: the FastAPI backend under uvicorn with several workers.
+
+Each worker is a separate process holding its own websocket clients; the
+websocket backplane (WS_BACKPLANE, "unix" by default) relays live updates
+between them, and one worker at a time polls for new line versions.
+"""
 import os
+import subprocess
 import sys
+from pathlib import Path
+
+
+def start_prod():
+    backend = Path(__file__).resolve().parent.parent.parent / "backend"
+    cpus = os.cpu_count() or 2
+    workers = os.getenv("WEB_CONCURRENCY") or str(max(2, cpus))
+    # Each worker spawns its own CPU pool; split the cores between them
+    # rather than giving every worker cores - 1 processes
+    os.environ.setdefault("CPU_POOL_WORKERS", str(max(1, cpus // int(workers))))
+    # Training runs beside the request pools in its own process; cap its
+    # CV/search fan-out at half the cores instead of all of them
+    os.environ.setdefault("TRAIN_N_JOBS", str(max(1, cpus // 2)))
+    # Workers of this deployment relay updates through backend/data/ws_backplane
+    os.environ.setdefault("WS_BACKPLANE", "unix")
+    # Live scores settle predictions in production only
+    os.environ.setdefault("SCORE_INGEST_ENABLED", "true")
+    cmd = [
+        sys.executable, "-m", "uvicorn", "server:app",
+        "--host", os.getenv("HOST", "0.0.0.0"),
+        "--port", os.getenv("PORT", "80"),
+        "--workers", workers,
+        "--proxy-headers",
+    ]
+    print(f"Starting backend with {workers} workers: {' '.join(cmd)}")
+    return subprocess.call(cmd, cwd=backend)
 
-# Activate the virtual environment
-activate_this = os.path.join(os.path.dirname(__file__), '../venv/bin/activate_this.py')
-with open(activate_this) as file:
-    exec(file.read(), dict(__file__=activate_this))
 
-# Start the Flask production server
-os.environ['FLASK_APP'] = 'app'
-os.environ['FLASK_ENV'] = 'production'
-os.system('flask run --host=0.0.0.0 --port=80')
+if __name__ == "__main__":
+    sys.exit(start_prod())